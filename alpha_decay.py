@@ -0,0 +1,404 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from feature_store import fingerprint
+
+STATE_DIR = "data/alpha_decay"
+
+
+# ---------------------------
+# Forward Alpha Pairs
+# ---------------------------
+def merge_etf(stocks, etf_prices, columns):
+    """
+    Attach the sector ETF close (`etf_close`) to each stock row on (sector_etf, date).
+    """
+    etf = etf_prices[["date", "ticker", "adj_close"]].rename(columns={"ticker": "sector_etf", "adj_close": "etf_close"})
+    rows = stocks[columns].merge(etf, on=["sector_etf", "date"], how="inner")
+    rows["ticker"] = rows["ticker"].astype(object)
+    rows["date"] = pd.to_datetime(rows["date"]).astype("datetime64[ns]")
+    return rows.dropna(subset=["adj_close", "etf_close"])
+
+
+def forward_alpha(rows, max_horizon, keys, ends=None):
+    """
+    One row per (start row, horizon h) with alpha = adj_close[t+h] / adj_close[t]
+    - etf_close[t+h] / etf_close[t], h = 1..max_horizon trading rows within each
+    ticker. `rows` must be sorted by (ticker, date); with `ends` (bool mask)
+    only pairs ending on a masked row are produced.
+    Returns `keys` + ['date', 'horizon', 'alpha'] of the start row.
+    """
+    codes = pd.factorize(rows["ticker"])[0]
+    px = rows["adj_close"].to_numpy(float)
+    etf = rows["etf_close"].to_numpy(float)
+
+    parts = []
+    for h in range(1, max_horizon + 1):
+        start = np.arange(len(rows) - h)
+        end = start + h
+        ok = codes[end] == codes[start]
+        if ends is not None:
+            ok &= ends[end]
+        start, end = start[ok], end[ok]
+        alpha = (px[end] / px[start]) - (etf[end] / etf[start])
+        parts.append(rows.iloc[start][list(keys) + ["date"]].assign(horizon=h, alpha=alpha))
+    return pd.concat(parts, ignore_index=True)
+
+
+def alpha_pairs(stocks, etf_prices, max_horizon=10, by=("sector_etf",), label_col="sentiment_label"):
+    """
+    Every (start date, horizon) alpha observation of the full history, for
+    significance tests on the cells of `AlphaDecay.curve`.
+    """
+    keys = list(by) + [label_col]
+    rows = merge_etf(stocks, etf_prices, list(dict.fromkeys(["date", "ticker", "sector_etf"] + keys + ["adj_close"])))
+    rows = rows.sort_values(["ticker", "date"], kind="stable").reset_index(drop=True)
+    return forward_alpha(rows, max_horizon, keys)
+
+
+# ---------------------------
+# Incremental Alpha Decay
+# ---------------------------
+class AlphaDecay:
+    """
+    Running mean of alpha_{h}d = stock forward return - sector ETF forward
+    return over h = 1..max_horizon trading days, per (*by, sentiment label).
+    - only running sums / counts per group and horizon are kept, plus the last
+      `max_horizon` rows of every ticker still waiting for their forward prices
+    - `update` only needs the rows from `since()` on (the full history works
+      too): rows up to the last date already seen for a ticker are ignored,
+      and each new row closes exactly the (start, start + h) pairs that end on
+      it, so the work is O(new rows x max_horizon)
+    - `source` names the table the rows come from. The number of rows folded
+      in and a hash of the kept boundary rows are checked on every update: if
+      the history came back changed (the table was rebuilt or restated),
+      `consistent` is False and the state has to start over from scratch
+    """
+    version = 2
+    def __init__(self, max_horizon=10, by=("sector_etf",), label_col="sentiment_label", source=None):
+        self.max_horizon = max_horizon
+        self.by = list(by)
+        self.label_col = label_col
+        self.keys = self.by + [label_col]
+        self.source = source
+        self.reset()
+
+    def reset(self):
+        self.sums = None
+        self.counts = None
+        self.tail = None
+        self.boundary = None
+        self.n_rows = 0
+        self.last_date = pd.Series(index=pd.Index([], dtype=object), dtype="datetime64[ns]")
+
+    def since(self):
+        """
+        First date `update` needs rows from (the oldest kept tail row), None if empty.
+        """
+        return None if self.tail is None else self.tail["date"].min()
+
+    def _seen(self, df):
+        last = self.last_date.reindex(df["ticker"].astype(object)).to_numpy()
+        return ~pd.isna(last) & (pd.to_datetime(df["date"]).to_numpy() <= last)
+
+    def _digest(self, tail):
+        tail = tail.reset_index(drop=True)
+        return fingerprint(tail.astype({c: object for c in tail.columns if isinstance(tail[c].dtype, pd.CategoricalDtype)}))
+
+    def _rows(self, stocks, etf_prices):
+        """
+        Merged rows in (ticker, date) order, and the mask of those not folded in yet.
+        """
+        rows = merge_etf(stocks, etf_prices, list(dict.fromkeys(["date", "ticker", "sector_etf"] + self.keys + ["adj_close"])))
+        rows = rows.sort_values(["ticker", "date"], kind="stable").reset_index(drop=True)
+        return rows, ~self._seen(rows)
+
+    def consistent(self, stocks, etf_prices, n_earlier=0):
+        """
+        Whether `stocks` (from `since()` on, with `n_earlier` rows of the table
+        before it) agrees with the history already folded in: same number of
+        rows up to each ticker's last seen date, same kept boundary rows.
+        """
+        if self.tail is None:
+            return True
+        if n_earlier + int(self._seen(stocks).sum()) != self.n_rows:
+            return False
+        rows, new = self._rows(stocks, etf_prices)
+        return self._digest(rows[~new].groupby("ticker", sort=False).tail(self.max_horizon)) == self.boundary
+
+    def update(self, stocks, etf_prices, n_earlier=0):
+        """
+        Fold in the forward returns that became available with the new rows.
+        - stocks: ['date', 'ticker', 'sector_etf', 'adj_close', label_col, *by],
+          the full history or the rows from `since()` on
+        - etf_prices: ['date', 'ticker', 'adj_close'] of the sector ETFs
+        - n_earlier: rows of the source table before the first row of `stocks`
+        If the history changed, the state starts over when `stocks` is the
+        full history (n_earlier == 0) and raises ValueError otherwise.
+        Returns the number of new rows.
+        """
+        if not self.consistent(stocks, etf_prices, n_earlier):
+            if n_earlier:
+                raise ValueError("folded history changed; pass the full history to start over")
+            self.reset()
+        rows, new = self._rows(stocks, etf_prices)
+        new = rows[new]
+        if new.empty:
+            return 0
+
+        combined = pd.concat([self.tail.assign(is_new=False), new.assign(is_new=True)], ignore_index=True) \
+            if self.tail is not None else new.assign(is_new=True)
+        combined = combined.sort_values(["ticker", "date"], kind="stable").reset_index(drop=True)
+
+        pairs = forward_alpha(combined, self.max_horizon, self.keys, ends=combined["is_new"].to_numpy(bool))
+        agg = pairs.groupby(self.keys + ["horizon"], observed=True)["alpha"].agg(["sum", "count"])
+        sums, counts = agg["sum"].unstack("horizon"), agg["count"].unstack("horizon")
+        if self.sums is None:
+            self.sums, self.counts = sums, counts
+        else:
+            self.sums = self.sums.add(sums, fill_value=0)
+            self.counts = self.counts.add(counts, fill_value=0)
+
+        self.tail = combined.groupby("ticker", sort=False).tail(self.max_horizon).drop(columns="is_new")
+        latest = new.groupby("ticker")["date"].max()
+        self.last_date = latest.combine_first(self.last_date)
+        self.boundary = self._digest(self.tail)
+        self.n_rows = n_earlier + int(self._seen(stocks).sum())
+        return len(new)
+
+    def curve(self, horizons=None):
+        """
+        Mean alpha per group, one `alpha_{h}d` column per horizon.
+        """
+        horizons = list(horizons or range(1, self.max_horizon + 1))
+        mean = (self.sums / self.counts).reindex(columns=horizons)
+        mean.columns = [f"alpha_{h}d" for h in horizons]
+        return mean
+
+    # ---------------------------
+    # Persistence
+    # ---------------------------
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        pd.to_pickle(self, path + ".tmp")
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def resume(cls, path, **kwargs):
+        """
+        Load the state saved at `path` if it was built with the same settings
+        from the same source table, otherwise start empty.
+        """
+        fresh = cls(**kwargs)
+        if os.path.exists(path):
+            state = pd.read_pickle(path)
+            if (state.max_horizon, state.keys, getattr(state, "source", False), getattr(state, "version", 0)) == \
+                    (fresh.max_horizon, fresh.keys, fresh.source, fresh.version):
+                return state
+        return fresh
+
+
+# ---------------------------
+# Block Bootstrap Significance
+# ---------------------------
+def block_bootstrap_means(sums, counts, n_draws, block, rng, batch=1000):
+    """
+    Means of `n_draws` moving-block bootstrap resamples over dates. `sums` /
+    `counts` are the total and the number of observations on each date, in
+    date order. Each resample glues random runs of `block` consecutive dates
+    together and takes every observation on them, which keeps both the
+    autocorrelation of overlapping horizons and the correlation across the
+    tickers of one date.
+    """
+    n = len(sums)
+    block = max(1, min(block, n))
+    n_blocks = -(-n // block)
+    last = n - (n_blocks - 1) * block  # the final block is cut so a resample spans n dates
+    csum = np.concatenate([[0.0], np.cumsum(sums)])
+    ccount = np.concatenate([[0], np.cumsum(counts)])
+    start = np.arange(n - block + 1)
+    block_sum, block_count = csum[start + block] - csum[start], ccount[start + block] - ccount[start]
+    last_sum, last_count = csum[start + last] - csum[start], ccount[start + last] - ccount[start]
+
+    means = np.empty(n_draws)
+    for lo in range(0, n_draws, batch):
+        k = min(batch, n_draws - lo)
+        starts = rng.integers(0, n - block + 1, size=(k, n_blocks))
+        total = block_sum[starts[:, :-1]].sum(axis=1) + last_sum[starts[:, -1]]
+        count = block_count[starts[:, :-1]].sum(axis=1) + last_count[starts[:, -1]]
+        means[lo:lo + k] = total / count
+    return means
+
+
+def _bootstrap_cell(task):
+    key, values, dates, n_draws, block, level, seed = task
+    n = len(values)
+    mean = values.mean()
+    row = {"key": key, "n": n, "n_dates": dates.max() + 1 if n else 0, "mean": mean}
+    if n < 2:
+        return {**row, "t_stat": np.nan, "boot_t_stat": np.nan, "ci_low": np.nan, "ci_high": np.nan, "p_value": np.nan}
+
+    sums, counts = np.bincount(dates, weights=values), np.bincount(dates)
+    means = block_bootstrap_means(sums, counts, n_draws, block, np.random.default_rng(seed))
+    se = means.std(ddof=1)
+    std = values.std(ddof=1)
+    lo, hi = np.quantile(means, [level / 2, 1 - level / 2])
+    return {
+        **row,
+        "t_stat": mean / (std / np.sqrt(n)) if std > 0 else np.nan,
+        "boot_t_stat": mean / se if se > 0 else np.nan,
+        "ci_low": lo,
+        "ci_high": hi,
+        # two-sided: how often the re-centered bootstrap mean is as far from 0 as the estimate
+        "p_value": np.mean(np.abs(means - mean) >= abs(mean)),
+    }
+
+
+def bootstrap_alpha(pairs, keys=("sector_etf", "sentiment_label"), n_draws=10_000, block=5, level=0.05,
+                    workers=None, seed=0):
+    """
+    Block-bootstrap confidence interval, bootstrap t-stat and plain t-stat of
+    the mean alpha in every (*keys, horizon) cell of `alpha_pairs` output.
+    - the cell's dates are resampled in moving blocks of max(`block`, horizon)
+      consecutive dates, taking every row (all tickers) on each drawn date:
+      h-day returns overlap for h - 1 days, and the tickers of one date share
+      the same market moves
+    - cells are spread over a process pool; cell i always draws from child i
+      of SeedSequence(seed), so results do not depend on `workers`
+    """
+    from multiprocessing import Pool
+
+    keys = list(keys) + ["horizon"]
+    pairs = pairs.sort_values(keys + ["date"], kind="stable")
+    tasks = []
+    for key, cell in pairs.groupby(keys, sort=True, observed=True):
+        dates = pd.factorize(cell["date"], sort=True)[0]
+        tasks.append([key, cell["alpha"].to_numpy(float), dates, n_draws, max(block, key[-1]), level])
+    seeds = np.random.SeedSequence(seed).spawn(len(tasks))
+    tasks = [tuple(t) + (s,) for t, s in zip(tasks, seeds)]
+
+    if workers == 1:
+        rows = list(map(_bootstrap_cell, tasks))
+    else:
+        with Pool(workers) as pool:
+            rows = pool.map(_bootstrap_cell, tasks, chunksize=max(1, len(tasks) // (4 * (workers or os.cpu_count() or 1))))
+
+    out = pd.DataFrame(rows)
+    out[keys] = pd.DataFrame(out.pop("key").tolist(), index=out.index)
+    return out.set_index(keys).sort_index()
+
+
+# ---------------------------
+# Dense Cross-Sectional Panel
+# ---------------------------
+LABELS = ["negative", "neutral", "positive"]
+
+
+def sentiment_labels(scores):
+    """
+    "positive" / "negative" / "neutral" from the sign of each score (NaN is
+    neutral), as a categorical (int8 codes). Also maps the int8
+    `sentiment_label` column of full_dataset (-1 / 0 / 1).
+    """
+    sign = np.sign(np.nan_to_num(np.asarray(scores, dtype=float))).astype(np.int8)
+    return pd.Categorical.from_codes(sign + 1, categories=LABELS)
+
+
+def _scatter(df, value_col, dates, columns, column_col):
+    mat = np.full((len(dates), len(columns)), np.nan)
+    row = dates.get_indexer(pd.to_datetime(df["date"]).astype("datetime64[ns]"))
+    col = columns.get_indexer(df[column_col].astype(object))
+    ok = (row >= 0) & (col >= 0)
+    mat[row[ok], col[ok]] = df[value_col].to_numpy(float)[ok]
+    return mat
+
+
+def _row_ranks(mat):
+    # average ranks of each row, NaN stays NaN (ties matter: many scores are exactly 0)
+    return pd.DataFrame(mat).rank(axis=1, method="average").to_numpy()
+
+
+class SentimentPanel:
+    """
+    Dense (date x ticker) arrays for cross-sectional work: sentiment,
+    adj_close and the close of each ticker's sector ETF on the same grid.
+    Every statistic is computed on whole arrays, without long-format merges.
+    - stocks: ['date', 'ticker', 'sector_etf', 'adj_close', 'sentiment_score']
+    - etf_prices: ['date', 'ticker', 'adj_close'] of the sector ETFs
+    """
+    def __init__(self, stocks, etf_prices):
+        self.dates = pd.DatetimeIndex(pd.unique(pd.to_datetime(stocks["date"]).astype("datetime64[ns]"))).sort_values()
+        self.tickers = pd.Index(pd.unique(stocks["ticker"].astype(object)))
+        self.sentiment = _scatter(stocks, "sentiment_score", self.dates, self.tickers, "ticker")
+        self.prices = _scatter(stocks, "adj_close", self.dates, self.tickers, "ticker")
+
+        sectors = stocks.drop_duplicates("ticker").set_index(stocks.drop_duplicates("ticker")["ticker"].astype(object))["sector_etf"]
+        etfs = pd.Index(pd.unique(etf_prices["ticker"].astype(object)))
+        etf_mat = _scatter(etf_prices, "adj_close", self.dates, etfs, "ticker")
+        sector_col = etfs.get_indexer(sectors.reindex(self.tickers).astype(object))
+        self.etf_prices = np.where(sector_col >= 0, etf_mat[:, sector_col], np.nan)
+
+    def forward_alpha(self, h):
+        """
+        (date x ticker) h-day stock return minus sector ETF return, NaN where unavailable.
+        """
+        alpha = np.full(self.prices.shape, np.nan)
+        alpha[:-h] = self.prices[h:] / self.prices[:-h] - self.etf_prices[h:] / self.etf_prices[:-h]
+        return alpha
+
+    def buckets(self, q=5):
+        """
+        Cross-sectional sentiment quantile per date: 0 (lowest) .. q-1, -1 where missing.
+        """
+        ranks = _row_ranks(self.sentiment)
+        n = np.sum(~np.isnan(self.sentiment), axis=1, keepdims=True)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            bucket = np.floor((ranks - 1) / n * q)
+        return np.where(np.isnan(bucket), -1, bucket).astype(int)
+
+    def bucket_alpha(self, q=5, horizons=range(1, 11)):
+        """
+        Mean alpha per (sentiment quantile, horizon).
+        """
+        bucket = self.buckets(q)
+        out = {}
+        for h in horizons:
+            alpha = self.forward_alpha(h)
+            ok = (bucket >= 0) & ~np.isnan(alpha)
+            sums = np.bincount(bucket[ok], weights=alpha[ok], minlength=q)
+            counts = np.bincount(bucket[ok], minlength=q)
+            with np.errstate(invalid="ignore"):
+                out[f"alpha_{h}d"] = sums / counts
+        return pd.DataFrame(out, index=pd.RangeIndex(q, name="bucket"))
+
+    def rank_ic(self, horizons=range(1, 11), min_names=5):
+        """
+        Spearman rank IC per date and horizon: correlation of the cross-
+        sectional ranks of sentiment and of forward alpha, over the tickers
+        that have both. Dates with fewer than `min_names` tickers are NaN.
+        """
+        out = {}
+        for h in horizons:
+            alpha = self.forward_alpha(h)
+            ok = ~np.isnan(self.sentiment) & ~np.isnan(alpha)
+            rs = _row_ranks(np.where(ok, self.sentiment, np.nan))
+            ra = _row_ranks(np.where(ok, alpha, np.nan))
+            n = ok.sum(axis=1, keepdims=True)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                rs = rs - np.nansum(rs, axis=1, keepdims=True) / n
+                ra = ra - np.nansum(ra, axis=1, keepdims=True) / n
+                ic = np.nansum(rs * ra, axis=1) / np.sqrt(np.nansum(rs ** 2, axis=1) * np.nansum(ra ** 2, axis=1))
+            ic[n[:, 0] < min_names] = np.nan
+            out[h] = ic
+        return pd.DataFrame(out, index=pd.DatetimeIndex(self.dates, name="date")).rename_axis(columns="horizon")
+
+
+def ic_summary(ic):
+    """
+    Mean IC, its standard deviation, IC information ratio and t-stat per horizon.
+    """
+    n = ic.notna().sum()
+    mean, std = ic.mean(), ic.std()
+    return pd.DataFrame({"mean_ic": mean, "ic_std": std, "icir": mean / std, "t_stat": mean / std * np.sqrt(n), "n_dates": n})
@@ -0,0 +1,238 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_store import compact_dtypes
+from universe import get_universe
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+OUT_DIR = "data/benchmarks"
+# Synthetic panels use the real sector ETFs and volatility index from the universe registry
+REGISTRY = get_universe()
+SECTOR_ETFS = REGISTRY.sectors
+VIX = REGISTRY.volatility_index
+TICKER_COUNTS = [22, 500, 5000]
+DAY_COUNTS = [60, 2520]
+
+
+# ---------------------------
+# Synthetic Data
+# ---------------------------
+def synthetic_universe(n_tickers):
+    """
+    ticker -> sector ETF map for `n_tickers` synthetic stocks, spread evenly over the sectors.
+    """
+    return {f"S{i:04d}": SECTOR_ETFS[i % len(SECTOR_ETFS)] for i in range(n_tickers)}
+
+
+def _random_walk(rng, n_days, n_series, start, vol):
+    steps = rng.normal(0.0002, vol, size=(n_days, n_series))
+    return start * np.exp(np.cumsum(steps, axis=0))
+
+
+def _long(dates, tickers, values):
+    # (date x ticker) matrix -> long rows sorted by (ticker, date), as read_table returns them
+    return pd.DataFrame({
+        "date": np.tile(dates, len(tickers)),
+        "ticker": pd.Categorical(np.repeat(tickers, len(dates)), categories=sorted(tickers)),
+        "adj_close": values.T.ravel(),
+    })
+
+
+def synthetic_data(n_tickers, n_days, seed=0):
+    """
+    Random-walk stock, sector ETF and VIX prices plus sentiment scores in the
+    schema of the full_dataset and all_sector_etfs_and_vix tables.
+    Returns (full, etf_prices).
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end="2025-06-30", periods=n_days).values.astype("datetime64[ms]")
+    tickers = list(synthetic_universe(n_tickers))
+
+    px = _random_walk(rng, n_days, n_tickers, 100.0, 0.02)
+    full = _long(dates, tickers, px)
+    for k in (1, 3, 5):
+        fwd = np.full(px.shape, np.nan)
+        fwd[:-k] = px[k:] / px[:-k] - 1
+        full[f"return_{k}d"] = fwd.T.ravel()
+    sentiment = np.round(rng.normal(0, 0.5, size=px.shape), 2)
+    sentiment[rng.random(px.shape) < 0.3] = 0.0  # no news that day
+    full["sentiment_score"] = sentiment.T.ravel()
+    universe = synthetic_universe(n_tickers)
+    full["sector_etf"] = pd.Categorical(full["ticker"].map(universe).astype(object), categories=SECTOR_ETFS)
+    full["sentiment_label"] = np.sign(sentiment.T.ravel())
+    compact_dtypes(full)
+
+    etf_px = _random_walk(rng, n_days, len(SECTOR_ETFS), 50.0, 0.01)
+    vix = 18 * np.exp(np.cumsum(rng.normal(0, 0.05, n_days)) * 0.3)
+    etf_prices = _long(dates, SECTOR_ETFS + [VIX], np.column_stack([etf_px, vix]))
+    return full, etf_prices
+
+
+# ---------------------------
+# Timed Steps
+# ---------------------------
+def timed(fn, repeat):
+    """
+    Run `fn` `repeat` times; returns (min seconds, median seconds, last result).
+    """
+    times, out = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    return min(times), float(np.median(times)), out
+
+
+def run_config(n_tickers, n_days, repeat=3):
+    """
+    Time every backtest hot path on one synthetic panel. Must run in a process
+    whose UNIVERSE_FILE points at `synthetic_universe(n_tickers)`.
+    """
+    import multi_agent as ma
+    import multi_agent_evaluation as mae
+    import trade_simulation as ts
+    from feature_store import configure
+
+    configure(enabled=False)  # time the computation, not the feature cache
+    full, etf_prices = synthetic_data(n_tickers, n_days)
+    results = []
+
+    def record(step, fn):
+        best, median, out = timed(fn, repeat)
+        results.append({
+            "tickers": n_tickers, "days": n_days, "rows": len(full), "step": step,
+            "seconds_min": best, "seconds_median": median, "repeat": repeat,
+            "n_out": len(out) if hasattr(out, "__len__") else None,
+        })
+        return out
+
+    # multi_agent
+    shared = record("multi_agent.SharedContext.warm", lambda: ma.SharedContext(full, etf_prices).warm())
+    signals = shared.sector_daily.assign(signal=shared.sector_daily["return_5d"] > 0)
+    record("multi_agent.make_trades", lambda: ma.make_trades(signals, etf_prices))
+    strategy_trades = {}
+    for name in ["strategy_positive", "strategy_momentum", "strategy_reversal", "strategy_value",
+                 "strategy_vix_guard", "strategy_adaptive_vix_neg"]:
+        fn = getattr(ma, name)
+        strategy_trades[name] = record(f"multi_agent.{name}", lambda: fn(full, etf_prices, shared=shared))
+    trades = strategy_trades["strategy_momentum"]
+    portfolio = record("multi_agent.simulate_portfolio", lambda: ma.simulate_portfolio(trades, etf_prices))
+    record("multi_agent_evaluation.evaluate_performance", lambda: [mae.evaluate_performance(portfolio)])
+
+    # trade_simulation
+    sector = record("trade_simulation.build_sector_sentiment", lambda: ts.build_sector_sentiment(full))
+    generated = {
+        "generate_positive_sentiment_trades": record(
+            "trade_simulation.generate_positive_sentiment_trades",
+            lambda: ts.generate_positive_sentiment_trades(sector, etf_prices)),
+        "generate_negative_sentiment_trades": record(
+            "trade_simulation.generate_negative_sentiment_trades",
+            lambda: ts.generate_negative_sentiment_trades(sector, etf_prices)),
+        "generate_negative_sentiment_with_vix_filter": record(
+            "trade_simulation.generate_negative_sentiment_with_vix_filter",
+            lambda: ts.generate_negative_sentiment_with_vix_filter(sector, etf_prices, etf_prices)),
+        "generate_adaptive_vix_sentiment_trades": record(
+            "trade_simulation.generate_adaptive_vix_sentiment_trades",
+            lambda: ts.generate_adaptive_vix_sentiment_trades(sector, etf_prices, etf_prices)),
+    }
+    trades = generated["generate_negative_sentiment_trades"]
+    portfolio = record("trade_simulation.simulate_portfolio", lambda: ts.simulate_portfolio(trades, prices=etf_prices))
+    record("trade_simulation.evaluate_performance", lambda: [ts.evaluate_performance(portfolio)])
+    return results
+
+
+# ---------------------------
+# Runner
+# ---------------------------
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_isolated(n_tickers, n_days, repeat):
+    """
+    Run one configuration in a fresh interpreter with its own synthetic universe.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        universe_file = os.path.join(tmp, "universe.json")
+        with open(universe_file, "w") as f:
+            json.dump({"tickers": synthetic_universe(n_tickers), "volatility_index": VIX,
+                       "sectors": {e: REGISTRY.sector_names.get(e, e) for e in SECTOR_ETFS}}, f)
+        env = dict(os.environ, UNIVERSE_FILE=universe_file, FEATURE_CACHE="0", MPLBACKEND="Agg",
+                   PYTHONPATH=os.pathsep.join(p for p in [HERE, os.environ.get("PYTHONPATH")] if p))
+        cmd = [sys.executable, os.path.abspath(__file__), "--worker", str(n_tickers), str(n_days), "--repeat", str(repeat)]
+        proc = subprocess.run(cmd, cwd=tmp, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"benchmark {n_tickers}x{n_days} failed:\n{proc.stderr}")
+    return json.loads(proc.stdout.splitlines()[-1])
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    key = ["tickers", "days", "step"]
+    old = pd.DataFrame(baseline["results"]).set_index(key)["seconds_min"]
+    new = pd.DataFrame(results).set_index(key)["seconds_min"]
+    table = pd.DataFrame({"baseline_s": old, "current_s": new}).dropna()
+    table["speedup"] = table["baseline_s"] / table["current_s"]
+    print(f"\n⚖️  vs {baseline.get('commit')} ({baseline_path}):")
+    print(table.round(4).to_string())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the backtest hot paths on synthetic universes.")
+    parser.add_argument("--tickers", type=int, nargs="+", default=TICKER_COUNTS)
+    parser.add_argument("--days", type=int, nargs="+", default=DAY_COUNTS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", help=f"result JSON (default: {OUT_DIR}/bench_<commit>_<time>.json)")
+    parser.add_argument("--compare", help="earlier result JSON to compare against")
+    parser.add_argument("--worker", type=int, nargs=2, metavar=("TICKERS", "DAYS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_config(*args.worker, repeat=args.repeat)))
+        return
+
+    commit = git_commit()
+    results = []
+    for n_tickers in args.tickers:
+        for n_days in args.days:
+            print(f"⏱️  {n_tickers} tickers x {n_days} days")
+            results.extend(run_isolated(n_tickers, n_days, args.repeat))
+
+    report = {
+        "commit": commit,
+        "created": pd.Timestamp.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+    out = args.out or os.path.join(OUT_DIR, f"bench_{commit or 'nogit'}_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+
+    table = pd.DataFrame(results).pivot_table(index="step", columns=["tickers", "days"], values="seconds_min", sort=False)
+    print((table * 1000).round(1).to_string())
+    print(f"\n✅ Saved {len(results)} timings (ms above) to {out}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,176 @@
+import argparse
+import os
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
+from data_store import compact_dtypes, drop_table, read_table, write_table
+from feature_store import get_feature
+from instrumentation import span, traced
+from universe import get_universe
+
+# Sentiment source: StockNewsAPI scores by default, or "finbert_sentiment" from finbert_scoring.py
+SENTIMENT_TABLE = os.environ.get("SENTIMENT_TABLE", "stocknewsapi_sentiment_30days")
+PRICE_TABLE = "yahoo_prices_stealth"
+ETF_TABLE = "all_sector_etfs_and_vix"
+STOCK_TABLES = ["merged_sentiment", "merged_prices", "full_dataset"]
+
+
 # === Load files ===
-sentiment_df = pd.read_csv("data/stocknewsapi_sentiment_30days.csv", parse_dates=["date"])
-price_df = pd.read_csv("data/yahoo_prices_stealth.csv", parse_dates=["date"])
-etf_df = pd.read_csv("data/all_sector_etfs_and_vix.csv", parse_dates=["date"])
-
-# === Clean all date fields to just date ===
-sentiment_df["date"] = sentiment_df["date"].dt.date
-price_df["date"] = price_df["date"].dt.date
-etf_df["date"] = etf_df["date"].dt.date
-
-# === Pivot sentiment into ticker/date flat table ===
-sentiment_flat = sentiment_df[["ticker", "date", "sentiment_score"]]
-
-# === Compute forward returns ===
-price_df.sort_values(["ticker", "date"], inplace=True)
-price_df["return_1d"] = price_df.groupby("ticker")["adj_close"].pct_change(periods=1).shift(-1)
-price_df["return_3d"] = price_df.groupby("ticker")["adj_close"].pct_change(periods=3).shift(-3)
-price_df["return_5d"] = price_df.groupby("ticker")["adj_close"].pct_change(periods=5).shift(-5)
-
-# === Merge sentiment with price returns ===
-merged_df = pd.merge(price_df, sentiment_flat, how="left", on=["ticker", "date"])
-merged_df["sentiment_score"].fillna(0, inplace=True)
-
-# === Export clean outputs ===
-sentiment_flat.to_csv("data/merged_sentiment.csv", index=False)
-price_df.to_csv("data/merged_prices.csv", index=False)
-etf_df.to_csv("data/etf_prices.csv", index=False)
-merged_df.to_csv("data/full_dataset.csv", index=False)
-
-print("✅ All files processed and saved:")
-print("- data/merged_sentiment.csv")
-print("- data/merged_prices.csv")
-print("- data/etf_prices.csv")
-print("- data/full_dataset.csv")
\ No newline at end of file
+def load_inputs(sentiment_table=SENTIMENT_TABLE, tickers=None):
+    """
+    Sentiment, stock price and ETF price tables; with `tickers`, only those
+    stocks are read (the ETF table is then not read and comes back as None).
+    """
+    sentiment_df = read_table(sentiment_table, columns=["ticker", "date", "sentiment_score"], tickers=tickers)
+    price_df = read_table(PRICE_TABLE, columns=["date", "adj_close", "ticker"], tickers=tickers)
+    etf_df = read_table(ETF_TABLE, columns=["date", "adj_close", "ticker"]) if tickers is None else None
+    return sentiment_df, price_df, etf_df
+
+
+def clean_etf(etf_df):
+    # === Clean all date fields to just date (midnight datetime64) ===
+    etf_df["date"] = pd.to_datetime(etf_df["date"]).dt.normalize()
+    return compact_dtypes(etf_df)
+
+
+def merge_stocks(sentiment_df, price_df):
+    """
+    The merged_sentiment / merged_prices / full_dataset tables of one set of
+    tickers. Every step is per ticker, so disjoint ticker sets can be merged
+    independently.
+    """
+    # === Clean all date fields to just date (midnight datetime64) ===
+    sentiment_df["date"] = pd.to_datetime(sentiment_df["date"]).dt.normalize()
+    price_df["date"] = pd.to_datetime(price_df["date"]).dt.normalize()
+
+    # === Pivot sentiment into ticker/date flat table ===
+    sentiment_flat = compact_dtypes(sentiment_df[["ticker", "date", "sentiment_score"]].copy())
+    sentiment_flat = sentiment_flat.sort_values(["ticker", "date"], kind="stable", ignore_index=True)
+
+    # === Compute forward returns (in float64, stored as float32) ===
+    price_df.sort_values(["ticker", "date"], inplace=True)
+    price_df = compact_dtypes(price_df.join(get_feature("forward_returns", price_df, horizons=(1, 3, 5))))
+
+    # === Merge sentiment with price returns ===
+    merged_df = pd.merge(price_df, sentiment_flat, how="left", on=["ticker", "date"])
+    merged_df["sentiment_score"] = merged_df["sentiment_score"].fillna(0)
+    merged_df["sector_etf"] = get_universe().sector_etf(merged_df["ticker"])
+    merged_df["sentiment_label"] = np.sign(merged_df["sentiment_score"])
+    compact_dtypes(merged_df)
+
+    return {
+        "merged_sentiment": sentiment_flat,
+        "merged_prices": price_df,
+        "full_dataset": merged_df,
+    }
+
+
+@traced("merge.merge_all", rows=lambda outputs: len(outputs["full_dataset"]))
+def merge_all(sentiment_df, price_df, etf_df):
+    """
+    Build the merged_sentiment / merged_prices / etf_prices / full_dataset tables
+    in the compact schema of `data_store.compact_dtypes`; full_dataset also gets
+    the categorical `sector_etf` and the int8 `sentiment_label` (-1 / 0 / 1).
+    """
+    outputs = merge_stocks(sentiment_df, price_df)
+    outputs["etf_prices"] = clean_etf(etf_df)
+    return {name: outputs[name] for name in ["merged_sentiment", "merged_prices", "etf_prices", "full_dataset"]}
+
+
+# ---------------------------
+# Chunked Merge
+# ---------------------------
+def table_tickers(table):
+    """
+    Sorted stock tickers of one input table; only its ticker column is read.
+    """
+    return sorted(read_table(table, columns=["ticker"])["ticker"].dropna().astype(str).unique())
+
+
+def ticker_partitions(chunk_size, sentiment_table=SENTIMENT_TABLE):
+    """
+    Every stock ticker of the sentiment and price tables, sorted, split into
+    consecutive runs of `chunk_size`, plus the ticker categories of each output
+    table: merged_sentiment holds the sentiment tickers, merged_prices and
+    full_dataset (a left merge onto prices) the price tickers.
+    """
+    sentiment, prices = table_tickers(sentiment_table), table_tickers(PRICE_TABLE)
+    tickers = sorted(set(sentiment) | set(prices))
+    categories = {"merged_sentiment": sentiment, "merged_prices": prices, "full_dataset": prices}
+    return categories, [tickers[i:i + chunk_size] for i in range(0, len(tickers), chunk_size)]
+
+
+def _merge_partition(task):
+    part, tickers, categories, sentiment_table = task
+    with span("merge.partition", part=part, tickers=len(tickers)) as s:
+        sentiment_df, price_df, _ = load_inputs(sentiment_table, tickers=tickers)
+        outputs = merge_stocks(sentiment_df, price_df)
+        for name, frame in outputs.items():
+            if frame.empty:
+                continue
+            # same ticker dictionary in every part of a table, so the parts read back
+            # as one categorical with exactly the categories of the in-memory merge
+            frame["ticker"] = pd.Categorical(frame["ticker"].astype(object), categories=categories[name])
+            write_table(frame, name, part=part)
+        s.rows = len(outputs["full_dataset"])
+    return {name: len(frame) for name, frame in outputs.items()}
+
+
+@traced("merge.merge_chunked", rows=lambda counts: counts["full_dataset"])
+def merge_chunked(chunk_size=200, workers=None, sentiment_table=SENTIMENT_TABLE):
+    """
+    Out-of-core merge: each partition of `chunk_size` tickers is read, merged
+    and written as its own part of the output tables by a process pool, so
+    memory is bounded by the partition, not the universe. Forward returns
+    never cross tickers, and parts are numbered in ticker order, so the tables
+    read back exactly as the in-memory `merge_all` writes them.
+    Returns the row count of each table.
+    """
+    from multiprocessing import Pool
+
+    categories, partitions = ticker_partitions(chunk_size, sentiment_table)
+    for name in STOCK_TABLES:
+        drop_table(name)
+    write_table(clean_etf(read_table(ETF_TABLE, columns=["date", "adj_close", "ticker"])), "etf_prices")
+
+    tasks = [(part, tickers, categories, sentiment_table) for part, tickers in enumerate(partitions)]
+    if workers == 1:
+        counts = list(map(_merge_partition, tasks))
+    else:
+        with Pool(workers) as pool:
+            counts = pool.map(_merge_partition, tasks, chunksize=1)
+    return {name: sum(c[name] for c in counts) for name in STOCK_TABLES}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge sentiment, stock and ETF prices into full_dataset.")
+    parser.add_argument("--chunk-size", type=int, default=0,
+                        help="tickers per partition for the out-of-core merge (default: merge in memory)")
+    parser.add_argument("--workers", type=int, default=None, help="processes for the chunked merge")
+    args = parser.parse_args()
+
+    if args.chunk_size:
+        with span("merge") as s:
+            counts = merge_chunked(args.chunk_size, args.workers)
+            s.rows = counts["full_dataset"]
+        print(f"✅ Merged in partitions of {args.chunk_size} tickers:")
+        for name in ["etf_prices"] + STOCK_TABLES:
+            print(f"- {os.path.join('data', name)}" + (f" ({counts[name]} rows)" if name in counts else ""))
+        return
+
+    with span("merge") as s:
+        with span("merge.load"):
+            inputs = load_inputs()
+        outputs = merge_all(*inputs)
+        s.rows = len(outputs["full_dataset"])
+
+        # === Export clean outputs ===
+        print("✅ All files processed and saved:")
+        with span("merge.write"):
+            for name, frame in outputs.items():
+                print(f"- {write_table(frame, name)}")
+
+
+if __name__ == "__main__":
+    main()
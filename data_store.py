@@ -0,0 +1,143 @@
+import os
+import shutil
+
+import pandas as pd
+
+from instrumentation import span
+
+DATA_DIR = "data"
+CATEGORICAL_COLUMNS = ["ticker", "sector_etf"]
+FLOAT32_COLUMNS = ["sentiment_score", "return_1d", "return_3d", "return_5d"]
+INT8_COLUMNS = ["sentiment_label"]
+PARTITION_COLUMN = "month"
+
+
+# ---------------------------
+# Columnar Data Store
+# ---------------------------
+def table_path(name, root=DATA_DIR):
+    return os.path.join(root, name)
+
+
+def table_exists(name, root=DATA_DIR):
+    return os.path.isdir(table_path(name, root))
+
+
+def compact_dtypes(df):
+    """
+    Downcast a frame to the compact analysis schema (in place, returns it):
+    - date: datetime64
+    - ticker / sector columns: categorical
+    - returns and sentiment scores: float32 (prices stay float64)
+    - sentiment labels: int8
+    """
+    if "date" in df.columns:
+        df["date"] = pd.to_datetime(df["date"])
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    for col in FLOAT32_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("float32")
+    for col in INT8_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("int8")
+    return df
+
+
+def drop_table(name, root=DATA_DIR):
+    shutil.rmtree(table_path(name, root), ignore_errors=True)
+
+
+def write_table(df, name, root=DATA_DIR, partition=True, part=None):
+    """
+    Write a frame as a zstd-compressed Parquet dataset under data/<name>/.
+    - `date` is stored as datetime64 and, if `partition`, hive-partitioned by month
+    - ticker / sector columns are stored as categoricals (dictionary encoded)
+    - part: write the frame as part number `part` of the table (files named
+      part-<part>-*.parquet) next to the other parts instead of replacing the
+      table; parts are read back in part order within each partition
+    Without `part`, the previous contents of the table are replaced.
+    """
+    with span("store.write_table", table=name) as s:
+        s.rows = len(df)
+        df = df.copy()
+        if "date" in df.columns:
+            df["date"] = pd.to_datetime(df["date"])
+        for col in CATEGORICAL_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype("category")
+
+        path = table_path(name, root)
+        if part is None:
+            shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+        prefix = "part-0" if part is None else f"part-{part:05d}"
+
+        if partition and "date" in df.columns:
+            df[PARTITION_COLUMN] = df["date"].dt.strftime("%Y-%m")
+            extra = {} if part is None else {"basename_template": prefix + "-{i}.parquet"}
+            df.to_parquet(path, partition_cols=[PARTITION_COLUMN], compression="zstd", index=False, **extra)
+        else:
+            df.to_parquet(os.path.join(path, prefix + ".parquet"), compression="zstd", index=False)
+    return path
+
+
+def read_table(name, columns=None, start=None, end=None, tickers=None,
+               ticker_col="ticker", root=DATA_DIR):
+    """
+    Read a table written by `write_table`.
+    - columns: column projection (only these columns are decoded)
+    - start / end: inclusive date range, pushed down to month partitions and row groups
+    - tickers: ticker subset, pushed down as an `isin` filter on `ticker_col`
+    """
+    import pyarrow.dataset as ds
+
+    with span("store.read_table", table=name) as s:
+        dataset = ds.dataset(table_path(name, root), format="parquet", partitioning="hive")
+        names = dataset.schema.names
+
+        filt = None
+
+        def add(expr):
+            return expr if filt is None else filt & expr
+
+        if start is not None:
+            start = pd.Timestamp(start)
+            filt = add(ds.field("date") >= start.to_pydatetime())
+            if PARTITION_COLUMN in names:
+                filt = add(ds.field(PARTITION_COLUMN) >= start.strftime("%Y-%m"))
+        if end is not None:
+            end = pd.Timestamp(end)
+            filt = add(ds.field("date") <= end.to_pydatetime())
+            if PARTITION_COLUMN in names:
+                filt = add(ds.field(PARTITION_COLUMN) <= end.strftime("%Y-%m"))
+        if tickers is not None:
+            filt = add(ds.field(ticker_col).isin(list(tickers)))
+
+        if columns is None:
+            columns = [c for c in names if c != PARTITION_COLUMN]
+        df = dataset.to_table(columns=list(columns), filter=filt).to_pandas()
+
+        for col in CATEGORICAL_COLUMNS:
+            if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype("category")
+        s.rows = len(df)
+    return df
+
+
+def count_rows(name, end=None, root=DATA_DIR):
+    """
+    Number of rows of a table, only those dated before `end` if given; month
+    partitions after `end` are skipped and no column but `date` is decoded.
+    """
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(table_path(name, root), format="parquet", partitioning="hive")
+    if end is None:
+        return dataset.count_rows()
+    end = pd.Timestamp(end)
+    filt = ds.field("date") < end.to_pydatetime()
+    if PARTITION_COLUMN in dataset.schema.names:
+        filt = filt & (ds.field(PARTITION_COLUMN) <= end.strftime("%Y-%m"))
+    return dataset.count_rows(filter=filt)
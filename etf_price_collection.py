@@ -1,56 +1,21 @@
-# Add this to your existing price-fetching script using curl_cffi
-sector_etfs = [
-    "XLC", "XLY", "XLP", "XLE", "XLF", "XLV",
-    "XLI", "XLB", "XLRE", "XLK", "XLU", "^VIX"
-]
+from price_fetcher import PriceFetcher
+from price_store import PriceStore, window_start
+from data_store import write_table
+from universe import get_universe
 
-from curl_cffi import requests
-import pandas as pd
-import time
-from datetime import datetime
+# Sector ETFs plus the volatility index
+sector_etfs = get_universe().etfs
 
-headers = {
-    "User-Agent": "Mozilla/5.0",
-    "Accept": "application/json"
-}
+def main():
+    # === Fetch missing ETF/VIX prices into the local store ===
+    store = PriceStore()
+    store.update(sector_etfs, fetcher=PriceFetcher(rate=2.0, max_workers=8))
 
-def fetch_yahoo_price(ticker, range_days="60d", interval="1d"):
-    url = f"https://query1.finance.yahoo.com/v8/finance/chart/{ticker}"
-    params = {
-        "range": range_days,
-        "interval": interval,
-        "includePrePost": "false",
-        "events": "div,splits"
-    }
+    # Combine the trailing 60-day window and save
+    etf_df = store.load(sector_etfs, start=window_start())
+    write_table(etf_df, "all_sector_etfs_and_vix")
+    print("✅ All sector ETFs and VIX saved.")
 
-    r = requests.get(url, headers=headers, impersonate="chrome", params=params, timeout=10)
-    if r.status_code != 200:
-        print(f"[{ticker}] ❌ Error {r.status_code}")
-        return None
 
-    data = r.json()
-    chart = data.get("chart", {}).get("result", [{}])[0]
-    timestamps = chart.get("timestamp", [])
-    prices = chart.get("indicators", {}).get("adjclose", [{}])[0].get("adjclose", [])
-
-    df = pd.DataFrame({
-        "date": [datetime.utcfromtimestamp(ts).date() for ts in timestamps],
-        "adj_close": prices
-    })
-    df["ticker"] = ticker
-    return df
-
-# === Fetch all ETF/VIX prices ===
-etf_data = []
-
-for ticker in sector_etfs:
-    print(f"📥 Fetching {ticker}...")
-    df = fetch_yahoo_price(ticker)
-    if df is not None:
-        etf_data.append(df)
-    time.sleep(1)
-
-# Combine and save
-etf_df = pd.concat(etf_data)
-etf_df.to_csv("data/all_sector_etfs_and_vix.csv", index=False)
-print("✅ All sector ETFs and VIX saved.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+import hashlib
+import inspect
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = "data/feature_cache"
+MAX_BYTES = 512 * 1024 ** 2
+
+FEATURES = {}
+_CODE = {}
+
+
+def feature(name):
+    """
+    Register `fn(*inputs, **params)` as a named feature.
+    """
+    def register(fn):
+        FEATURES[name] = fn
+        return fn
+    return register
+
+
+def code_hash(name):
+    """
+    Hash of the source of feature `name` (its bytecode if the source is not
+    available), so cached results are not served after the feature is edited.
+    Helpers the feature calls are not covered: clear the cache after editing those.
+    """
+    fn = FEATURES[name]
+    if fn not in _CODE:
+        try:
+            code = inspect.getsource(fn).encode()
+        except (OSError, TypeError):
+            code = fn.__code__.co_code + repr(fn.__code__.co_consts).encode()
+        _CODE[fn] = hashlib.sha256(code).hexdigest()
+    return _CODE[fn]
+
+
+# ---------------------------
+# Fingerprints
+# ---------------------------
+def fingerprint(obj):
+    """
+    Content hash of a feature input: frames / series are hashed row by row
+    with pandas' vectorized hasher, together with their columns and dtypes.
+    """
+    h = hashlib.sha256()
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        h.update(type(obj).__name__.encode())
+        if isinstance(obj, pd.DataFrame):
+            h.update(json.dumps([[str(c), str(t)] for c, t in obj.dtypes.items()]).encode())
+        else:
+            h.update(f"{obj.name}|{obj.dtype}".encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(f"{obj.dtype}|{obj.shape}".encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    else:
+        h.update(json.dumps(obj, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+# ---------------------------
+# Feature Store
+# ---------------------------
+class FeatureStore:
+    """
+    Memoizing store for derived frames. A feature is keyed on its name and
+    code, the content hash of its inputs and its parameters, kept in memory and pickled
+    to `root`. The disk cache is evicted least-recently-used first (file mtime
+    is bumped on every hit) once it grows past `max_bytes`.
+    """
+    def __init__(self, root=CACHE_DIR, max_bytes=MAX_BYTES, memory_items=32):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(root, exist_ok=True)
+
+    def key(self, name, inputs, params):
+        parts = [name, code_hash(name)] + [fingerprint(x) for x in inputs] + [fingerprint(params)]
+        return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.root, f"{key}.pkl")
+
+    def get(self, name, *inputs, **params):
+        """
+        Return feature `name` computed on `inputs` with `params`, from memory,
+        from disk, or by computing and persisting it. Treat the result as read-only.
+        A cache file that cannot be unpickled (truncated, corrupt, written by an
+        incompatible version) is recomputed and overwritten.
+        """
+        key = self.key(name, inputs, params)
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.hits += 1
+                return self.memory[key]
+
+        path = self.path(key)
+        try:
+            value = pd.read_pickle(path)
+            os.utime(path)
+            hit = True
+        except Exception:  # missing, or unreadable: FileNotFoundError, EOFError, UnpicklingError, ...
+            hit = False
+            value = FEATURES[name](*inputs, **params)
+            self._write(path, value)
+            self.evict()
+
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self.memory[key] = value
+            while len(self.memory) > self.memory_items:
+                self.memory.popitem(last=False)
+        return value
+
+    def _write(self, path, value):
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        pd.to_pickle(value, tmp)
+        os.replace(tmp, path)
+
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.root):
+            if not name.endswith(".pkl"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.root, name))
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.root, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        with self.lock:
+            self.memory.clear()
+        for name in os.listdir(self.root):
+            if name.endswith(".pkl"):
+                os.remove(os.path.join(self.root, name))
+
+
+_store = None
+
+
+def configure(enabled=True, **kwargs):
+    """
+    Set the process-wide store used by `get_feature`; `enabled=False` makes
+    every request compute directly with no caching.
+    """
+    global _store
+    _store = FeatureStore(**kwargs) if enabled else False
+    return _store
+
+
+def get_feature(name, *inputs, **params):
+    global _store
+    if _store is None:
+        configure(enabled=os.environ.get("FEATURE_CACHE", "1") != "0")
+    if _store is False:
+        return FEATURES[name](*inputs, **params)
+    return _store.get(name, *inputs, **params)
+
+
+# ---------------------------
+# Features
+# ---------------------------
+@feature("forward_returns")
+def forward_returns(prices, horizons=(1, 3, 5)):
+    """
+    Forward return_{k}d = adj_close[t+k] / adj_close[t] - 1 within each ticker,
+    aligned to the index of `prices` (['date', 'ticker', 'adj_close']).
+    """
+    df = prices[["ticker", "date", "adj_close"]].sort_values(["ticker", "date"], kind="stable")
+    grouped = df.groupby("ticker", observed=True)["adj_close"]
+    out = pd.DataFrame(index=df.index)
+    for k in horizons:
+        out[f"return_{k}d"] = grouped.shift(-k) / df["adj_close"] - 1
+    return out.reindex(prices.index)
+
+
+@feature("sector_mean")
+def sector_mean(data, mapping, columns=("sentiment_score",)):
+    """
+    Mean of `columns` per (date, sector_etf), mapping tickers through `mapping`.
+    """
+    from universe import Universe
+
+    return Universe(mapping, volatility_index=None).sector_mean(data, columns)
+
+
+@feature("rolling_mean")
+def rolling_mean(prices, window=20):
+    """
+    Trailing `window`-day mean of adj_close within each ticker, aligned to `prices`.
+    """
+    return prices.groupby("ticker", observed=True)["adj_close"].transform(lambda x: x.rolling(window).mean())
+
+
+@feature("vix_trend")
+def vix_trend(etf_prices):
+    """
+    VIX close per day with its day-over-day `vix_diff` and `vix_falling` flag.
+    """
+    vix = etf_prices[etf_prices["ticker"] == "^VIX"][["date", "adj_close"]].rename(columns={"adj_close": "vix"})
+    vix = vix.sort_values("date", kind="stable")
+    vix["vix_diff"] = vix["vix"].diff()
+    vix["vix_falling"] = vix["vix_diff"] < 0
+    return vix
@@ -0,0 +1,178 @@
+import argparse
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from data_store import write_table
+from news_stream import dedupe, iter_articles
+
+MODEL_NAME = "ProsusAI/finbert"
+NEWS_JSON = "company_news_data.json"
+CACHE_PATH = "data/finbert_cache.parquet"
+OUTPUT_TABLE = "finbert_sentiment"
+LABELS = ["positive", "negative", "neutral"]
+
+
+# ---------------------------
+# Articles
+# ---------------------------
+def load_articles(path=NEWS_JSON):
+    """
+    Stream the ticker -> date -> [articles] corpus (de-duplicated per ticker)
+    into one row per article with the text to score and a stable cache key
+    (hash of the URL). Only the fields needed for scoring are kept.
+    """
+    rows = [
+        {"ticker": ticker, "date": date, "url": article.get("url"), "text": article_text(article)}
+        for ticker, date, article in dedupe(iter_articles(path))
+    ]
+    df = pd.DataFrame(rows, columns=["ticker", "date", "url", "text"])
+    df["article_id"] = [article_id(u, t) for u, t in zip(df["url"], df["text"])]
+    return df
+
+
+def article_text(article):
+    title = (article.get("title") or "").strip()
+    description = (article.get("description") or "").strip()
+    return f"{title}. {description}" if description else title
+
+
+def article_id(url, text):
+    return hashlib.sha1((url or text).encode("utf-8")).hexdigest()
+
+
+# ---------------------------
+# FinBERT Scorer
+# ---------------------------
+class FinBertScorer:
+    """
+    Batched CPU FinBERT inference.
+    - texts are tokenized once, sorted by token length and cut into batches,
+      so each batch is padded only to its own longest text
+    - batches run on a thread pool, the CPU cores split between the workers
+    - `quantize` applies dynamic int8 quantization to the Linear layers
+    The model is only loaded on the first call that has something to score.
+    """
+    def __init__(self, model_name=MODEL_NAME, batch_size=32, max_length=128, workers=2, quantize=True):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.workers = workers
+        self.quantize = quantize
+        self.model = None
+
+    def load(self):
+        import torch
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+        self.torch = torch
+        torch.set_num_threads(max(1, (os.cpu_count() or 1) // self.workers))
+
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        model = AutoModelForSequenceClassification.from_pretrained(self.model_name).eval()
+        if self.quantize:
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model = model
+        id2label = {int(i): label.lower() for i, label in model.config.id2label.items()}
+        self.columns = [id2label[i] for i in range(len(id2label))]
+
+    def buckets(self, texts):
+        """
+        Tokenize without padding, then yield (positions, encodings) batches in length order.
+        """
+        encoded = self.tokenizer(list(texts), truncation=True, max_length=self.max_length)
+        lengths = np.array([len(ids) for ids in encoded["input_ids"]])
+        order = np.argsort(lengths, kind="stable")
+        for start in range(0, len(order), self.batch_size):
+            idx = order[start:start + self.batch_size]
+            batch = {k: [encoded[k][i] for i in idx] for k in encoded.keys()}
+            yield idx, batch
+
+    def _run(self, batch):
+        features = self.tokenizer.pad(batch, return_tensors="pt")
+        with self.torch.inference_mode():
+            logits = self.model(**features).logits
+        return self.torch.softmax(logits, dim=-1).numpy()
+
+    def score(self, texts):
+        """
+        Class probabilities for every text, columns in LABELS order.
+        """
+        probs = np.zeros((len(texts), len(LABELS)), dtype=np.float32)
+        if not len(texts):
+            return probs
+        if self.model is None:
+            self.load()
+        batches = list(self.buckets(texts))
+        order = [self.columns.index(label) for label in LABELS]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for (idx, _), out in zip(batches, pool.map(self._run, [b for _, b in batches])):
+                probs[idx] = out[:, order]
+        return probs
+
+
+# ---------------------------
+# Pipeline
+# ---------------------------
+def load_cache(path=CACHE_PATH):
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=["article_id"] + LABELS)
+    return pd.read_parquet(path)
+
+
+def score_articles(articles, scorer, cache_path=CACHE_PATH):
+    """
+    Attach positive / negative / neutral probabilities and
+    sentiment_score = P(positive) - P(negative) to every article.
+    Only articles whose id is not in the cache are sent to the model.
+    """
+    cache = load_cache(cache_path)
+    new = articles[~articles["article_id"].isin(cache["article_id"])]
+    new = new.drop_duplicates("article_id")
+    print(f"🧠 {len(articles)} articles, {len(new)} new to score")
+
+    if len(new):
+        probs = scorer.score(new["text"].tolist())
+        fresh = pd.DataFrame(probs, columns=LABELS)
+        fresh.insert(0, "article_id", new["article_id"].to_numpy())
+        cache = pd.concat([cache, fresh], ignore_index=True) if len(cache) else fresh
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        cache.to_parquet(cache_path, index=False)
+
+    scored = articles.merge(cache, on="article_id", how="left")
+    scored["sentiment_score"] = scored["positive"] - scored["negative"]
+    return scored
+
+
+def aggregate_daily(scored):
+    """
+    Mean article score per (ticker, date), in the layout data_merge consumes.
+    """
+    daily = scored.groupby(["ticker", "date"]).agg(
+        sentiment_score=("sentiment_score", "mean"),
+        n_articles=("article_id", "size"),
+    ).reset_index()
+    daily["date"] = pd.to_datetime(daily["date"])
+    return daily.sort_values(["ticker", "date"]).reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score the news corpus with FinBERT on CPU.")
+    parser.add_argument("--news", default=NEWS_JSON)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--no-quantize", action="store_true")
+    args = parser.parse_args()
+
+    articles = load_articles(args.news)
+    scorer = FinBertScorer(batch_size=args.batch_size, workers=args.workers, quantize=not args.no_quantize)
+    daily = aggregate_daily(score_articles(articles, scorer))
+    path = write_table(daily, OUTPUT_TABLE)
+    print(f"✅ Saved FinBERT sentiment for {daily['ticker'].nunique()} tickers to: {path}")
+
+
+if __name__ == "__main__":
+    main()
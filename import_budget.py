@@ -0,0 +1,101 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Library modules worker processes import; scripts keep their work behind main()
+MODULES = [
+    "data_store", "universe", "feature_store", "trade_engine", "portfolio_engine",
+    "multi_agent", "multi_agent_evaluation", "trade_simulation", "param_sweep",
+    "alpha_decay", "news_sentiment_alpha", "data_merge", "sentiment_cleaning",
+    "price_fetcher", "price_store", "news_stream", "finbert_scoring", "sentiment_collection_newsapi",
+    "pipeline", "instrumentation",
+]
+HEAVY = ["matplotlib", "seaborn", "torch", "transformers", "scipy"]
+BUDGET = 0.25  # seconds on top of numpy + pandas
+
+_PROBE = """
+import sys, time, json
+import numpy, pandas
+t = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - t
+print("@@" + json.dumps({{"seconds": seconds, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+# ---------------------------
+# Import-Time Budget Check
+# ---------------------------
+def probe(module, repeat=3):
+    """
+    Import `module` in fresh interpreters (from an empty working directory) and
+    return the best import time on top of numpy + pandas, the heavy backends
+    it pulled in, whether it printed anything and which files it created.
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in [HERE, os.environ.get("PYTHONPATH")] if p))
+    best, heavy, output, created = None, [], "", []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as cwd:
+            proc = subprocess.run([sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY)],
+                                  cwd=cwd, env=env, capture_output=True, text=True)
+            created = sorted(os.listdir(cwd))
+        if proc.returncode != 0:
+            return {"module": module, "error": proc.stderr.strip().splitlines()[-1]}
+        lines = proc.stdout.splitlines()
+        result = json.loads(lines[-1][2:])
+        best = result["seconds"] if best is None else min(best, result["seconds"])
+        heavy = result["heavy"]
+        output = "\n".join(lines[:-1])
+    return {"module": module, "seconds": best, "heavy": heavy, "prints": bool(output.strip()), "creates": created}
+
+
+def check(modules=MODULES, budget=BUDGET, repeat=3):
+    """
+    Probe every module; a module fails if it errors, exceeds `budget`, imports
+    a plotting / ML backend, prints, or writes files on import.
+    """
+    results, failed = [], []
+    for module in modules:
+        r = probe(module, repeat)
+        problems = []
+        if "error" in r:
+            problems.append(r["error"])
+        else:
+            if r["seconds"] > budget:
+                problems.append(f"{r['seconds']:.3f}s > {budget:.3f}s")
+            if r["heavy"]:
+                problems.append("imports " + ", ".join(r["heavy"]))
+            if r["prints"]:
+                problems.append("prints on import")
+            if r["creates"]:
+                problems.append("creates " + ", ".join(r["creates"]))
+        r["problems"] = problems
+        results.append(r)
+        if problems:
+            failed.append(module)
+    return results, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that library modules import fast and without side effects.")
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--budget", type=float, default=BUDGET, help="seconds allowed on top of numpy + pandas")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    results, failed = check(args.modules, args.budget, args.repeat)
+    for r in results:
+        seconds = f"{r['seconds'] * 1000:7.1f} ms" if "seconds" in r else "      -   "
+        status = "❌ " + "; ".join(r["problems"]) if r["problems"] else "✅"
+        print(f"{r['module']:<30} {seconds}  {status}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
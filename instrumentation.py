@@ -0,0 +1,261 @@
+import cProfile
+import functools
+import json
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+TRACE_ENV = "TRACE_FILE"
+MEMORY_ENV = "TRACE_MEMORY"
+PROFILE_ENV = "PROFILE_DIR"
+
+
+# ---------------------------
+# Tracer
+# ---------------------------
+class Tracer:
+    """
+    Collects one JSON record per finished span and appends it to `path`
+    (JSON lines) if given.
+    - memory: trace Python allocations with tracemalloc and record each span's
+      peak (process-wide, so concurrent spans share the reading)
+    - profile_dir: run cProfile around every top-level span of a thread and
+      dump `<profile_dir>/<span>-<pid>-<n>.prof` (open with snakeviz,
+      flameprof or `python -m pstats`)
+    """
+    def __init__(self, path=None, memory=False, profile_dir=None):
+        self.path = path
+        self.memory = memory
+        self.profile_dir = profile_dir
+        self.records = []
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.counter = 0
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def stack(self):
+        if not hasattr(self.local, "stack"):
+            self.local.stack = []
+        return self.local.stack
+
+    def emit(self, record):
+        with self.lock:
+            self.records.append(record)
+            if self.path:
+                with open(self.path, "a") as f:
+                    f.write(json.dumps(record, default=str) + "\n")
+
+    def next_id(self):
+        with self.lock:
+            self.counter += 1
+            return self.counter
+
+
+class Span:
+    """
+    A timed region. Set `rows` (or any attribute via `set`) while it is open;
+    the record is emitted when it closes.
+    """
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = dict(attrs)
+        self.rows = None
+        self.peak = 0
+        self.profiler = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+        return self
+
+    def __enter__(self):
+        tracer = self.tracer
+        stack = tracer.stack()
+        self.parent = stack[-1] if stack else None
+        self.id = tracer.next_id()
+        stack.append(self)
+
+        if tracer.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self.parent is not None:
+                self.parent.peak = max(self.parent.peak, peak)
+            tracemalloc.reset_peak()
+            self.mem_start = current
+        if tracer.profile_dir and self.parent is None:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self.start_wall = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.start
+        tracer = self.tracer
+        tracer.stack().pop()
+
+        record = {
+            "span": self.name,
+            "id": self.id,
+            "parent": self.parent.id if self.parent else None,
+            "thread": threading.current_thread().name,
+            "pid": os.getpid(),
+            "start": self.start_wall,
+            "seconds": seconds,
+            "rows": self.rows,
+            "ok": exc_type is None,
+            **self.attrs,
+        }
+        if tracer.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            self.peak = max(self.peak, peak)
+            record["peak_mb"] = round((self.peak - self.mem_start) / 1e6, 3)
+            if self.parent is not None:
+                self.parent.peak = max(self.parent.peak, self.peak)
+        if resource is not None:
+            # ru_maxrss is KiB on Linux (bytes on macOS): a process-lifetime high-water mark
+            record["max_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+        if self.profiler is not None:
+            self.profiler.disable()
+            slug = re.sub(r"[^A-Za-z0-9_.-]", "_", self.name)
+            path = os.path.join(tracer.profile_dir, f"{slug}-{os.getpid()}-{self.id}.prof")
+            self.profiler.dump_stats(path)
+            record["profile"] = path
+        tracer.emit(record)
+        return False
+
+
+class _NullSpan:
+    rows = None
+
+    def set(self, **attrs):
+        return self
+
+    def __setattr__(self, name, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL = _NullSpan()
+_tracer = None
+
+
+def configure(path=None, memory=False, profile_dir=None, enabled=True):
+    """
+    Set the process-wide tracer; `enabled=False` turns every span into a no-op.
+    """
+    global _tracer
+    _tracer = Tracer(path, memory, profile_dir) if enabled else False
+    return _tracer
+
+
+def get_tracer():
+    """
+    The process-wide tracer, configured from $TRACE_FILE / $TRACE_MEMORY /
+    $PROFILE_DIR on first use; None if none of them is set.
+    """
+    global _tracer
+    if _tracer is None:
+        path, memory, profile_dir = os.environ.get(TRACE_ENV), os.environ.get(MEMORY_ENV) == "1", os.environ.get(PROFILE_ENV)
+        configure(path, memory, profile_dir, enabled=bool(path or memory or profile_dir))
+    return _tracer or None
+
+
+# ---------------------------
+# Public API
+# ---------------------------
+def span(name, **attrs):
+    """
+    Context manager timing the block as `name`:
+
+        with span("merge.write", table=name) as s:
+            ...
+            s.rows = len(frame)
+    """
+    tracer = get_tracer()
+    return Span(tracer, name, attrs) if tracer else _NULL
+
+
+def traced(name=None, rows=len):
+    """
+    Decorator running the function inside a span (default name module.function).
+    `rows(result)` gives the row count; pass rows=None to skip it.
+    """
+    def wrap(fn):
+        module = fn.__module__
+        if module == "__main__":  # name spans after the script, not "__main__"
+            module = os.path.splitext(os.path.basename(getattr(sys.modules[module], "__file__", module)))[0]
+        label = name or f"{module}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not get_tracer():
+                return fn(*args, **kwargs)
+            with span(label) as s:
+                out = fn(*args, **kwargs)
+                if rows is not None and out is not None:
+                    try:
+                        s.rows = rows(out)
+                    except TypeError:
+                        pass
+                return out
+        return inner
+    return wrap
+
+
+def records():
+    tracer = get_tracer()
+    return list(tracer.records) if tracer else []
+
+
+def summary(trace=None):
+    """
+    Total seconds, calls, rows and peak memory per span name, from the
+    in-process records or from a JSON-lines trace file.
+    """
+    import pandas as pd
+
+    if isinstance(trace, str):
+        with open(trace) as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    else:
+        rows = trace if trace is not None else records()
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return df
+    agg = {"seconds": ["sum", "count", "max"], "rows": "sum"}
+    if "peak_mb" in df:
+        agg["peak_mb"] = "max"
+    out = df.groupby("span").agg(agg)
+    out.columns = ["_".join(c) for c in out.columns]
+    return out.sort_values("seconds_sum", ascending=False)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarize a JSON-lines trace written via $TRACE_FILE.")
+    parser.add_argument("trace")
+    args = parser.parse_args()
+    print(summary(args.trace).round(4).to_string())
+
+
+if __name__ == "__main__":
+    main()
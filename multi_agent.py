@@ -1,15 +1,27 @@
 import pandas as pd
 import numpy as np
+from collections import deque
 from datetime import timedelta
+from functools import cached_property
+
+from feature_store import get_feature
+from instrumentation import span, traced
+from portfolio_engine import simulate_daily
+from trade_engine import PriceIndex, build_trades
+from universe import get_universe
+
+universe = get_universe()
+stock_to_etf = universe.stock_to_etf
+
+# Starting cash of the agents' books: a 10k position (trade_engine's default
+# capital) in every sector ETF on each day of a 5-day hold, so at cost the
+# default agents are never turned away for lack of cash, as before the daily
+# engine. Losing streaks and longer holds can hit it. param_sweep scores the
+# agent_* strategies on this book too.
+TRADE_CAPITAL = 10_000
+MAX_HOLD_DAYS = 5
+START_CASH = TRADE_CAPITAL * MAX_HOLD_DAYS * len(universe.sectors)
 
-stock_to_etf = {
-        "AAPL": "XLK", "MSFT": "XLK", "JNJ": "XLV", "PFE": "XLV",
-        "XOM": "XLE", "CVX": "XLE", "JPM": "XLF", "BAC": "XLF",
-        "WMT": "XLP", "PG": "XLP", "NEE": "XLU", "DUK": "XLU",
-        "UNP": "XLI", "UPS": "XLI", "TMO": "XLV", "ABT": "XLV",
-        "HD": "XLY", "MCD": "XLY", "AMT": "XLRE", "PLD": "XLRE",
-        "NFLX": "XLC", "GOOG": "XLC"
-    }
 # ---------------------------
 # Agent Class
 # ---------------------------
@@ -19,126 +31,503 @@ class Agent:
         self.strategy_fn = strategy_fn
         self.trades = None
         self.portfolio = None
+        self.live = None
+        self.book = None
+
+    def run(self, data, etf_prices, shared=None):
+        with span("agent.run", agent=self.name) as s:
+            with span("agent.strategy", agent=self.name) as st:
+                self.trades = self.strategy_fn(data, etf_prices, shared=shared)
+                st.rows = len(self.trades)
+            with span("agent.simulate", agent=self.name) as sim:
+                self.portfolio = simulate_portfolio(self.trades, etf_prices)
+                sim.rows = len(self.portfolio)
+            s.rows = len(self.trades)
 
-    def run(self, data, etf_prices):
-        self.trades = self.strategy_fn(data, etf_prices)
-        self.portfolio = simulate_portfolio(self.trades)
+    def on_bar(self, date, new_sentiment, new_prices, live=None):
+        """
+        Streaming twin of `run`: feed one day and get the orders it produced.
+        - new_sentiment: the day's ['ticker', 'sentiment_score'] rows
+        - new_prices: the day's ['ticker', 'adj_close'] rows of stocks, sector ETFs and VIX
+        - live: a LiveContext shared with other agents (default: the agent's own)
+        Returns the new orders ['date', 'ticker', 'entry_price', 'known_on'];
+        finished trades collect in `self.book`.
+        """
+        if live is None:
+            live = self.live = self.live or LiveContext()
+        live.update(date, new_sentiment, new_prices)
+        signal_fn, hold_days = LIVE_SIGNALS[self.strategy_fn]
+        self.book = self.book or LiveBook(hold_days)
+        self.book.advance(live)
+        return self.book.enter(signal_fn(live), live)
+
+    def finish(self, live=None):
+        """
+        End of stream: resolve the days still waiting for their return_5d and
+        return every trade, open ones with an empty exit, as `run` would.
+        """
+        live = live or self.live
+        live.flush()
+        signal_fn, hold_days = LIVE_SIGNALS[self.strategy_fn]
+        self.book = self.book or LiveBook(hold_days)
+        self.book.enter(signal_fn(live), live)
+        return self.book.trades()
+
+# ---------------------------
+# Shared Intermediates
+# ---------------------------
+class SharedContext:
+    """
+    Intermediates several strategies need, computed once per (data, etf_prices)
+    and handed to every agent. Strategies must treat them as read-only.
+    - mapped: data with its `sector_etf` column
+    - sector_daily: mean sentiment_score / return_5d per (date, sector_etf)
+    - vix: VIX series with its `diff` and `vix_falling` flag
+    - price_index: PriceIndex over etf_prices for trade construction
+    - etf_ma(window): sector ETF rows with their trailing mean price
+    Each one is built lazily on first use; call `warm()` to build all up front.
+    """
+    def __init__(self, data, etf_prices):
+        self.data = data
+        self.etf_prices = etf_prices
+        self.parent = None
+        self.bounds = None
+        self.moving_averages = {}
+
+    @cached_property
+    def mapped(self):
+        if "sector_etf" in self.data.columns:  # full_dataset already carries it
+            return self.data
+        return self.data.assign(sector_etf=universe.sector_etf(self.data["ticker"]))
+
+    @cached_property
+    def sector_daily(self):
+        return get_feature("sector_mean", self.data, stock_to_etf, columns=("sentiment_score", "return_5d"))
+
+    @cached_property
+    def vix(self):
+        return get_feature("vix_trend", self.etf_prices)
+
+    @cached_property
+    def price_index(self):
+        return PriceIndex(self.etf_prices)
+
+    def etf_ma(self, window):
+        """
+        Non-VIX ETF rows with `ma`, the trailing `window`-day mean of adj_close.
+        A `window()` context slices its parent's series instead of recomputing,
+        so the mean has its warm-up history and the feature cache is not hit.
+        """
+        if window not in self.moving_averages:
+            if self.parent is not None:
+                self.moving_averages[window] = _in_range(self.parent.etf_ma(window), *self.bounds)
+            else:
+                price = self.etf_prices[self.etf_prices["ticker"] != "^VIX"]
+                self.moving_averages[window] = price.assign(ma=get_feature("rolling_mean", price, window=window))
+        return self.moving_averages[window]
+
+    def warm(self):
+        for name in ["mapped", "sector_daily", "vix", "price_index"]:
+            getattr(self, name)
+        return self
+
+    def window(self, start, end):
+        """
+        Context for start <= date < end, sliced from this context's intermediates
+        instead of recomputing them (so VIX diffs and moving averages keep their
+        history from before `start`). The price index is shared as is, letting
+        exits run past `end`.
+        """
+        self.warm()
+        ctx = SharedContext(_in_range(self.data, start, end), _in_range(self.etf_prices, start, end))
+        ctx.parent, ctx.bounds = self, (start, end)
+        ctx.__dict__.update(
+            mapped=_in_range(self.mapped, start, end),
+            sector_daily=_in_range(self.sector_daily, start, end),
+            vix=_in_range(self.vix, start, end),
+            price_index=self.price_index,
+        )
+        return ctx
+
+
+def _in_range(df, start, end):
+    return df[(df["date"] >= start) & (df["date"] < end)]
 
 # ---------------------------
 # Utility: Portfolio Simulation
 # ---------------------------
-def simulate_portfolio(trades):
+def simulate_portfolio(trades, prices=None, start_cash=START_CASH):
+    """
+    With `prices`, run the daily cash-constrained, marked-to-market engine
+    (a trade is skipped if its capital exceeds the cash on hand that day);
+    otherwise just accumulate realized PnL on exit dates. Both start from
+    `start_cash`, see START_CASH.
+    """
     if trades is None or trades.empty:
         return pd.DataFrame()
+    if prices is not None:
+        portfolio, _ = simulate_daily(trades, prices, start_cash=start_cash)
+        return portfolio
     trades = trades.copy()
     trades["pnl"] = trades["capital"] * trades["return"]
 
     pnl_by_date = trades.groupby("exit_date")["pnl"].sum().sort_index()
     portfolio = pnl_by_date.cumsum().rename("portfolio_value").to_frame()
-    portfolio["portfolio_value"] += 22000  # initial capital
+    portfolio["portfolio_value"] += start_cash  # initial capital
     return portfolio
 
 # ---------------------------
 # Strategy 1: Positive Sentiment
 # ---------------------------
-def strategy_positive(data, etf_prices):
-    df = data.copy()
-    df = df[df["sentiment_score"] > 0]
-    df["sector_etf"] = df["ticker"].map(stock_to_etf)
-    signals = df.groupby(["date", "sector_etf"])["sentiment_score"].mean().reset_index()
+def strategy_positive(data, etf_prices, threshold=0, hold_days=1, shared=None):
+    shared = shared or SharedContext(data, etf_prices)
+    df = shared.mapped[shared.mapped["sentiment_score"] > threshold]
+    signals = df.groupby(["date", "sector_etf"], observed=True)["sentiment_score"].mean().reset_index()
     signals["signal"] = True
 
-    return make_trades(signals, etf_prices, hold_days=1)
+    return make_trades(signals, etf_prices, hold_days=hold_days, index=shared.price_index)
 
 # ---------------------------
 # Strategy 2: Momentum
 # ---------------------------
-def strategy_momentum(data, etf_prices):
-    df = data.copy()
-    df["sector_etf"] = df["ticker"].map(stock_to_etf)
-    signals = df.groupby(["date", "sector_etf"])["return_5d"].mean().reset_index()
-    signals["signal"] = signals["return_5d"] > 0
-    return make_trades(signals, etf_prices, hold_days=5)
+def strategy_momentum(data, etf_prices, threshold=0, hold_days=5, shared=None):
+    shared = shared or SharedContext(data, etf_prices)
+    signals = shared.sector_daily[["date", "sector_etf", "return_5d"]].copy()
+    signals["signal"] = signals["return_5d"] > threshold
+    return make_trades(signals, etf_prices, hold_days=hold_days, index=shared.price_index)
 
 # ---------------------------
 # Strategy 3: Reversal
 # ---------------------------
-def strategy_reversal(data, etf_prices):
-    df = data.copy()
-    df["sector_etf"] = df["ticker"].map(stock_to_etf)
-    signals = df.groupby(["date", "sector_etf"])[["return_5d", "sentiment_score"]].mean().reset_index()
-    signals["signal"] = (signals["return_5d"] < 0) & (signals["sentiment_score"] < 0)
-    return make_trades(signals, etf_prices, hold_days=5)
+def strategy_reversal(data, etf_prices, return_threshold=0, sentiment_threshold=0, hold_days=5, shared=None):
+    shared = shared or SharedContext(data, etf_prices)
+    signals = shared.sector_daily.copy()
+    signals["signal"] = (signals["return_5d"] < return_threshold) & (signals["sentiment_score"] < sentiment_threshold)
+    return make_trades(signals, etf_prices, hold_days=hold_days, index=shared.price_index)
 
 # ---------------------------
 # Strategy 4: Value
 # ---------------------------
-def strategy_value(data, etf_prices):
-    price = etf_prices[etf_prices["ticker"] != "^VIX"].copy()
-    price["ma20"] = price.groupby("ticker")["adj_close"].transform(lambda x: x.rolling(20).mean())
-    price["signal"] = price["adj_close"] < price["ma20"]
-    signals = price[["date", "ticker", "signal"]].copy()
-    return make_trades(signals, price, ticker_col="ticker", hold_days=5)
+def strategy_value(data, etf_prices, window=20, hold_days=5, shared=None):
+    shared = shared or SharedContext(data, etf_prices)
+    price = shared.etf_ma(window)
+    signals = price[["date", "ticker"]].assign(signal=price["adj_close"] < price["ma"])
+    return make_trades(signals, price, ticker_col="ticker", hold_days=hold_days, index=shared.price_index)
 
 # ---------------------------
 # Strategy 5: Volatility Aversion
 # ---------------------------
-def strategy_vix_guard(data, etf_prices):
-    vix = etf_prices[etf_prices["ticker"] == "^VIX"][["date", "adj_close"]].rename(columns={"adj_close": "vix"})
-    df = data.merge(vix, on="date")
-    low_vix = df[df["vix"] < 18].copy()
-    low_vix["sector_etf"] = low_vix["ticker"].map(stock_to_etf)
-    signals = low_vix.groupby(["date", "sector_etf"])["return_5d"].mean().reset_index()
+def strategy_vix_guard(data, etf_prices, vix_threshold=18, hold_days=5, shared=None):
+    shared = shared or SharedContext(data, etf_prices)
+    # VIX is one value per day, so filtering rows on it equals filtering the sector/day means
+    low_vix_dates = shared.vix.loc[shared.vix["vix"] < vix_threshold, "date"]
+    signals = shared.sector_daily[shared.sector_daily["date"].isin(low_vix_dates)][["date", "sector_etf", "return_5d"]].copy()
     signals["signal"] = signals["return_5d"] > 0
-    return make_trades(signals, etf_prices, hold_days=5)
+    return make_trades(signals, etf_prices, hold_days=hold_days, index=shared.price_index)
 
 # ---------------------------
 # Strategy 6: Adaptive VIX + Negative Sentiment
 # ---------------------------
-def strategy_adaptive_vix_neg(data, etf_prices):
-    vix = etf_prices[etf_prices["ticker"] == "^VIX"][["date", "adj_close"]].rename(columns={"adj_close": "vix"})
-    vix["vix_falling"] = vix["vix"].diff() < 0
-    df = data.merge(vix, on="date")
-    df = df[(df["sentiment_score"] < -0.3) & (df["vix_falling"])]
-    df["sector_etf"] = df["ticker"].map(stock_to_etf)
+def strategy_adaptive_vix_neg(data, etf_prices, sentiment_threshold=-0.3, hold_days=5, shared=None):
+    shared = shared or SharedContext(data, etf_prices)
+    falling_dates = shared.vix.loc[shared.vix["vix_falling"], "date"]
+    df = shared.mapped
+    df = df[(df["sentiment_score"] < sentiment_threshold) & df["date"].isin(falling_dates)]
 
-    signals = df.groupby(["date", "sector_etf"])["sentiment_score"].mean().reset_index()
+    signals = df.groupby(["date", "sector_etf"], observed=True)["sentiment_score"].mean().reset_index()
     signals["signal"] = True
-    return make_trades(signals, etf_prices, hold_days=5)
+    return make_trades(signals, etf_prices, hold_days=hold_days, index=shared.price_index)
 
 # ---------------------------
 # Shared Trade Generator
 # ---------------------------
-def make_trades(signal_df, price_df, ticker_col="sector_etf", hold_days=5):
-    entries = signal_df[signal_df["signal"]].copy()
-    entries = entries.rename(columns={ticker_col: "ticker"})
-    entries = pd.merge(entries, price_df, on=["date", "ticker"], how="inner")
-    entries = entries.rename(columns={"adj_close": "entry_price"})
-    entries["exit_date"] = entries["date"] + pd.Timedelta(days=int(hold_days))
-
-    exits = price_df.rename(columns={"date": "exit_date", "adj_close": "exit_price"})
-    trades = pd.merge(entries, exits, on=["exit_date", "ticker"], how="left")
-    trades["return"] = trades["exit_price"] / trades["entry_price"] - 1
-    trades["capital"] = 10000
+@traced()
+def make_trades(signal_df, price_df, ticker_col="sector_etf", hold_days=5, index=None):
+    entries = signal_df[signal_df["signal"].fillna(False).astype(bool)]
+    trades = build_trades(entries, price_df, ticker_col=ticker_col, hold_days=hold_days, index=index)
     return trades[["date", "exit_date", "ticker", "entry_price", "exit_price", "return", "capital"]]
 
+# ---------------------------
+# Live Mode: Rolling State
+# ---------------------------
+RETURN_LAG = 5  # return_5d of a day is only known 5 bars later
+
+
+class LiveContext:
+    """
+    Rolling state for feeding the strategies one day (bar) at a time, the
+    streaming twin of SharedContext; one context can serve every agent.
+    - per stock: its last 5 closes, which resolve return_5d of the row 5 bars back
+    - per ETF: the last `history` (row, date, close) bars for entry / exit
+      prices and a `window`-bar buffer for its moving average
+    - VIX: the previous close
+    After `update`, the bar exposes:
+    - today: the day's sentiment rows with their sector_etf
+    - vix / vix_falling: the day's VIX close and whether it fell
+    - below_ma: ETFs closing under their `window`-bar moving average
+    - resolved: the sector_daily rows (plus that day's vix) of the days whose
+      return_5d became known on this bar
+    Each bar costs O(tickers). Strategies reading return_5d (a forward return)
+    get day t's signal on bar t + 5, the look-ahead of the batch backtest.
+
+    Every stock's rows resolve on their own. A sentiment row without a price
+    bar that day, or of a stock that has had no bar for `max_gap` bars (taken
+    as ended, e.g. delisted), gets NaN return_5d as in the batch data, so one
+    stock never holds back the other days. Gaps shorter than `max_gap` are
+    bridged by the stock's next bars, as in the batch data; a stock resuming
+    after a longer gap keeps NaN for the rows before it.
+    """
+    def __init__(self, window=20, history=64, max_gap=10):
+        self.window = window
+        self.history = max(history, RETURN_LAG + max_gap + window)
+        self.max_gap = max_gap
+        n = len(universe.tickers)
+        self.closes = np.full((n, RETURN_LAG), np.nan)
+        self.close_dates = np.full((n, RETURN_LAG), np.datetime64("NaT"), dtype="datetime64[ns]")
+        self.seen = np.zeros(n, dtype=np.int64)
+        self.last_bar = np.full(n, -1, dtype=np.int64)
+        self.bar = -1
+        self.etf_bars = {}
+        self.etf_count = {}
+        self.ma = {}
+        self.prev_vix = np.nan
+        self.pending = {}
+        self.date = None
+        self.flushed = False
+
+    def update(self, date, new_sentiment, new_prices):
+        """
+        Fold in one bar; a no-op if this date was already fed (shared context).
+        Price rows must be universe stocks, sector ETFs or the volatility
+        index; a bar with any other ticker is rejected before it is folded in.
+        """
+        date = pd.Timestamp(date)
+        if self.date is not None and date <= self.date:
+            if date == self.date:
+                return self
+            raise ValueError(f"bar {date.date()} arrived after {self.date.date()}")
+
+        tickers = new_prices["ticker"].to_numpy(dtype=object)
+        closes = new_prices["adj_close"].to_numpy(dtype=np.float64)
+        codes = universe.ticker_codes(tickers)
+        stock = codes >= 0
+        etf = np.isin(tickers, universe.etfs)
+        if not (stock | etf).all():
+            unknown = sorted(set(tickers[~(stock | etf)]))
+            raise ValueError(f"bar {date.date()} has tickers outside the universe: {', '.join(map(str, unknown))}")
+        self.date = date
+        self.bar += 1
+        self._etf_bar(date, tickers[etf], closes[etf])
+
+        self.today = pd.DataFrame({
+            "date": pd.Series(date, index=range(len(new_sentiment)), dtype="datetime64[ns]"),
+            "ticker": new_sentiment["ticker"].to_numpy(dtype=object),
+            "sentiment_score": new_sentiment["sentiment_score"].to_numpy(),
+        })
+        self.today["sector_etf"] = universe.sector_etf(self.today["ticker"])
+        self._hold(self.today)
+        self._stock_bar(date, codes[stock], closes[stock])
+        self._expire()
+        self.resolved = self._finalize()
+        return self
+
+    def _etf_bar(self, date, tickers, closes):
+        self.vix, self.vix_falling, self.below_ma = np.nan, False, []
+        for ticker, close in zip(tickers, closes):
+            n = self.etf_count.get(ticker, 0)
+            self.etf_bars.setdefault(ticker, deque(maxlen=self.history)).append((n, date, close))
+            self.etf_count[ticker] = n + 1
+            if ticker == universe.volatility_index:
+                self.vix, self.vix_falling = close, bool(close - self.prev_vix < 0)
+                self.prev_vix = close
+                continue
+            ma = self.ma.setdefault(ticker, deque(maxlen=self.window))
+            ma.append(close)
+            if len(ma) == self.window and close < np.mean(ma):
+                self.below_ma.append(ticker)
+
+    def _hold(self, rows):
+        # rows wait here until every stock in them has its 5th later close
+        codes = universe.ticker_codes(rows["ticker"])
+        position = np.full(len(universe.tickers), -1)
+        position[codes[codes >= 0]] = np.flatnonzero(codes >= 0)
+        self.pending[self.date] = {
+            "rows": rows[["date", "ticker", "sentiment_score"]].assign(return_5d=np.float32(np.nan)),
+            "codes": codes,
+            "position": position,
+            "done": codes < 0,
+            "vix": self.vix,
+        }
+
+    def _stock_bar(self, date, codes, closes):
+        slot = self.seen[codes] % RETURN_LAG
+        full = self.seen[codes] >= RETURN_LAG
+        start_dates = self.close_dates[codes, slot]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rets = (closes / self.closes[codes, slot] - 1).astype(np.float32)
+        for start in np.unique(start_dates[full]):
+            cell = self.pending.get(pd.Timestamp(start))
+            if cell is None:
+                continue
+            mask = full & (start_dates == start)
+            pos = cell["position"][codes[mask]]
+            ok = pos >= 0
+            cell["rows"].iloc[pos[ok], cell["rows"].columns.get_loc("return_5d")] = rets[mask][ok]
+            cell["done"][pos[ok]] = True
+        self.closes[codes, slot] = closes
+        self.close_dates[codes, slot] = date
+        self.seen[codes] += 1
+        self.last_bar[codes] = self.bar
+
+    def _expire(self):
+        # rows that will never get a 5th later close keep NaN: no bar on their
+        # own day, or the stock has gone `max_gap` bars without one
+        gone = self.bar - self.last_bar >= self.max_gap
+        for date, cell in self.pending.items():
+            ok = cell["codes"] >= 0
+            if date == self.date:
+                cell["done"][ok] |= self.last_bar[cell["codes"][ok]] != self.bar
+            cell["done"][ok] |= gone[cell["codes"][ok]]
+
+    def _finalize(self, force=False):
+        out = []
+        for date in sorted(self.pending):
+            cell = self.pending[date]
+            if not (force or cell["done"].all()):
+                continue
+            del self.pending[date]
+            daily = universe.sector_mean(cell["rows"], columns=("sentiment_score", "return_5d"))
+            out.append(daily.assign(vix=cell["vix"]))
+        if not out:
+            return pd.DataFrame(columns=["date", "sector_etf", "sentiment_score", "return_5d", "vix"])
+        return pd.concat(out, ignore_index=True)
+
+    def flush(self):
+        """
+        End of stream: the days still pending keep NaN return_5d (as in the
+        batch data) and come out in `resolved`; there is no new bar.
+        """
+        if not self.flushed:
+            self.flushed = True
+            self.today = self.today.iloc[:0]
+            self.vix, self.vix_falling, self.below_ma = np.nan, False, []
+            self.resolved = self._finalize(force=True)
+        return self
+
+    def etf_bar(self, ticker, date=None, row=None):
+        """
+        (row, date, close) of an ETF bar by date or by row number, None if not in the history.
+        """
+        for bar in reversed(self.etf_bars.get(ticker, ())):
+            if (row is not None and bar[0] == row) or (date is not None and bar[1] == date):
+                return bar
+        return None
+
+
+class LiveBook:
+    """
+    One agent's open positions and finished trades in live mode: each entry
+    exits on the `hold_days`-th bar of its ETF after entry, as in build_trades.
+    Entries without an ETF bar on their date are skipped, as in build_trades.
+    """
+    def __init__(self, hold_days, capital=TRADE_CAPITAL):
+        self.hold_days = hold_days
+        self.capital = capital
+        self.open = []
+        self.closed = []
+
+    def enter(self, entries, live):
+        orders = []
+        for date, ticker in zip(entries["date"], entries["ticker"].astype(object)):
+            date = pd.Timestamp(date)
+            bar = live.etf_bar(ticker, date=date)
+            if bar is None:
+                bars = live.etf_bars.get(ticker)
+                if bars and len(bars) == bars.maxlen and date < bars[0][1]:
+                    raise RuntimeError(f"{ticker} {date.date()} is older than the {bars.maxlen}-bar ETF history")
+                continue
+            self.open.append((bar[0], bar[1], ticker, bar[2]))
+            orders.append({"date": bar[1], "ticker": ticker, "entry_price": bar[2], "known_on": live.date})
+        self.advance(live)
+        return pd.DataFrame(orders, columns=["date", "ticker", "entry_price", "known_on"])
+
+    def advance(self, live):
+        still_open = []
+        for row, date, ticker, entry_price in self.open:
+            bar = live.etf_bar(ticker, row=row + self.hold_days)
+            if bar is None:
+                still_open.append((row, date, ticker, entry_price))
+            else:
+                self.closed.append((date, bar[1], ticker, entry_price, bar[2]))
+        self.open = still_open
+
+    def trades(self):
+        rows = self.closed + [(date, pd.NaT, ticker, price, np.nan) for _, date, ticker, price in self.open]
+        trades = pd.DataFrame(rows, columns=["date", "exit_date", "ticker", "entry_price", "exit_price"])
+        trades["date"] = trades["date"].astype("datetime64[ns]")
+        trades["exit_date"] = trades["exit_date"].astype("datetime64[ns]")
+        trades["entry_price"] = trades["entry_price"].astype(float)
+        trades["exit_price"] = trades["exit_price"].astype(float)
+        trades["return"] = trades["exit_price"] / trades["entry_price"] - 1
+        trades["capital"] = self.capital
+        return trades
+
+# ---------------------------
+# Live Mode: Signals
+# ---------------------------
+def _sector_entries(rows):
+    rows = rows.dropna(subset=["sector_etf"])
+    return pd.DataFrame({"date": rows["date"], "ticker": rows["sector_etf"].astype(object)}).drop_duplicates()
+
+
+def live_positive(live, threshold=0):
+    return _sector_entries(live.today[live.today["sentiment_score"] > threshold])
+
+
+def live_momentum(live, threshold=0):
+    return _sector_entries(live.resolved[live.resolved["return_5d"] > threshold])
+
+
+def live_reversal(live, return_threshold=0, sentiment_threshold=0):
+    daily = live.resolved
+    return _sector_entries(daily[(daily["return_5d"] < return_threshold) & (daily["sentiment_score"] < sentiment_threshold)])
+
+
+def live_value(live):
+    return pd.DataFrame({"date": live.date, "ticker": live.below_ma}, columns=["date", "ticker"])
+
+
+def live_vix_guard(live, vix_threshold=18):
+    daily = live.resolved
+    return _sector_entries(daily[(daily["vix"] < vix_threshold) & (daily["return_5d"] > 0)])
+
+
+def live_adaptive_vix_neg(live, sentiment_threshold=-0.3):
+    if not live.vix_falling:
+        return _sector_entries(live.today.iloc[:0])
+    return _sector_entries(live.today[live.today["sentiment_score"] < sentiment_threshold])
+
+
+# batch strategy -> (live signal function, hold_days), with the batch defaults
+LIVE_SIGNALS = {
+    strategy_positive: (live_positive, 1),
+    strategy_momentum: (live_momentum, 5),
+    strategy_reversal: (live_reversal, 5),
+    strategy_value: (live_value, 5),
+    strategy_vix_guard: (live_vix_guard, 5),
+    strategy_adaptive_vix_neg: (live_adaptive_vix_neg, 5),
+}
+
 
 
 # ---------------------------
 # Execution
 # ---------------------------
-if __name__ == "__main__":
-    full = pd.read_csv("data/full_dataset.csv", parse_dates=["date"])
-    prices = pd.read_csv("data/all_sector_etfs_and_vix.csv", parse_dates=["date"])
-
-    stock_to_etf = {
-        "AAPL": "XLK", "MSFT": "XLK", "JNJ": "XLV", "PFE": "XLV",
-        "XOM": "XLE", "CVX": "XLE", "JPM": "XLF", "BAC": "XLF",
-        "WMT": "XLP", "PG": "XLP", "NEE": "XLU", "DUK": "XLU",
-        "UNP": "XLI", "UPS": "XLI", "TMO": "XLV", "ABT": "XLV",
-        "HD": "XLY", "MCD": "XLY", "AMT": "XLRE", "PLD": "XLRE",
-        "NFLX": "XLC", "GOOG": "XLC"
-    }
+def main():
+    from data_store import read_table
+
+    full = read_table("full_dataset")
+    prices = read_table("all_sector_etfs_and_vix", columns=["date", "ticker", "adj_close"])
 
     agents = [
         Agent("Positive Sentiment", strategy_positive),
@@ -152,3 +541,7 @@ if __name__ == "__main__":
     for agent in agents:
         agent.run(full, prices)
         print(f"{agent.name} Final Value: {agent.portfolio['portfolio_value'].iloc[-1] if not agent.portfolio.empty else 'N/A'}")
+
+
+if __name__ == "__main__":
+    main()
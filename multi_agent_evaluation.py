@@ -1,15 +1,10 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
 
-stock_to_etf = {
-        "AAPL": "XLK", "MSFT": "XLK", "JNJ": "XLV", "PFE": "XLV",
-        "XOM": "XLE", "CVX": "XLE", "JPM": "XLF", "BAC": "XLF",
-        "WMT": "XLP", "PG": "XLP", "NEE": "XLU", "DUK": "XLU",
-        "UNP": "XLI", "UPS": "XLI", "TMO": "XLV", "ABT": "XLV",
-        "HD": "XLY", "MCD": "XLY", "AMT": "XLRE", "PLD": "XLRE",
-        "NFLX": "XLC", "GOOG": "XLC"
-    }
+from universe import get_universe
 
 
 # ---------------------------
@@ -28,18 +23,253 @@ def evaluate_performance(portfolio):
     total_return = df["portfolio_value"].iloc[-1] / df["portfolio_value"].iloc[0] - 1
     return {"Sharpe": sharpe, "Max Drawdown": max_dd, "Total Return": total_return}
 
+# ---------------------------
+# Parallel Agent Executor
+# ---------------------------
+def run_agents(agents, data, etf_prices, max_workers=None):
+    """
+    Run every agent concurrently on a thread pool. The shared intermediates
+    (sector mapping, sector-level daily aggregates, VIX series + diff, price
+    index) are computed once up front and handed to all agents read-only.
+    Returns the wall time of each agent in seconds.
+    """
+    from multi_agent import SharedContext
+
+    start = time.perf_counter()
+    shared = SharedContext(data, etf_prices).warm()
+    timings = {"(shared intermediates)": time.perf_counter() - start}
+
+    def run(agent):
+        t0 = time.perf_counter()
+        agent.run(data, etf_prices, shared=shared)
+        return agent.name, time.perf_counter() - t0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        timings.update(pool.map(run, agents))
+    return timings
+
+# ---------------------------
+# Walk-Forward Evaluation
+# ---------------------------
+def walk_forward_windows(dates, train_days=40, test_days=20, step=None):
+    """
+    Rolling (train_start, test_start, test_end) windows over the sorted unique
+    trading `dates`: `train_days` of history followed by `test_days` out of
+    sample, advancing `step` days (default `test_days`). test_end is exclusive.
+    """
+    dates = pd.DatetimeIndex(pd.unique(pd.Series(dates).dropna())).sort_values()
+    step = step or test_days
+    windows = []
+    for i in range(0, len(dates) - train_days - test_days + 1, step):
+        test_start = dates[i + train_days]
+        j = i + train_days + test_days
+        test_end = dates[j] if j < len(dates) else dates[-1] + pd.Timedelta(days=1)
+        windows.append((dates[i], test_start, test_end))
+    return windows
+
+
+def walk_forward(agents, data, etf_prices, train_days=40, test_days=20, step=None, max_workers=None):
+    """
+    Run every agent on each rolling window and score the trades it enters in
+    the train and in the test part separately.
+    - shared intermediates are built once on the full sample; every window
+      gets date slices of them, so overlapping windows reuse the same features
+    - windows run concurrently on a thread pool
+    Returns one row per (window, agent, phase) with Sharpe / Max Drawdown /
+    Total Return and the number of trades.
+    """
+    from multi_agent import SharedContext, simulate_portfolio
+
+    shared = SharedContext(data, etf_prices).warm()
+    windows = walk_forward_windows(data["date"], train_days, test_days, step)
+
+    def run(args):
+        i, (train_start, test_start, test_end) = args
+        ctx = shared.window(train_start, test_end)
+        rows = []
+        for agent in agents:
+            trades = agent.strategy_fn(ctx.data, ctx.etf_prices, shared=ctx)
+            for phase, lo, hi in [("train", train_start, test_start), ("test", test_start, test_end)]:
+                part = trades[(trades["date"] >= lo) & (trades["date"] < hi)]
+                perf = evaluate_performance(simulate_portfolio(part, etf_prices))
+                rows.append({
+                    "window": i, "train_start": train_start, "test_start": test_start, "test_end": test_end,
+                    "agent": agent.name, "phase": phase, "n_trades": len(part), **perf,
+                })
+        return rows
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = pool.map(run, enumerate(windows))
+        return pd.DataFrame([row for rows in results for row in rows])
+
+# ---------------------------
+# Live Replay
+# ---------------------------
+def replay(agents, data, etf_prices):
+    """
+    Feed the history through `Agent.on_bar` one day at a time, every agent
+    sharing one LiveContext, as a live feed would. Stock closes come from
+    `data`, ETF / VIX closes from `etf_prices`.
+    Returns {agent name: trades} in the schema of the batch strategies.
+    """
+    from multi_agent import LiveContext
+
+    data = data.sort_values("date", kind="stable")
+    etf_prices = etf_prices.sort_values("date", kind="stable")
+    dates = pd.DatetimeIndex(pd.unique(pd.concat([data["date"], etf_prices["date"]]))).sort_values()
+    data_at = data["date"].searchsorted(dates, side="left"), data["date"].searchsorted(dates, side="right")
+    etf_at = etf_prices["date"].searchsorted(dates, side="left"), etf_prices["date"].searchsorted(dates, side="right")
+
+    live = LiveContext()
+    for agent in agents:
+        agent.book = None  # start from a flat book
+    for i, date in enumerate(dates):
+        day = data.iloc[data_at[0][i]:data_at[1][i]]
+        etf_day = etf_prices.iloc[etf_at[0][i]:etf_at[1][i]]
+        new_prices = pd.concat([day[["ticker", "adj_close"]].astype({"ticker": object}),
+                                etf_day[["ticker", "adj_close"]].astype({"ticker": object})], ignore_index=True)
+        for agent in agents:
+            agent.on_bar(date, day[["ticker", "sentiment_score"]], new_prices, live=live)
+    return {agent.name: agent.finish(live) for agent in agents}
+
+
+def check_replay(agents, data, etf_prices):
+    """
+    Replay the history and compare each agent's live trades with its batch
+    `run` trades (same entries, exits and prices, in any order).
+    Returns one row per agent with both trade counts and whether they match.
+    """
+    live_trades = replay(agents, data, etf_prices)
+    columns = ["date", "exit_date", "ticker", "entry_price", "exit_price", "return", "capital"]
+
+    def normalized(trades):
+        trades = trades[columns].astype({"ticker": object, "date": "datetime64[ns]", "exit_date": "datetime64[ns]"})
+        return trades.sort_values(["date", "ticker", "exit_date"]).reset_index(drop=True)
+
+    rows = []
+    for agent in agents:
+        batch = normalized(agent.strategy_fn(data, etf_prices))
+        live = normalized(live_trades[agent.name])
+        rows.append({"agent": agent.name, "batch_trades": len(batch), "live_trades": len(live),
+                     "match": batch.equals(live)})
+    return pd.DataFrame(rows)
+
 # ---------------------------
 # Agent of Agents (Dynamic Selector)
 # ---------------------------
+def agent_returns(agents):
+    """
+    Daily returns of each agent's portfolio on the union of their dates,
+    0 on days an agent has no value yet (flat, all cash).
+    """
+    values = pd.concat({a.name: a.portfolio["portfolio_value"] for a in agents if not a.portfolio.empty}, axis=1)
+    return values.sort_index().ffill().pct_change().fillna(0)
+
+
+class DynamicSelector:
+    """
+    Meta-agent that reallocates capital across agents every day from their
+    trailing performance. Each `step` costs O(agents): the trailing statistics
+    are running updates, never recomputed from history.
+    - "ew_sharpe": weights proportional to the positive part of each agent's
+      exponentially weighted mean / std of daily returns (`halflife` days);
+      all cash when no agent scores above 0
+    - "hedge": multiplicative weights, w_i ∝ exp(eta * cumulative return_i)
+    Weights are equal for the first `min_periods` days. The weights used on a
+    day only depend on returns up to the day before.
+    """
+    def __init__(self, names, method="ew_sharpe", halflife=20, eta=20.0, min_periods=5, start_value=22000):
+        if method not in ("ew_sharpe", "hedge"):
+            raise ValueError(f"unknown method: {method}")
+        self.names = list(names)
+        self.method = method
+        self.alpha = 1 - 0.5 ** (1 / halflife)
+        self.eta = eta
+        self.min_periods = min_periods
+        self.n = 0
+        self.mean = np.zeros(len(self.names))
+        self.var = np.zeros(len(self.names))
+        self.log_w = np.zeros(len(self.names))
+        self.value = float(start_value)
+
+    def weights(self):
+        k = len(self.names)
+        if self.n < self.min_periods:
+            return np.full(k, 1 / k)
+        if self.method == "hedge":
+            w = np.exp(self.log_w - self.log_w.max())
+            return w / w.sum()
+        score = np.where(self.var > 0, self.mean / np.sqrt(np.where(self.var > 0, self.var, 1)), 0.0)
+        score = np.clip(score, 0, None)
+        total = score.sum()
+        return score / total if total > 0 else np.zeros(k)
+
+    def update(self, returns):
+        returns = np.asarray(returns, dtype=float)
+        diff = returns - self.mean
+        incr = self.alpha * diff
+        self.mean += incr
+        self.var = (1 - self.alpha) * (self.var + diff * incr)
+        self.log_w += self.eta * returns
+        self.n += 1
+
+    def step(self, returns):
+        """
+        Apply today's agent returns to the current allocation, then fold them
+        into the trailing statistics. Returns (weights used, portfolio return).
+        """
+        w = self.weights()
+        r = float(w @ np.asarray(returns, dtype=float))
+        self.value *= 1 + r
+        self.update(returns)
+        return w, r
+
+    def run(self, returns):
+        """
+        Replay a (date x agent) frame of daily returns through `step`. Returns a
+        date-indexed frame with portfolio_value and the weight of each agent.
+        """
+        returns = returns[self.names]
+        values, weights = [], []
+        for row in returns.to_numpy(float):
+            w, _ = self.step(row)
+            values.append(self.value)
+            weights.append(w)
+        out = pd.DataFrame(weights, index=returns.index, columns=[f"w_{n}" for n in self.names])
+        out.insert(0, "portfolio_value", values)
+        return out
+
+
+# ---------------------------
+# Plotting
+# ---------------------------
+def plot_comparison(agents, selectors, benchmark):
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(12, 6))
+    for name, agent in agents.items():
+        if not agent.portfolio.empty:
+            plt.plot(agent.portfolio.index, agent.portfolio["portfolio_value"], label=name)
+    for method, portfolio in selectors.items():
+        plt.plot(portfolio.index, portfolio["portfolio_value"], label=f"Agent of Agents ({method})", linewidth=2)
+    plt.plot(benchmark.index, benchmark["portfolio_value"], label="Benchmark", linestyle="--", color="black")
+    plt.title("Multi-Agent Strategy Comparison")
+    plt.xlabel("Date")
+    plt.ylabel("Portfolio Value ($)")
+    plt.legend()
+    plt.grid(True)
+    plt.tight_layout()
+    plt.show()
 
 # ---------------------------
 # Execution
 # ---------------------------
-if __name__ == "__main__":
+def main():
     from multi_agent import Agent, strategy_positive, strategy_momentum, strategy_reversal, strategy_value, strategy_vix_guard, strategy_adaptive_vix_neg
-    
-    full = pd.read_csv("data/full_dataset.csv", parse_dates=["date"])
-    prices = pd.read_csv("data/all_sector_etfs_and_vix.csv", parse_dates=["date"])
+    from data_store import read_table
+
+    full = read_table("full_dataset")
+    prices = read_table("all_sector_etfs_and_vix", columns=["date", "ticker", "adj_close"])
     # Set global variable for mapping
     agents = {
         "Positive": Agent("Positive", strategy_positive),
@@ -50,10 +280,12 @@ if __name__ == "__main__":
         "Adaptive": Agent("Adaptive", strategy_adaptive_vix_neg)
     }
 
-    for agent in agents.values():
-        agent.run(full, prices)
+    timings = run_agents(list(agents.values()), full, prices)
+    print("\n--- Agent Wall Time ---")
+    for name, seconds in timings.items():
+        print(f"{name}: {seconds * 1000:.1f} ms")
     # Step 1: Extract sector ETF tickers
-    benchmark_etfs = list(set(stock_to_etf.values()))
+    benchmark_etfs = get_universe().sectors
 
     # Step 2: Filter ETF prices for benchmark ETFs
     benchmark = prices[prices["ticker"].isin(benchmark_etfs)].copy()
@@ -72,15 +304,23 @@ if __name__ == "__main__":
     for name, agent in agents.items():
         perf = evaluate_performance(agent.portfolio)
         print(f"{name}: {perf}")
-    plt.figure(figsize=(12, 6))
-    for name, agent in agents.items():
-        if not agent.portfolio.empty:
-            plt.plot(agent.portfolio.index, agent.portfolio["portfolio_value"], label=name)
-    plt.plot(benchmark.index, benchmark["portfolio_value"], label="Benchmark", linestyle="--", color="black")
-    plt.title("Multi-Agent Strategy Comparison")
-    plt.xlabel("Date")
-    plt.ylabel("Portfolio Value ($)")
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
-    plt.show()
\ No newline at end of file
+
+    returns = agent_returns(agents.values())
+    selectors = {}
+    for method in ["ew_sharpe", "hedge"]:
+        selectors[method] = DynamicSelector(returns.columns, method=method).run(returns)
+        print(f"Agent of Agents ({method}): {evaluate_performance(selectors[method])}")
+
+    wf = walk_forward(list(agents.values()), full, prices, train_days=20, test_days=10)
+    test = wf[wf["phase"] == "test"]
+    print(f"\n--- Walk-Forward (test windows: {test['window'].nunique()}) ---")
+    print(test.pivot(index="window", columns="agent", values="Sharpe").round(2).to_string())
+    print(test.groupby("agent")[["Sharpe", "Max Drawdown", "Total Return"]].mean().round(4).to_string())
+
+    print("\n--- Live Replay vs Batch ---")
+    print(check_replay(list(agents.values()), full, prices).to_string(index=False))
+    plot_comparison(agents, selectors, benchmark)
+
+
+if __name__ == "__main__":
+    main()
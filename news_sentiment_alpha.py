@@ -1,85 +1,111 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+import argparse
+import os
+
+from data_merge import SENTIMENT_TABLE
+from data_store import count_rows, read_table
+from alpha_decay import STATE_DIR, AlphaDecay, SentimentPanel, alpha_pairs, bootstrap_alpha, ic_summary, sentiment_labels
+
+MAX_HORIZON = 10
+
 
 # === Load datasets ===
-df = pd.read_csv("data/full_dataset.csv", parse_dates=["date"])
-etf_df = pd.read_csv("data/etf_prices.csv", parse_dates=["date"])
-
-# === Map each ticker to its corresponding sector ETF ===
-ticker_sector_map = {
-    "AAPL": "XLK", "MSFT": "XLK",
-    "UNH": "XLV", "JNJ": "XLV",
-    "JPM": "XLF", "BAC": "XLF",
-    "AMZN": "XLY", "TSLA": "XLY",
-    "GOOGL": "XLC", "NFLX": "XLC",
-    "RTX": "XLI", "UNP": "XLI",
-    "PG": "XLP", "KO": "XLP",
-    "XOM": "XLE", "CVX": "XLE",
-    "NEE": "XLU", "DUK": "XLU",
-    "AMT": "XLRE", "PLD": "XLRE",
-    "LIN": "XLB", "SHW": "XLB"
-}
-df["sector_etf"] = df["ticker"].map(ticker_sector_map)
-
-# === Compute sentiment label ===
-def classify_sentiment(score):
-    if score > 0: return "positive"
-    elif score < 0: return "negative"
-    else: return "neutral"
-
-df["sentiment_label"] = df["sentiment_score"].apply(classify_sentiment)
-
-# === Prepare ETF return data ===
-etf_df.sort_values(["ticker", "date"], inplace=True)
-etf_df["return_1d"] = etf_df.groupby("ticker")["adj_close"].pct_change(periods=1).shift(-1)
-etf_df["return_3d"] = etf_df.groupby("ticker")["adj_close"].pct_change(periods=3).shift(-3)
-etf_df["return_5d"] = etf_df.groupby("ticker")["adj_close"].pct_change(periods=5).shift(-5)
-
-# === Merge stock data with sector ETF returns ===
-etf_returns = etf_df.rename(columns={
-    "ticker": "sector_etf",
-    "return_1d": "etf_1d",
-    "return_3d": "etf_3d",
-    "return_5d": "etf_5d"
-})[["sector_etf", "date", "etf_1d", "etf_3d", "etf_5d"]]
-
-merged = pd.merge(df, etf_returns, on=["sector_etf", "date"], how="inner")
-
-# === Calculate excess return (alpha) ===
-merged["alpha_1d"] = merged["return_1d"] - merged["etf_1d"]
-merged["alpha_3d"] = merged["return_3d"] - merged["etf_3d"]
-merged["alpha_5d"] = merged["return_5d"] - merged["etf_5d"]
-
-# === Group by sentiment and report alpha ===
-# === Group by sector ETF + sentiment and compute mean alpha ===
-grouped_sector_sentiment = merged.groupby(
-    ["sector_etf", "sentiment_label"]
-)[["alpha_1d", "alpha_3d", "alpha_5d"]].mean()
-
-print("📊 Sector-wise alpha vs ETF by sentiment label:")
-print(grouped_sector_sentiment)
-
-
-
-# Pivot into heatmap format
-heatmap_data = merged.groupby(["sector_etf", "sentiment_label"])[
-    ["alpha_1d", "alpha_3d", "alpha_5d"]
-].mean().reset_index()
-
-# Reshape for heatmap: one plot per sentiment label
+def read_stocks(start=None):
+    """
+    full_dataset rows (from `start` on) with their sector ETF and sentiment label.
+    """
+    df = read_table("full_dataset", columns=["date", "ticker", "sector_etf", "adj_close", "sentiment_score", "sentiment_label"],
+                    start=start)
+
+    # === Name the int8 sentiment labels (categorical, so still int8 codes) ===
+    df["sentiment_label"] = sentiment_labels(df["sentiment_label"])
+    return df
+
+
+def load_data():
+    """
+    full_dataset rows with their sector ETF and sentiment label, and the ETF prices.
+    """
+    return read_stocks(), read_table("etf_prices", columns=["date", "ticker", "adj_close"])
+
+
+# === Incremental alpha decay (only new days are folded into the running sums) ===
+def update_decay(etf_df, max_horizon=MAX_HORIZON, state_dir=STATE_DIR, source=SENTIMENT_TABLE):
+    """
+    Resume the sector- and company-level alpha-decay states, fold in the new rows and save them.
+    Only full_dataset rows from each state's `since()` on are read; the whole
+    table is read again only if the history it folded in has changed.
+    `source` is the sentiment table full_dataset was merged from; a state built
+    from another one is not resumed.
+    """
+    decays = []
+    for name, by in [("sector", ("sector_etf",)), ("company", ("ticker",))]:
+        path = os.path.join(state_dir, f"{name}.pkl")
+        decay = AlphaDecay.resume(path, max_horizon=max_horizon, by=by, source=source)
+        since = decay.since()
+        stocks, n_earlier = (read_stocks(), 0) if since is None else (read_stocks(start=since), count_rows("full_dataset", end=since))
+        if n_earlier and not decay.consistent(stocks, etf_df, n_earlier):
+            print(f"♻️ {name}: full_dataset changed since the last run, rebuilding")
+            decay.reset()
+            stocks, n_earlier = read_stocks(), 0
+        n_new = decay.update(stocks, etf_df, n_earlier)
+        decay.save(path)
+        print(f"🔁 {name}: folded in {n_new} new rows")
+        decays.append(decay)
+    return decays
+
+
 # === Alpha by company and horizon ===
-for sentiment in ["positive", "neutral", "negative"]:
-    company_alpha = merged[merged["sentiment_label"] == sentiment].groupby("ticker")[
-        ["alpha_1d", "alpha_3d", "alpha_5d"]
-    ].mean()
-
-    plt.figure(figsize=(10, 7))
-    sns.heatmap(company_alpha, annot=True, cmap="RdYlGn", center=0, fmt=".4f")
-    plt.title(f"Alpha Heatmap — {sentiment.capitalize()} Sentiment")
-    plt.ylabel("Ticker")
-    plt.xlabel("Time Window")
-    plt.tight_layout()
-    plt.show()
-
-### Does sentiment affect return
+def plot_company_heatmaps(company_curve):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    for sentiment in ["positive", "neutral", "negative"]:
+        if sentiment not in company_curve.index.get_level_values("sentiment_label"):
+            continue
+        company_alpha = company_curve.xs(sentiment, level="sentiment_label")
+
+        plt.figure(figsize=(10, 7))
+        sns.heatmap(company_alpha, annot=True, cmap="RdYlGn", center=0, fmt=".4f")
+        plt.title(f"Alpha Heatmap — {sentiment.capitalize()} Sentiment")
+        plt.ylabel("Ticker")
+        plt.xlabel("Time Window")
+        plt.tight_layout()
+        plt.show()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentiment alpha decay vs sector ETFs.")
+    parser.add_argument("--max-horizon", type=int, default=MAX_HORIZON)
+    parser.add_argument("--draws", type=int, default=10_000, help="bootstrap draws per cell (0 to skip)")
+    parser.add_argument("--no-plots", action="store_true")
+    args = parser.parse_args()
+    horizons = range(1, args.max_horizon + 1)
+
+    df, etf_df = load_data()
+    sector_decay, company_decay = update_decay(etf_df, args.max_horizon)
+
+    # === Group by sector ETF + sentiment and report mean alpha per horizon ===
+    print("📊 Sector-wise alpha vs ETF by sentiment label:")
+    print(sector_decay.curve())
+
+    # === Cross-sectional view: sentiment quintiles and rank IC on a dense (date x ticker) panel ===
+    panel = SentimentPanel(df, etf_df)
+    print("\n📊 Mean alpha by sentiment quintile (0 = most negative):")
+    print(panel.bucket_alpha(q=5, horizons=horizons))
+    print("\n📊 Rank IC of sentiment vs forward alpha:")
+    print(ic_summary(panel.rank_ic(horizons=horizons)).round(4))
+
+    # === Significance: block-bootstrap CIs and t-stats per (sector, label, horizon) ===
+    if args.draws:
+        significance = bootstrap_alpha(alpha_pairs(df, etf_df, args.max_horizon), n_draws=args.draws)
+        print("\n📐 Alpha significance (95% block-bootstrap CI):")
+        print(significance[["n", "n_dates", "mean", "t_stat", "boot_t_stat", "ci_low", "ci_high", "p_value"]].round(4))
+        print("\n📐 Bootstrap t-stat by sector / label / horizon:")
+        print(significance["boot_t_stat"].unstack("horizon").round(2))
+
+    if not args.no_plots:
+        plot_company_heatmaps(company_decay.curve())
+
+
+if __name__ == "__main__":
+    main()
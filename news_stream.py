@@ -0,0 +1,212 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+
+import pandas as pd
+
+from data_store import drop_table, table_path
+
+NEWS_JSON = "company_news_data.json"
+ARTICLE_FIELDS = ["source", "title", "description", "url", "publishedAt", "content"]
+
+
+# ---------------------------
+# Incremental JSON Reader
+# ---------------------------
+class _Reader:
+    """
+    Character cursor over a text file that only keeps the unread part of the
+    current chunk in memory, plus whatever the value being decoded spans.
+    """
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("unexpected end of JSON input")
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"expected {char!r} at offset {self.pos}, got {self.buf[self.pos]!r}")
+        self.pos += 1
+
+    def decode(self):
+        """
+        Decode one complete JSON value (string / object) at the cursor.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                self.pos = end
+                return value
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+
+    def items(self, close):
+        """
+        Iterate over the members of the container just opened, consuming the
+        separating commas and the closing bracket `close`.
+        """
+        first = True
+        while True:
+            if self.peek() == close:
+                self.pos += 1
+                return
+            if not first:
+                self.expect(",")
+            first = False
+            yield
+
+
+def iter_articles(path=NEWS_JSON, chunk_size=1 << 16):
+    """
+    Lazily yield (ticker, date, article) from the ticker -> date -> [articles]
+    corpus without loading the file: memory is bounded by the chunk size and
+    the largest single article.
+    """
+    with open(path, encoding="utf-8") as f:
+        reader = _Reader(f, chunk_size)
+        reader.expect("{")
+        for _ in reader.items("}"):
+            ticker = reader.decode()
+            reader.expect(":")
+            reader.expect("{")
+            for _ in reader.items("}"):
+                date = reader.decode()
+                reader.expect(":")
+                reader.expect("[")
+                for _ in reader.items("]"):
+                    yield ticker, date, reader.decode()
+
+
+# ---------------------------
+# De-duplication
+# ---------------------------
+def normalize_title(title):
+    return re.sub(r"[^a-z0-9]+", " ", (title or "").lower()).strip()
+
+
+def _digest(*parts):
+    return hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=8).digest()
+
+
+def dedupe(records, per_ticker=True):
+    """
+    Drop records whose URL or normalized title was already seen (for the same
+    ticker if `per_ticker`, else across the corpus). Only 8-byte digests are
+    kept, not the articles themselves.
+    """
+    seen = set()
+    for ticker, date, article in records:
+        scope = ticker if per_ticker else ""
+        keys = []
+        if article.get("url"):
+            keys.append(_digest(scope, "url", article["url"]))
+        title = normalize_title(article.get("title"))
+        if title:
+            keys.append(_digest(scope, "title", title))
+        if any(k in seen for k in keys):
+            continue
+        seen.update(keys)
+        yield ticker, date, article
+
+
+# ---------------------------
+# Converters
+# ---------------------------
+def to_ndjson(records, out_path):
+    """
+    Write one JSON line per article: {"ticker", "date", <article fields>}.
+    """
+    n = 0
+    with open(out_path, "w", encoding="utf-8") as out:
+        for ticker, date, article in records:
+            out.write(json.dumps({"ticker": ticker, "date": date, **article}, ensure_ascii=False))
+            out.write("\n")
+            n += 1
+    return n
+
+
+def to_table(records, name="news_articles", batch_rows=50_000):
+    """
+    Stream articles into a Parquet table readable with data_store.read_table,
+    writing one row group per `batch_rows` articles. Like write_table, the
+    previous contents of the table are replaced.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path = table_path(name)
+    drop_table(name)
+    os.makedirs(path, exist_ok=True)
+    columns = ["ticker", "date"] + ARTICLE_FIELDS
+    schema = pa.schema([("ticker", pa.dictionary(pa.int32(), pa.string())), ("date", pa.timestamp("ns"))]
+                       + [(c, pa.string()) for c in ARTICLE_FIELDS])
+
+    def flush(rows, writer):
+        df = pd.DataFrame(rows, columns=columns)
+        df["ticker"] = df["ticker"].astype("category")
+        df["date"] = pd.to_datetime(df["date"]).astype("datetime64[ns]")
+        writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+
+    n = 0
+    rows = []
+    with pq.ParquetWriter(os.path.join(path, "part-0.parquet"), schema, compression="zstd") as writer:
+        for ticker, date, article in records:
+            rows.append([ticker, date] + [article.get(c) for c in ARTICLE_FIELDS])
+            if len(rows) >= batch_rows:
+                flush(rows, writer)
+                n += len(rows)
+                rows = []
+        if rows:
+            flush(rows, writer)
+            n += len(rows)
+    return n
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream the news corpus into NDJSON or a Parquet table.")
+    parser.add_argument("--news", default=NEWS_JSON)
+    parser.add_argument("--ndjson", help="write newline-delimited JSON to this path instead of a table")
+    parser.add_argument("--table", default="news_articles")
+    parser.add_argument("--keep-duplicates", action="store_true")
+    args = parser.parse_args()
+
+    records = iter_articles(args.news)
+    if not args.keep_duplicates:
+        records = dedupe(records)
+    if args.ndjson:
+        n = to_ndjson(records, args.ndjson)
+        print(f"✅ Wrote {n} articles to {args.ndjson}")
+    else:
+        n = to_table(records, args.table)
+        print(f"✅ Wrote {n} articles to {table_path(args.table)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+import argparse
+import csv
+import itertools
+import json
+import os
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+import pandas as pd
+
+import multi_agent as ma
+import trade_simulation as ts
+from feature_store import fingerprint
+
+RESULTS_PATH = "data/sweeps/param_sweep.csv"
+METRICS = ["Total Return", "Annual Return", "Volatility", "Sharpe Ratio", "Max Drawdown"]
+SCORING_VERSION = 2  # bump when the scoring changes, so stored results are not resumed
+
+# ---------------------------
+# Strategy Registry
+# ---------------------------
+# Each entry maps panels (data, etf_prices, sector_sentiment) + params -> trades
+STRATEGIES = {
+    "positive_sentiment": lambda p, **kw: ts.generate_positive_sentiment_trades(p["sector_sentiment"], p["etf_prices"], **kw),
+    "negative_sentiment": lambda p, **kw: ts.generate_negative_sentiment_trades(p["sector_sentiment"], p["etf_prices"], **kw),
+    "negative_vix_filter": lambda p, **kw: ts.generate_negative_sentiment_with_vix_filter(p["sector_sentiment"], p["etf_prices"], p["etf_prices"], **kw),
+    "adaptive_vix": lambda p, **kw: ts.generate_adaptive_vix_sentiment_trades(p["sector_sentiment"], p["etf_prices"], p["etf_prices"], **kw),
+    "agent_positive": lambda p, **kw: ma.strategy_positive(p["data"], p["etf_prices"], **kw),
+    "agent_momentum": lambda p, **kw: ma.strategy_momentum(p["data"], p["etf_prices"], **kw),
+    "agent_reversal": lambda p, **kw: ma.strategy_reversal(p["data"], p["etf_prices"], **kw),
+    "agent_value": lambda p, **kw: ma.strategy_value(p["data"], p["etf_prices"], **kw),
+    "agent_vix_guard": lambda p, **kw: ma.strategy_vix_guard(p["data"], p["etf_prices"], **kw),
+    "agent_adaptive_vix_neg": lambda p, **kw: ma.strategy_adaptive_vix_neg(p["data"], p["etf_prices"], **kw),
+}
+
+DEFAULT_GRID = {
+    "adaptive_vix": {
+        "sentiment_threshold": [-0.5, -0.3, -0.1],
+        "target_return": [0.01, 0.015, 0.02, 0.03],
+        "stop_loss": [-0.02, -0.05],
+        "max_hold_days": [3, 5, 10],
+    },
+    "negative_vix_filter": {
+        "vix_threshold": [15, 20, 25, 30],
+        "threshold": [-0.3, 0],
+        "hold_days": [1, 3, 5],
+    },
+    "positive_sentiment": {"threshold": [0, 0.1, 0.3], "hold_days": [1, 3, 5]},
+    "agent_value": {"window": [10, 20, 50], "hold_days": [1, 3, 5]},
+}
+
+
+def expand_grid(grid):
+    """
+    {strategy: {param: [values]}} -> list of (strategy, params) combinations.
+    """
+    tasks = []
+    for strategy, space in grid.items():
+        names = sorted(space)
+        for values in itertools.product(*(space[n] for n in names)):
+            tasks.append((strategy, dict(zip(names, values))))
+    return tasks
+
+
+def inputs_fingerprint(data, etf_prices):
+    """
+    Short content hash of the sweep inputs, part of every result key so that
+    results computed on older tables are never resumed as current.
+    """
+    return fingerprint([fingerprint(data), fingerprint(etf_prices), SCORING_VERSION])[:16]
+
+
+def task_key(strategy, params, inputs):
+    return f"{inputs}|{strategy}|{json.dumps(params, sort_keys=True)}"
+
+
+# ---------------------------
+# Shared-Memory Panels
+# ---------------------------
+def publish_frame(df):
+    """
+    Copy each column into its own shared memory block. Returns a picklable spec
+    for `attach_frame` and the blocks (the caller must close + unlink them).
+    Text / categorical columns are shared as int32 codes plus their categories.
+    """
+    spec, blocks = [], []
+    for col in df.columns:
+        s = df[col]
+        meta = {"name": col}
+        if pd.api.types.is_datetime64_any_dtype(s):
+            values = s.values.astype("datetime64[ns]").view(np.int64)
+            meta["kind"] = "datetime"
+        elif pd.api.types.is_numeric_dtype(s) or pd.api.types.is_bool_dtype(s):
+            values = s.to_numpy()
+            meta["kind"] = "values"
+        else:
+            codes, categories = pd.factorize(s)
+            values = codes.astype(np.int32)
+            meta["kind"] = "category"
+            meta["categories"] = [str(c) for c in categories]
+
+        shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        np.ndarray(values.shape, values.dtype, buffer=shm.buf)[:] = values
+        meta.update(shm=shm.name, dtype=values.dtype.str, length=len(values))
+        spec.append(meta)
+        blocks.append(shm)
+    return spec, blocks
+
+
+def attach_frame(spec):
+    """
+    Rebuild a frame from `publish_frame` output without copying the numeric columns.
+    The arrays are read-only: every worker sees the same memory, so a strategy
+    writing into a panel in place fails instead of corrupting the others.
+    """
+    data, blocks = {}, []
+    for meta in spec:
+        shm = shared_memory.SharedMemory(name=meta["shm"])
+        blocks.append(shm)
+        values = np.ndarray((meta["length"],), np.dtype(meta["dtype"]), buffer=shm.buf)
+        values.flags.writeable = False
+        if meta["kind"] == "datetime":
+            data[meta["name"]] = values.view("datetime64[ns]")
+        elif meta["kind"] == "category":
+            data[meta["name"]] = pd.Categorical.from_codes(values, meta["categories"])
+        else:
+            data[meta["name"]] = values
+    return pd.DataFrame(data, copy=False), blocks
+
+
+_PANELS = {}
+_BLOCKS = []
+
+
+def _init_worker(specs):
+    for name, spec in specs.items():
+        _PANELS[name], blocks = attach_frame(spec)
+        _BLOCKS.extend(blocks)
+
+
+# ---------------------------
+# Sweep Runner
+# ---------------------------
+def run_one(task):
+    strategy, params, inputs = task
+    row = {"key": task_key(strategy, params, inputs), "inputs": inputs, "strategy": strategy,
+           "params": json.dumps(params, sort_keys=True), "n_trades": 0}
+    row.update({m: np.nan for m in METRICS})
+
+    trades = STRATEGIES[strategy](_PANELS, **params)
+    if trades is None or trades.empty or trades["exit_date"].isna().all():
+        return row
+    if "pnl" not in trades.columns:
+        trades = trades.assign(pnl=trades["return"] * trades["capital"])
+
+    perf = ts.evaluate_performance(simulate(strategy, trades, _PANELS["etf_prices"]), strategy)
+    row["n_trades"] = len(trades)
+    row.update({m: perf[m] for m in METRICS})
+    return row
+
+
+def simulate(strategy, trades, prices):
+    """
+    Portfolio of `trades` on the book their strategy is evaluated with
+    elsewhere: agent_* strategies on the multi-agent book (START_CASH, each
+    trade's own capital), the others on trade_simulation's 10k-position book.
+    """
+    if strategy.startswith("agent_"):
+        return ma.simulate_portfolio(trades, prices).reset_index()
+    return ts.simulate_portfolio(trades, prices=prices)
+
+
+def completed_keys(path):
+    if not os.path.exists(path):
+        return set()
+    return set(pd.read_csv(path, usecols=["key"])["key"])
+
+
+def has_inputs_column(path):
+    with open(path, newline="") as f:
+        return "inputs" in next(csv.reader(f), [])
+
+
+def load_results(path=RESULTS_PATH, inputs=None):
+    """
+    Read the result table back with one column per parameter; with `inputs`,
+    only the rows computed on those inputs (see `inputs_fingerprint`).
+    """
+    results = pd.read_csv(path)
+    if inputs is not None:
+        results = results[results["inputs"] == inputs].reset_index(drop=True)
+    params = pd.DataFrame([json.loads(p) for p in results["params"]], index=results.index)
+    return pd.concat([results.drop(columns=["params"]), params], axis=1)
+
+
+def run_sweep(grid, data, etf_prices, out_path=RESULTS_PATH, workers=None, chunksize=4):
+    """
+    Evaluate every combination of `grid` on a process pool.
+    The price / sentiment panels are published once via shared memory and
+    attached by each worker at start-up. Results are appended to `out_path`
+    as they finish, and combinations already in the file for the same input
+    tables are skipped, so an interrupted sweep resumes where it stopped while
+    a sweep over changed tables starts over.
+    """
+    inputs = inputs_fingerprint(data, etf_prices)
+    if os.path.exists(out_path) and not has_inputs_column(out_path):
+        os.remove(out_path)  # written before results were keyed on their inputs
+    tasks = [(strategy, params, inputs) for strategy, params in expand_grid(grid)]
+    done = completed_keys(out_path)
+    todo = [t for t in tasks if task_key(*t) not in done]
+    print(f"🧮 {len(tasks)} combinations, {len(tasks) - len(todo)} already done, {len(todo)} to run")
+    if not todo:
+        return load_results(out_path, inputs)
+
+    panels = {
+        "data": data,
+        "etf_prices": etf_prices,
+        "sector_sentiment": ts.build_sector_sentiment(data),
+    }
+    specs, blocks = {}, []
+    for name, df in panels.items():
+        specs[name], frame_blocks = publish_frame(df)
+        blocks.extend(frame_blocks)
+
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    fields = ["key", "inputs", "strategy", "params", "n_trades"] + METRICS
+    new_file = not os.path.exists(out_path)
+    try:
+        with Pool(workers, initializer=_init_worker, initargs=(specs,)) as pool, \
+                open(out_path, "a", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            if new_file:
+                writer.writeheader()
+            for i, row in enumerate(pool.imap_unordered(run_one, todo, chunksize=chunksize), 1):
+                writer.writerow(row)
+                f.flush()
+                if i % 100 == 0 or i == len(todo):
+                    print(f"  {i}/{len(todo)} done")
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    return load_results(out_path, inputs)
+
+
+def main():
+    from data_store import read_table
+
+    parser = argparse.ArgumentParser(description="Grid-search strategy parameters on a process pool.")
+    parser.add_argument("--grid", help="JSON file {strategy: {param: [values]}} (default: built-in grid)")
+    parser.add_argument("--out", default=RESULTS_PATH, help="result table, appended to and resumed from")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    grid = DEFAULT_GRID
+    if args.grid:
+        with open(args.grid) as f:
+            grid = json.load(f)
+
+    full = read_table("full_dataset")
+    prices = read_table("etf_prices", columns=["date", "ticker", "adj_close"])
+    results = run_sweep(grid, full, prices, out_path=args.out, workers=args.workers)
+
+    print("\n🏆 Top combinations by Sharpe:")
+    top = results.sort_values("Sharpe Ratio", ascending=False).head(10)
+    print(top.drop(columns=["key", "inputs"]).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from data_merge import ETF_TABLE, PRICE_TABLE, SENTIMENT_TABLE
+from data_store import DATA_DIR, table_path
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+STATE_PATH = os.path.join(DATA_DIR, "pipeline_state.json")
+
+
+# ---------------------------
+# Stages
+# ---------------------------
+class Stage:
+    """
+    One step of the workflow: a script run as a subprocess.
+    - inputs / outputs: table names (under data/) or file paths
+    - external: the stage pulls from a remote API, so unchanged inputs do not
+      mean unchanged results; it only reruns with --refresh (or if never run)
+    Dependencies are derived from which stage produces each input.
+    """
+    def __init__(self, name, script, inputs=(), outputs=(), args=(), external=False):
+        self.name = name
+        self.script = script
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.args = list(args)
+        self.external = external
+
+    def command(self):
+        return [sys.executable, os.path.join(HERE, self.script)] + self.args
+
+
+# Daily sentiment tables data_merge.py can read, and the stages producing them
+SENTIMENT_STAGES = {
+    "stocknewsapi_sentiment_30days": Stage("sentiment", "sentiment_collection_newsapi.py", ["universe.json"],
+                                           ["stocknewsapi_sentiment_30days"], external=True),
+    "finbert_sentiment": Stage("finbert", "finbert_scoring.py", ["company_news_data.json"], ["finbert_sentiment"]),
+}
+
+
+def build_stages(sentiment_table=SENTIMENT_TABLE):
+    """
+    The workflow with `sentiment_table` feeding the merge. The StockNewsAPI
+    stage always runs (the sentiment matrix is built from it); FinBERT only
+    when it is the selected source, since it needs torch.
+    """
+    if sentiment_table not in SENTIMENT_STAGES:
+        raise SystemExit(f"unknown SENTIMENT_TABLE {sentiment_table!r}; "
+                         f"expected one of: {', '.join(SENTIMENT_STAGES)}")
+    sentiment = [SENTIMENT_STAGES["stocknewsapi_sentiment_30days"]]
+    if sentiment_table != "stocknewsapi_sentiment_30days":
+        sentiment.append(SENTIMENT_STAGES[sentiment_table])
+    return sentiment + [
+        Stage("news_articles", "news_stream.py", ["company_news_data.json"], ["news_articles"]),
+        Stage("stock_prices", "ticker_price_collection.py", ["universe.json"], [PRICE_TABLE], external=True),
+        Stage("etf_prices", "etf_price_collection.py", ["universe.json"], [ETF_TABLE], external=True),
+        Stage("sentiment_matrix", "sentiment_cleaning.py", ["stocknewsapi_sentiment_30days"], ["sentiment_score_matrix"]),
+        Stage("merge", "data_merge.py", [sentiment_table, PRICE_TABLE, ETF_TABLE, "universe.json"],
+              ["merged_sentiment", "merged_prices", "etf_prices", "full_dataset"]),
+        Stage("trade_simulation", "trade_simulation.py", ["full_dataset", "etf_prices", "universe.json"]),
+        Stage("multi_agent", "multi_agent_evaluation.py", ["full_dataset", ETF_TABLE, "universe.json"]),
+        Stage("alpha", "news_sentiment_alpha.py", ["full_dataset", "etf_prices", "universe.json"]),
+        Stage("param_sweep", "param_sweep.py", ["full_dataset", "etf_prices", "universe.json"],
+              [os.path.join(DATA_DIR, "sweeps", "param_sweep.csv")]),
+    ]
+
+
+def resolve(path_or_table):
+    """
+    A table name maps to its dataset directory; anything else is a file path
+    (relative names are looked up next to this script).
+    """
+    if os.sep in path_or_table or "." in path_or_table:
+        local = os.path.join(HERE, path_or_table)
+        return path_or_table if os.path.exists(path_or_table) or not os.path.exists(local) else local
+    return table_path(path_or_table)
+
+
+def signature(path):
+    """
+    (relative path, size, mtime) of every file under `path`, or None if missing.
+    """
+    if not os.path.exists(path):
+        return None
+    if os.path.isfile(path):
+        st = os.stat(path)
+        return [[os.path.basename(path), st.st_size, st.st_mtime_ns]]
+    entries = []
+    for root, _, files in os.walk(path):
+        for name in sorted(files):
+            full = os.path.join(root, name)
+            st = os.stat(full)
+            entries.append([os.path.relpath(full, path), st.st_size, st.st_mtime_ns])
+    return sorted(entries)
+
+
+def local_modules(script):
+    """
+    `script` and every repo-local module it imports, directly or through other
+    local modules (imports inside functions included), sorted by file name.
+    """
+    seen, todo = set(), [script]
+    while todo:
+        name = todo.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        with open(os.path.join(HERE, name), "rb") as f:
+            tree = ast.parse(f.read(), filename=name)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                modules = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and not node.level and node.module:
+                modules = [node.module]
+            else:
+                continue
+            for module in modules:
+                path = module.split(".")[0] + ".py"
+                if os.path.exists(os.path.join(HERE, path)):
+                    todo.append(path)
+    return sorted(seen)
+
+
+def fingerprint(stage):
+    """
+    Hash of the code a stage runs (its script and the local modules it
+    imports), its arguments and the signatures of its inputs.
+    """
+    h = hashlib.sha256()
+    for name in local_modules(stage.script):
+        with open(os.path.join(HERE, name), "rb") as f:
+            h.update(json.dumps([name, hashlib.sha256(f.read()).hexdigest()]).encode())
+    h.update(json.dumps(stage.args).encode())
+    for name in stage.inputs:
+        h.update(json.dumps([name, signature(resolve(name))]).encode())
+    return h.hexdigest()
+
+
+# ---------------------------
+# DAG
+# ---------------------------
+def dependencies(stages):
+    producer = {out: s.name for s in stages for out in s.outputs}
+    return {s.name: sorted({producer[i] for i in s.inputs if i in producer} - {s.name}) for s in stages}
+
+
+def select(stages, targets):
+    """
+    `targets` and everything upstream of them, in declaration order.
+    """
+    if not targets:
+        return list(stages)
+    deps = dependencies(stages)
+    unknown = set(targets) - set(deps)
+    if unknown:
+        raise SystemExit(f"unknown stage(s): {', '.join(sorted(unknown))}")
+    keep, todo = set(), list(targets)
+    while todo:
+        name = todo.pop()
+        if name not in keep:
+            keep.add(name)
+            todo.extend(deps[name])
+    return [s for s in stages if s.name in keep]
+
+
+def load_state(path=STATE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_state(state, path=STATE_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def is_fresh(stage, state, refresh=False):
+    entry = state.get(stage.name)
+    if entry is None or any(signature(resolve(o)) is None for o in stage.outputs):
+        return False
+    if stage.external:
+        return not refresh
+    return entry.get("fingerprint") == fingerprint(stage)
+
+
+def run_stage(stage, log_dir):
+    """
+    Run the stage script, logging its output to `log_dir/<stage>.log`.
+    Returns (return code, seconds).
+    """
+    os.makedirs(log_dir, exist_ok=True)
+    env = dict(os.environ, MPLBACKEND=os.environ.get("MPLBACKEND", "Agg"), PYTHONPATH=os.pathsep.join(
+        p for p in [HERE, os.environ.get("PYTHONPATH")] if p))
+    start = time.perf_counter()
+    with open(os.path.join(log_dir, f"{stage.name}.log"), "w") as log:
+        code = subprocess.call(stage.command(), stdout=log, stderr=subprocess.STDOUT, env=env)
+    return code, time.perf_counter() - start
+
+
+def run_pipeline(stages, workers=4, force=False, refresh=False, dry_run=False, state_path=STATE_PATH):
+    """
+    Run `stages` in dependency order, independent ones concurrently. A stage
+    is skipped when its script and input files are unchanged since its last
+    successful run; stages downstream of a failure are not run.
+    Returns {stage: (status, seconds)}.
+    """
+    deps = dependencies(stages)
+    by_name = {s.name: s for s in stages}
+    state = load_state(state_path)
+    log_dir = os.path.join(os.path.dirname(state_path) or ".", "pipeline_logs")
+    report, changed = {}, set()
+    pending = [s.name for s in stages]
+    running = {}
+
+    def ready(name):
+        return all(d in report or d not in by_name for d in deps[name])
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            for name in [n for n in pending if ready(n)]:
+                pending.remove(name)
+                stage = by_name[name]
+                if any(report.get(d, ("ok",))[0] in ("failed", "blocked") for d in deps[name]):
+                    report[name] = ("blocked", 0.0)
+                elif not force and not (set(deps[name]) & changed) and is_fresh(stage, state, refresh):
+                    report[name] = ("skipped", 0.0)
+                    print(f"⏭️  {name}: up to date")
+                elif dry_run:
+                    report[name] = ("would run", 0.0)
+                    changed.add(name)
+                else:
+                    print(f"▶️  {name}: {stage.script}")
+                    running[pool.submit(run_stage, stage, log_dir)] = name
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                code, seconds = future.result()
+                if code == 0:
+                    report[name] = ("ran", seconds)
+                    changed.add(name)
+                    state[name] = {"fingerprint": fingerprint(by_name[name]), "finished": time.time(), "seconds": seconds}
+                    save_state(state, state_path)
+                    print(f"✅ {name}: {seconds:.1f}s")
+                else:
+                    report[name] = ("failed", seconds)
+                    print(f"❌ {name}: exit code {code}, see {os.path.join(log_dir, name + '.log')}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the collection → merge → analysis pipeline as a DAG.")
+    parser.add_argument("targets", nargs="*", help="stages to bring up to date (default: all)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--force", action="store_true", help="rerun every selected stage")
+    parser.add_argument("--refresh", action="store_true", help="rerun the external data collection stages")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--list", action="store_true", help="print the stages and their dependencies")
+    args = parser.parse_args()
+
+    all_stages = build_stages()
+    if args.list:
+        for name, upstream in dependencies(all_stages).items():
+            print(f"{name:<18} <- {', '.join(upstream) or '-'}")
+        return
+
+    start = time.perf_counter()
+    stages = select(all_stages, args.targets)
+    report = run_pipeline(stages, workers=args.workers, force=args.force, refresh=args.refresh, dry_run=args.dry_run)
+    print("\n⏱️  Stage timings:")
+    for name, (status, seconds) in ((s.name, report[s.name]) for s in stages):
+        print(f"  {name:<18} {status:<10} {seconds:8.2f}s")
+    print(f"  {'total':<18} {'':<10} {time.perf_counter() - start:8.2f}s")
+    if any(status in ("failed", "blocked") for status, _ in report.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
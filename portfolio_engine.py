@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+
+# ---------------------------
+# Daily Portfolio Accounting
+# ---------------------------
+def price_matrix(prices, tickers, start, end=None):
+    """
+    (date x ticker) adj_close matrix for `tickers` from `start` to `end`,
+    forward-filled so every position can be marked on every trading day.
+    """
+    px = prices[prices["ticker"].isin(tickers)]
+    px = px[px["date"] >= start]
+    if end is not None:
+        px = px[px["date"] <= end]
+
+    # Scatter straight into the matrix instead of a pivot (later duplicates win)
+    codes, dates = pd.factorize(px["date"], sort=True)
+    col = pd.Index(tickers).get_indexer(px["ticker"])
+    mat = np.full((len(dates), len(tickers)), np.nan)
+    mat[codes, col] = px["adj_close"].to_numpy(float)
+    return pd.DataFrame(mat, index=pd.DatetimeIndex(dates, name="date"), columns=tickers).ffill()
+
+
+def simulate_daily(trades, prices, start_cash=100000, position_size=None):
+    """
+    Event-driven daily accounting of a trade list against a cash budget.
+    - trades: ['date', 'exit_date', 'ticker', 'entry_price', 'exit_price'] and
+      optionally 'capital' (dollars per trade, used if `position_size` is None)
+    - prices: long ['date', 'ticker', 'adj_close'] frame used to mark to market
+    Trades are taken in entry order; one is skipped if its cost exceeds the cash
+    left at that point (exits settle before entries on the same day), and later
+    trades of the same day that still fit are taken. Trades
+    without an exit stay open and are marked until the last price date.
+
+    Returns (portfolio, trades): a date-indexed frame with cash, holdings,
+    portfolio_value and n_positions, and the trades with `accepted` / `shares`.
+    """
+    cols = ["cash", "holdings", "portfolio_value", "n_positions"]
+    trades = trades.dropna(subset=["date", "entry_price"]).sort_values("date", kind="stable").reset_index(drop=True)
+    if trades.empty:
+        return pd.DataFrame(columns=cols), trades.assign(accepted=False, shares=0.0)
+
+    tickers = pd.Index(pd.unique(trades["ticker"].astype(object)))
+    end = None if trades["exit_date"].isna().any() else trades["exit_date"].max()
+    px = price_matrix(prices, tickers, trades["date"].min(), end)
+    dates = px.index.values
+    n_days = len(dates)
+
+    entry_idx = np.searchsorted(dates, trades["date"].values)
+    exit_dates = trades["exit_date"].values
+    has_exit = ~pd.isna(exit_dates)
+    exit_idx = np.where(has_exit, np.searchsorted(dates, np.where(has_exit, exit_dates, dates[-1])), n_days)
+    col = tickers.get_indexer(trades["ticker"].astype(object))
+
+    size = np.full(len(trades), float(position_size)) if position_size is not None else trades["capital"].to_numpy(float)
+    entry_price = trades["entry_price"].to_numpy(float)
+    exit_price = trades["exit_price"].to_numpy(float)
+    shares = size / entry_price
+    proceeds = np.where(has_exit, shares * exit_price, 0.0)
+
+    # Cash constraint: walk the entry days once, settling exits before entries
+    accepted = np.zeros(len(trades), dtype=bool)
+    release = np.zeros(n_days + 1)
+    cash = float(start_cash)
+    released_upto = 0
+    day_starts = np.flatnonzero(np.r_[True, entry_idx[1:] != entry_idx[:-1]])
+    day_ends = np.r_[day_starts[1:], len(trades)]
+    for lo, hi in zip(day_starts, day_ends):
+        d = entry_idx[lo]
+        cash += release[released_upto:d + 1].sum()
+        released_upto = d + 1
+        if size[lo:hi].sum() <= cash + 1e-9:  # the whole day fits
+            accepted[lo:hi] = True
+            cash -= size[lo:hi].sum()
+        else:
+            for i in range(lo, hi):
+                if size[i] <= cash + 1e-9:
+                    accepted[i] = True
+                    cash -= size[i]
+        take = accepted[lo:hi]
+        np.add.at(release, exit_idx[lo:hi][take], proceeds[lo:hi][take])
+
+    # Position matrix (date x ticker) and daily cash flows for accepted trades
+    a = accepted
+    delta = np.zeros((n_days + 1, len(tickers)))
+    np.add.at(delta, (entry_idx[a], col[a]), shares[a])
+    np.add.at(delta, (exit_idx[a], col[a]), -shares[a])
+    positions = np.cumsum(delta, axis=0)[:n_days]
+
+    flows = np.zeros(n_days + 1)
+    np.add.at(flows, entry_idx[a], -size[a])
+    np.add.at(flows, exit_idx[a], proceeds[a])
+    cash_curve = start_cash + np.cumsum(flows)[:n_days]
+
+    holdings = np.nansum(positions * px.to_numpy(float), axis=1)
+    open_count = np.zeros(n_days + 1)
+    np.add.at(open_count, entry_idx[a], 1)
+    np.add.at(open_count, exit_idx[a], -1)
+
+    portfolio = pd.DataFrame({
+        "cash": cash_curve,
+        "holdings": holdings,
+        "portfolio_value": cash_curve + holdings,
+        "n_positions": np.cumsum(open_count)[:n_days].astype(int),
+    }, index=pd.Index(dates, name="date"))
+
+    trades = trades.assign(accepted=accepted, shares=np.where(accepted, shares, 0.0))
+    return portfolio, trades
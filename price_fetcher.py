@@ -0,0 +1,201 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlsplit
+
+import pandas as pd
+
+from instrumentation import span
+
+YAHOO_CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart"
+
+headers = {
+    "User-Agent": "Mozilla/5.0",
+    "Accept": "application/json"
+}
+
+
+# ---------------------------
+# Rate Limiter
+# ---------------------------
+class TokenBucket:
+    """
+    Thread-safe token bucket: allows `rate` requests per second on average,
+    with bursts of up to `capacity` requests.
+    """
+    def __init__(self, rate=2.0, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+# ---------------------------
+# Transports
+# ---------------------------
+class CurlTransport:
+    """
+    Default transport built on curl_cffi. Each worker thread keeps one session
+    per host so connections are reused across tickers.
+    """
+    def __init__(self, impersonate="chrome", timeout=10):
+        self.impersonate = impersonate
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def session(self, host):
+        from curl_cffi import requests
+
+        sessions = getattr(self.local, "sessions", None)
+        if sessions is None:
+            sessions = self.local.sessions = {}
+        if host not in sessions:
+            sessions[host] = requests.Session(impersonate=self.impersonate, headers=headers)
+        return sessions[host]
+
+    def __call__(self, url, params):
+        r = self.session(urlsplit(url).netloc).get(url, params=params, timeout=self.timeout)
+        if r.status_code != 200:
+            return r.status_code, None
+        return r.status_code, r.json()
+
+
+class RequestsTransport:
+    """
+    Plain `requests` transport, e.g. for pointing the engine at a local stub server.
+    """
+    def __init__(self, timeout=10):
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def __call__(self, url, params):
+        import requests
+
+        session = getattr(self.local, "session", None)
+        if session is None:
+            session = self.local.session = requests.Session()
+            session.headers.update(headers)
+        r = session.get(url, params=params, timeout=self.timeout)
+        if r.status_code != 200:
+            return r.status_code, None
+        return r.status_code, r.json()
+
+
+# ---------------------------
+# Fetch Engine
+# ---------------------------
+def parse_chart(ticker, data):
+    """
+    (date, adj_close, ticker) bars of a chart response, plus `event`: True on
+    every bar if the response reports a dividend or split, after which Yahoo
+    restates the whole adjusted history. Null closes are dropped; missing
+    keys give an empty frame.
+    """
+    chart = (((data or {}).get("chart") or {}).get("result") or [{}])[0] or {}
+    timestamps = chart.get("timestamp") or []
+    prices = (((chart.get("indicators") or {}).get("adjclose") or [{}])[0] or {}).get("adjclose") or []
+    n = min(len(timestamps), len(prices))
+
+    df = pd.DataFrame({
+        "date": [datetime.utcfromtimestamp(ts).date() for ts in timestamps[:n]],
+        "adj_close": pd.Series(prices[:n], dtype=float)
+    })
+    # Yahoo sends null closes for halted or not yet settled sessions
+    df = df.dropna(subset=["adj_close"]).reset_index(drop=True)
+    df["ticker"] = ticker
+    events = chart.get("events") or {}
+    df["event"] = bool(events.get("dividends") or events.get("splits"))
+    return df
+
+
+class PriceFetcher:
+    """
+    Concurrent Yahoo chart fetcher shared by stocks, sector ETFs and ^VIX.
+    - rate: requests per second across all workers (token bucket)
+    - max_workers: bound on in-flight requests
+    - retries / backoff: exponential backoff on non-200 responses and errors
+    - transport: callable (url, params) -> (status_code, json or None)
+    - base_url: chart endpoint, override to test against a local stub server
+    """
+    def __init__(self, transport=None, rate=2.0, burst=None, max_workers=8,
+                 retries=3, backoff=1.0, base_url=YAHOO_CHART_URL):
+        self.transport = transport or CurlTransport()
+        self.limiter = TokenBucket(rate, burst)
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.base_url = base_url.rstrip("/")
+
+    def fetch(self, ticker, range_days="60d", interval="1d", start=None):
+        """
+        Fetch one ticker. If `start` (a date) is given only bars from that day
+        onwards are requested, otherwise the trailing `range_days` window.
+        """
+        url = f"{self.base_url}/{ticker}"
+        params = {
+            "range": range_days,
+            "interval": interval,
+            "includePrePost": "false",
+            "events": "div,splits"
+        }
+        if start is not None:
+            del params["range"]
+            params["period1"] = int(pd.Timestamp(start).normalize().tz_localize("UTC").timestamp())
+            params["period2"] = int(time.time())
+
+        with span("fetch.yahoo", ticker=ticker) as s:
+            for attempt in range(self.retries + 1):
+                self.limiter.acquire()
+                try:
+                    status, data = self.transport(url, params)
+                except Exception as e:
+                    status, data = repr(e), None
+                if status == 200 and data is not None:
+                    df = parse_chart(ticker, data)
+                    s.set(status=status, attempts=attempt + 1)
+                    s.rows = len(df)
+                    return df
+                if attempt < self.retries:
+                    time.sleep(self.backoff * 2 ** attempt)
+
+            s.set(status=status, attempts=self.retries + 1)
+            print(f"[{ticker}] ❌ Error {status}")
+            return None
+
+    def fetch_many(self, tickers, starts=None, **kwargs):
+        """
+        Fetch every ticker concurrently and return one long frame (date, adj_close, ticker).
+        `starts` optionally maps ticker -> first date to request.
+        Tickers that fail after all retries are skipped.
+        """
+        starts = starts or {}
+
+        def task(ticker):
+            print(f"📥 Fetching {ticker}...")
+            return self.fetch(ticker, start=starts.get(ticker), **kwargs)
+
+        with span("fetch.yahoo_many", tickers=len(tickers)) as s, ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            frames = [df for df in pool.map(task, tickers) if df is not None]
+            s.rows = sum(len(df) for df in frames)
+
+        if not frames:
+            return pd.DataFrame(columns=["date", "adj_close", "ticker", "event"])
+        return pd.concat(frames, ignore_index=True)
+
+
+def fetch_yahoo_price(ticker, range_days="60d", interval="1d"):
+    return PriceFetcher().fetch(ticker, range_days=range_days, interval=interval)
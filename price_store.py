@@ -0,0 +1,138 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from price_fetcher import PriceFetcher
+
+STORE_DIR = "data/price_store"
+RANGE_DAYS = "60d"  # Yahoo `range` of a first fetch, and the window the collectors export
+
+
+def window_start(range_days=RANGE_DAYS, today=None):
+    """
+    First date of the trailing `range_days` window ending `today`, i.e. what a
+    fresh Yahoo `range=` request returns, for exporting the same window from
+    the store (which keeps the full history).
+    """
+    return pd.Timestamp(today or pd.Timestamp.today()).normalize() - pd.Timedelta(days=int(range_days.rstrip("d")))
+
+
+# ---------------------------
+# Incremental Price Store
+# ---------------------------
+class PriceStore:
+    """
+    Local per-ticker price store: one Parquet file per symbol plus a manifest
+    recording the last stored date of each, so a daily run only requests the
+    missing tail instead of the full window.
+    Adjusted closes are restated by Yahoo after a dividend or split, so the
+    tail request overlaps one complete stored bar: if that bar changed, or the
+    response reports an event, the ticker's file is rewritten from a fresh
+    full window instead of mixing adjustment bases.
+    """
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+        self.manifest_path = os.path.join(root, "manifest.json")
+        os.makedirs(root, exist_ok=True)
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path) as f:
+            return json.load(f)
+
+    def _save_manifest(self):
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.manifest_path)
+
+    def path(self, ticker):
+        return os.path.join(self.root, f"{ticker.replace('^', '_')}.parquet")
+
+    def last_date(self, ticker):
+        last = self.manifest.get(ticker)
+        return pd.Timestamp(last).date() if last else None
+
+    def read(self, ticker):
+        if not os.path.exists(self.path(ticker)):
+            return pd.DataFrame(columns=["date", "adj_close", "ticker"])
+        return pd.read_parquet(self.path(ticker))
+
+    def check_date(self, ticker):
+        """
+        First date to request for a stored ticker: the bar before the last
+        stored one (the last may have been partial), to compare against.
+        """
+        dates = self.read(ticker)["date"]
+        return (dates.iloc[-2] if len(dates) > 1 else dates.iloc[-1]).date()
+
+    def restated(self, ticker, new_df, since):
+        """
+        True if the fetched rows report a dividend / split or disagree with the
+        stored close on `since`.
+        """
+        if "event" in new_df.columns and new_df["event"].any():
+            return True
+        old = self.read(ticker)
+        stored = old.loc[old["date"] == pd.Timestamp(since), "adj_close"]
+        fetched = new_df.loc[pd.to_datetime(new_df["date"]) == pd.Timestamp(since), "adj_close"]
+        if stored.empty or fetched.empty:
+            return False
+        return not np.isclose(float(fetched.iloc[0]), float(stored.iloc[0]), rtol=1e-6)
+
+    def append(self, ticker, new_df, replace=False):
+        """
+        Merge freshly fetched rows into the ticker's file (or, with `replace`,
+        overwrite it). Rows on an existing date replace the stored ones (the
+        last stored bar may have been partial).
+        """
+        if new_df is None or new_df.empty:
+            return
+        new_df = new_df[["date", "adj_close", "ticker"]].copy()
+        new_df["date"] = pd.to_datetime(new_df["date"])
+        old = self.read(ticker) if not replace else pd.DataFrame()
+        df = pd.concat([old, new_df], ignore_index=True) if not old.empty else new_df
+        df = df.drop_duplicates("date", keep="last").sort_values("date").reset_index(drop=True)
+        df.to_parquet(self.path(ticker), index=False)
+        self.manifest[ticker] = df["date"].max().strftime("%Y-%m-%d")
+
+    def update(self, tickers, fetcher=None, range_days=RANGE_DAYS):
+        """
+        Fetch only what is missing for each ticker: the full `range_days` window
+        for new symbols, otherwise everything from the bar before the last
+        stored one onwards. Tickers whose history was restated are refetched
+        in full and rewritten; if that refetch fails their file is left as is.
+        """
+        fetcher = fetcher or PriceFetcher()
+        starts = {t: self.check_date(t) for t in tickers if self.last_date(t) is not None}
+        fresh = fetcher.fetch_many(tickers, starts=starts, range_days=range_days)
+        restated = [t for t, df in fresh.groupby("ticker", sort=False) if t in starts and self.restated(t, df, starts[t])]
+        if restated:
+            print(f"♻️ Adjusted history restated for {', '.join(restated)}, refetching the full window")
+            refetched = fetcher.fetch_many(restated, range_days=range_days)
+            fresh = pd.concat([fresh[~fresh["ticker"].isin(restated)], refetched], ignore_index=True)
+
+        for ticker, df in fresh.groupby("ticker", sort=False):
+            self.append(ticker, df, replace=ticker in restated)
+        self._save_manifest()
+        print(f"🗄️ Updated {fresh['ticker'].nunique()} tickers, {len(fresh)} rows fetched "
+              f"({len(starts)} incremental, {len(tickers) - len(starts)} full, {len(restated)} restated)")
+
+    def load(self, tickers, start=None):
+        """
+        Return the stored history of `tickers` from `start` on (all of it if
+        None) as one long frame (date, adj_close, ticker).
+        """
+        frames = [self.read(t) for t in tickers]
+        frames = [df for df in frames if not df.empty]
+        if not frames:
+            return pd.DataFrame(columns=["date", "adj_close", "ticker"])
+        df = pd.concat(frames, ignore_index=True)
+        if start is not None:
+            df = df[df["date"] >= pd.Timestamp(start)]
+        df["date"] = df["date"].dt.date
+        return df
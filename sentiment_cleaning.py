@@ -1,19 +1,32 @@
-import pandas as pd
+from data_store import read_table, write_table
 
-df = pd.read_csv("data/stocknewsapi_sentiment_30days.csv", parse_dates=["date"])
 
-# Pivot to have dates as rows and tickers as columns
-pivot_df = df.pivot(index="date", columns="ticker", values="sentiment_score")
+def sentiment_matrix(df):
+    """
+    (date x ticker) sentiment_score matrix, missing days filled with neutral 0.
+    """
+    # Pivot to have dates as rows and tickers as columns
+    pivot_df = df.pivot(index="date", columns="ticker", values="sentiment_score")
+    pivot_df.columns = pivot_df.columns.astype(str)
 
-# Replace missing values (NaNs) with neutral sentiment = 0
-pivot_df_filled = pivot_df.fillna(0)
+    # Replace missing values (NaNs) with neutral sentiment = 0
+    pivot_df_filled = pivot_df.fillna(0)
 
-# Optional: sort rows by date
-pivot_df_filled = pivot_df_filled.sort_index()
+    # Optional: sort rows by date
+    return pivot_df_filled.sort_index()
 
-# Save to new CSV (optional)
-pivot_df_filled.to_csv("data/sentiment_score_matrix.csv")
 
-# Display preview
-print(pivot_df_filled.head())
-print(pivot_df_filled.tail())
\ No newline at end of file
+def main():
+    df = read_table("stocknewsapi_sentiment_30days", columns=["date", "ticker", "sentiment_score"])
+    pivot_df_filled = sentiment_matrix(df)
+
+    # Save to new table (optional)
+    write_table(pivot_df_filled.reset_index(), "sentiment_score_matrix")
+
+    # Display preview
+    print(pivot_df_filled.head())
+    print(pivot_df_filled.tail())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,82 +1,194 @@
-import requests
-import pandas as pd
+import json
 import os
+import re
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from data_store import write_table
+from instrumentation import span
+from price_fetcher import RequestsTransport, TokenBucket
+from universe import get_universe
 
 # === CONFIGURATION ===
 API_KEY = "# Replace with your actual key"  # Replace with your actual key
-TICKERS = [
-    "AAPL",  # Information Technology
-    "MSFT",  # Information Technology
-    "UNH",   # Health Care
-    "JNJ",   # Health Care
-    "JPM",   # Financials
-    "BAC",   # Financials
-    "AMZN",  # Consumer Discretionary
-    "TSLA",  # Consumer Discretionary
-    "GOOGL", # Communication Services
-    "NFLX",  # Communication Services
-    "RTX",   # Industrials
-    "UNP",   # Industrials
-    "PG",    # Consumer Staples
-    "KO",    # Consumer Staples
-    "XOM",   # Energy
-    "CVX",   # Energy
-    "NEE",   # Utilities
-    "DUK",   # Utilities
-    "AMT",   # Real Estate
-    "PLD",   # Real Estate
-    "LIN",   # Materials
-    "SHW"    # Materials
-]
+TICKERS = get_universe().tickers
 BASE_URL = "https://stocknewsapi.com/api/v1/stat"
-OUTPUT_CSV = "data/stocknewsapi_sentiment_30days.csv"
+DATE_RANGE = "01152025-today"
+OUTPUT_TABLE = "stocknewsapi_sentiment_30days"
+CHECKPOINT_DIR = "data/newsapi_checkpoint"
 
-os.makedirs("data", exist_ok=True)
 
-def get_sentiment_for_ticker(ticker):
-    params = {
-        "tickers": ticker,
-        "date": "01152025-today",
-        "page": 1,
-        "token": API_KEY
-    }
-
-    response = requests.get(BASE_URL, params=params)
-    if response.status_code != 200:
-        print(f"[ERROR {response.status_code}] {response.text}")
-        return []
-
-    data = response.json()
+def parse_sentiment(data, tickers):
     daily_data = data.get("data", {})
     parsed = []
 
     for date, day_result in daily_data.items():
-        sentiment_data = day_result.get(ticker)
-        if not sentiment_data:
-            continue
-        parsed.append({
-            "ticker": ticker,
-            "date": date,
-            "positive": sentiment_data.get("Positive", 0),
-            "neutral": sentiment_data.get("Neutral", 0),
-            "negative": sentiment_data.get("Negative", 0),
-            "sentiment_score": sentiment_data.get("sentiment_score", None)
-        })
+        for ticker in tickers:
+            sentiment_data = day_result.get(ticker)
+            if not sentiment_data:
+                continue
+            parsed.append({
+                "ticker": ticker,
+                "date": date,
+                "positive": sentiment_data.get("Positive", 0),
+                "neutral": sentiment_data.get("Neutral", 0),
+                "negative": sentiment_data.get("Negative", 0),
+                "sentiment_score": sentiment_data.get("sentiment_score", None)
+            })
 
     return parsed
 
+
+# ---------------------------
+# Paginated Collector
+# ---------------------------
+class SentimentCollector:
+    """
+    Walks every page of the /stat endpoint for batches of tickers.
+    - batch_size tickers are sent per request (comma-separated `tickers`)
+    - requests run concurrently under a token-bucket rate limit, with retry + backoff
+    - every finished (batch, page) is checkpointed under `checkpoint_dir/<run_id>`,
+      so an interrupted run only requests the pages it is still missing; the
+      run id is the date range with "today" resolved, so a later day's run
+      never reuses them, and they are deleted once a collect has no failures
+    - transport / base_url can point the collector at a local mock server
+    """
+    def __init__(self, api_key=API_KEY, base_url=BASE_URL, date_range=DATE_RANGE, transport=None,
+                 batch_size=5, rate=2.0, max_workers=4, retries=3, backoff=1.0,
+                 checkpoint_dir=CHECKPOINT_DIR):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.date_range = date_range
+        self.transport = transport or RequestsTransport(timeout=30)
+        self.batch_size = batch_size
+        self.limiter = TokenBucket(rate)
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.checkpoint_dir = checkpoint_dir
+        today = pd.Timestamp.today().strftime("%m%d%Y")
+        self.run_id = re.sub(r"[^A-Za-z0-9_-]", "_", date_range.replace("today", today))
+
+    def batches(self, tickers):
+        return [tuple(tickers[i:i + self.batch_size]) for i in range(0, len(tickers), self.batch_size)]
+
+    def page_path(self, batch, page):
+        key = re.sub(r"[^A-Za-z0-9_-]", "_", "-".join(batch))
+        return os.path.join(self.checkpoint_dir, self.run_id, key, f"page_{page}.json")
+
+    def clear_checkpoints(self):
+        shutil.rmtree(os.path.join(self.checkpoint_dir, self.run_id), ignore_errors=True)
+
+    def load_page(self, batch, page):
+        path = self.page_path(batch, page)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def save_page(self, batch, page, result):
+        path = self.page_path(batch, page)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "w") as f:
+            json.dump(result, f)
+        os.replace(path + ".tmp", path)
+
+    def fetch_page(self, batch, page):
+        """
+        Return {"total_pages", "rows"} for one page, from the checkpoint if present.
+        Returns None if the request still fails after all retries.
+        """
+        cached = self.load_page(batch, page)
+        if cached is not None:
+            return cached
+
+        params = {
+            "tickers": ",".join(batch),
+            "date": self.date_range,
+            "page": page,
+            "token": self.api_key
+        }
+        with span("fetch.newsapi", tickers=",".join(batch), page=page) as s:
+            for attempt in range(self.retries + 1):
+                self.limiter.acquire()
+                try:
+                    status, data = self.transport(self.base_url, params)
+                except Exception as e:
+                    status, data = repr(e), None
+                if status == 200 and data is not None:
+                    result = {
+                        "total_pages": int(data.get("total_pages") or 1),
+                        "rows": parse_sentiment(data, batch),
+                    }
+                    self.save_page(batch, page, result)
+                    s.set(status=status, attempts=attempt + 1)
+                    s.rows = len(result["rows"])
+                    return result
+                if attempt < self.retries:
+                    time.sleep(self.backoff * 2 ** attempt)
+
+            s.set(status=status, attempts=self.retries + 1)
+            print(f"[ERROR {status}] {','.join(batch)} page {page}")
+            return None
+
+    def collect(self, tickers):
+        """
+        Fetch page 1 of every batch, then all remaining pages, concurrently.
+        Returns the parsed rows and the (batch, page) pairs that failed.
+        The run's checkpoints are removed when nothing failed.
+        """
+        batches = self.batches(list(tickers))
+        rows, failed = [], []
+
+        with span("fetch.newsapi_collect", batches=len(batches)) as s, \
+                ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            first = list(pool.map(lambda b: self.fetch_page(b, 1), batches))
+
+            rest = []
+            for batch, result in zip(batches, first):
+                if result is None:
+                    failed.append((batch, 1))
+                    continue
+                print(f"📊 {','.join(batch)}: {result['total_pages']} page(s)")
+                rows.extend(result["rows"])
+                rest.extend((batch, page) for page in range(2, result["total_pages"] + 1))
+
+            for (batch, page), result in zip(rest, pool.map(lambda bp: self.fetch_page(*bp), rest)):
+                if result is None:
+                    failed.append((batch, page))
+                else:
+                    rows.extend(result["rows"])
+            s.set(failed=len(failed))
+            s.rows = len(rows)
+
+        if not failed:
+            self.clear_checkpoints()
+        return rows, failed
+
+
+def get_sentiment_for_ticker(ticker):
+    rows, _ = SentimentCollector().collect([ticker])
+    return rows
+
+
 def main():
-    all_results = []
-    for ticker in TICKERS:
-        print(f"📊 Fetching sentiment for {ticker}...")
-        ticker_data = get_sentiment_for_ticker(ticker)
-        all_results.extend(ticker_data)
+    collector = SentimentCollector()
+    all_results, failed = collector.collect(TICKERS)
+    if failed:
+        # No partial table and a non-zero exit: the pipeline must not mark the stage done
+        print(f"❌ {len(failed)} page(s) failed; {OUTPUT_TABLE} not written. "
+              f"Rerun to resume from {os.path.join(collector.checkpoint_dir, collector.run_id)}")
+        raise SystemExit(1)
 
     df = pd.DataFrame(all_results)
     df["date"] = pd.to_datetime(df["date"])
+    df = df.drop_duplicates(["ticker", "date"], keep="last")
     df.sort_values(by=["ticker", "date"], inplace=True)
-    df.to_csv(OUTPUT_CSV, index=False)
-    print(f"\n✅ Saved sentiment scores to: {OUTPUT_CSV}")
+    path = write_table(df, OUTPUT_TABLE)
+    print(f"\n✅ Saved sentiment scores to: {path}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
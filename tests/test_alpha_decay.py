@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from alpha_decay import AlphaDecay, block_bootstrap_means, bootstrap_alpha, sentiment_labels
+
+
+def panel(n_days=40, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2024-01-02", periods=n_days)
+    tickers, sectors = ["AAA", "BBB", "CCC", "DDD"], ["XLK", "XLK", "XLF", "XLF"]
+    stocks = pd.DataFrame({
+        "date": np.tile(dates, len(tickers)),
+        "ticker": np.repeat(tickers, n_days),
+        "sector_etf": np.repeat(sectors, n_days),
+        "adj_close": (100 * np.exp(np.cumsum(rng.normal(0, 0.02, (len(tickers), n_days)), axis=1))).ravel(),
+        "sentiment_label": sentiment_labels(rng.integers(-1, 2, len(tickers) * n_days)),
+    })
+    etf_prices = pd.DataFrame({
+        "date": np.tile(dates, 2),
+        "ticker": np.repeat(["XLK", "XLF"], n_days),
+        "adj_close": (50 * np.exp(np.cumsum(rng.normal(0, 0.01, (2, n_days)), axis=1))).ravel(),
+    })
+    return stocks, etf_prices
+
+
+def decay_curve(*updates, state=None):
+    decay = state or AlphaDecay(max_horizon=5, source="news")
+    for stocks, etf_prices in updates:
+        decay.update(stocks, etf_prices)
+    return decay
+
+
+def test_incremental_updates_match_one_pass():
+    stocks, etf_prices = panel()
+    early = stocks[stocks["date"] < stocks["date"].unique()[25]]
+    one_pass = decay_curve((stocks, etf_prices)).curve()
+    pd.testing.assert_frame_equal(decay_curve((early, etf_prices), (stocks, etf_prices)).curve(), one_pass)
+
+
+def test_incremental_update_from_since_matches_one_pass():
+    stocks, etf_prices = panel()
+    early = stocks[stocks["date"] < stocks["date"].unique()[25]]
+    decay = decay_curve((early, etf_prices))
+
+    since = decay.since()
+    recent = stocks[stocks["date"] >= since]
+    decay.update(recent, etf_prices, n_earlier=int((stocks["date"] < since).sum()))
+    pd.testing.assert_frame_equal(decay.curve(), decay_curve((stocks, etf_prices)).curve())
+
+
+def test_restated_history_starts_over(tmp_path):
+    stocks, etf_prices = panel()
+    dates = stocks["date"].unique()
+    early = stocks[stocks["date"] < dates[25]]
+    path = str(tmp_path / "sector.pkl")
+    decay_curve((early, etf_prices)).save(path)
+
+    # a restated close among the kept boundary rows, and a dropped early row
+    restated = stocks.copy()
+    restated.loc[restated["date"] == dates[23], "adj_close"] *= 1.1
+    shorter = stocks.drop(index=stocks.index[stocks["date"] == dates[2]][:1])
+    for changed in [restated, shorter]:
+        state = AlphaDecay.resume(path, max_horizon=5, source="news")
+        assert not state.consistent(changed, etf_prices)
+        with pytest.raises(ValueError):
+            state.update(changed[changed["date"] >= state.since()], etf_prices, n_earlier=1)
+        resumed = decay_curve((changed, etf_prices), state=state)
+        pd.testing.assert_frame_equal(resumed.curve(), decay_curve((changed, etf_prices)).curve())
+
+
+def test_state_from_another_source_is_not_resumed(tmp_path):
+    stocks, etf_prices = panel()
+    path = str(tmp_path / "sector.pkl")
+    decay_curve((stocks, etf_prices)).save(path)
+
+    assert AlphaDecay.resume(path, max_horizon=5, source="news").sums is not None
+    assert AlphaDecay.resume(path, max_horizon=5, source="finbert").sums is None
+
+
+def row_block_means(values, n_draws, block, rng):
+    # reference: moving blocks over single observations in time order
+    n = len(values)
+    n_blocks = -(-n // block)
+    starts = rng.integers(0, n - block + 1, size=(n_draws, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block)).reshape(n_draws, -1)[:, :n]
+    return values[idx].mean(axis=1)
+
+
+def test_one_row_per_date_is_a_plain_moving_block_bootstrap():
+    values = np.random.default_rng(1).normal(size=23)
+    got = block_bootstrap_means(values, np.ones(23, dtype=int), 200, 5, np.random.default_rng(7))
+    np.testing.assert_allclose(got, row_block_means(values, 200, 5, np.random.default_rng(7)))
+
+
+def test_bootstrap_resamples_whole_dates():
+    rng = np.random.default_rng(2)
+    dates = pd.bdate_range("2024-01-02", periods=60)
+    one = pd.DataFrame({"sector_etf": "XLK", "sentiment_label": "positive", "horizon": 3,
+                        "date": dates, "alpha": rng.normal(0.001, 0.02, len(dates))})
+    # five tickers moving together on every date carry no more information than one
+    five = pd.concat([one] * 5, ignore_index=True)
+
+    a = bootstrap_alpha(one, n_draws=500, workers=1)
+    b = bootstrap_alpha(five, n_draws=500, workers=1)
+    assert (a["n_dates"].iloc[0], b["n"].iloc[0], b["n_dates"].iloc[0]) == (60, 300, 60)
+    cols = ["mean", "boot_t_stat", "ci_low", "ci_high", "p_value"]
+    pd.testing.assert_frame_equal(a[cols], b[cols])
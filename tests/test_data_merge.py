@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_merge as dm
+import feature_store
+from data_store import read_table, write_table
+from universe import get_universe
+
+
+@pytest.fixture(autouse=True)
+def no_feature_cache(monkeypatch):
+    # compute every feature directly; restores the unset store afterwards
+    monkeypatch.setattr(feature_store, "_store", False)
+
+
+def write_inputs(n_days=60, seed=0):
+    """
+    Source tables in data/ of the working directory whose ticker sets differ:
+    the first ticker only has news, the last one only has prices.
+    """
+    rng = np.random.default_rng(seed)
+    universe = get_universe()
+    dates = pd.bdate_range("2024-01-02", periods=n_days)
+    tickers = list(universe.tickers[:7])
+
+    priced = tickers[1:]
+    prices = pd.DataFrame({
+        "date": np.tile(dates, len(priced)),
+        "ticker": np.repeat(priced, n_days),
+        "adj_close": (100 * np.exp(np.cumsum(rng.normal(0, 0.02, (len(priced), n_days)), axis=1))).ravel(),
+    })
+    news = tickers[:-1]
+    sentiment = pd.DataFrame({
+        "date": np.tile(dates, len(news)),
+        "ticker": np.repeat(news, n_days),
+        "sentiment_score": np.round(rng.normal(0, 0.5, len(news) * n_days), 2),
+    })
+    sentiment = sentiment[rng.random(len(sentiment)) > 0.3]
+    etf_prices = pd.DataFrame({
+        "date": np.tile(dates, len(universe.etfs)),
+        "ticker": np.repeat(universe.etfs, n_days),
+        "adj_close": 50.0,
+    })
+
+    write_table(sentiment, dm.SENTIMENT_TABLE)
+    write_table(prices, dm.PRICE_TABLE)
+    write_table(etf_prices, dm.ETF_TABLE)
+
+
+def test_chunked_merge_matches_in_memory_with_mismatched_tickers(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_inputs()
+
+    expected = {}
+    for name, frame in dm.merge_all(*dm.load_inputs()).items():
+        write_table(frame, name)
+        expected[name] = read_table(name)
+
+    counts = dm.merge_chunked(chunk_size=3, workers=1)
+    for name in dm.STOCK_TABLES:
+        chunked = read_table(name)
+        assert counts[name] == len(chunked)
+        pd.testing.assert_frame_equal(chunked, expected[name])
+
+    assert list(expected["merged_sentiment"]["ticker"].cat.categories) == sorted(get_universe().tickers[:6])
+    assert list(expected["full_dataset"]["ticker"].cat.categories) == sorted(get_universe().tickers[1:7])
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from multi_agent_evaluation import DynamicSelector
+
+
+def agent_returns(n_days=120):
+    # "Steady" earns 1% a day with little noise, "Noisy" 0.2% with a lot, "Loser" bleeds
+    swing = np.where(np.arange(n_days) % 2 == 0, 1.0, -1.0)
+    return pd.DataFrame({
+        "Steady": 0.01 + 0.001 * swing,
+        "Noisy": 0.002 + 0.02 * swing,
+        "Loser": -0.005 + 0.002 * swing,
+    }, index=pd.bdate_range("2024-01-02", periods=n_days))
+
+
+@pytest.mark.parametrize("method", ["ew_sharpe", "hedge"])
+def test_weights_converge_to_the_dominant_agent(method):
+    returns = agent_returns()
+    out = DynamicSelector(returns.columns, method=method, min_periods=5, start_value=1000).run(returns)
+    weights = out[["w_Steady", "w_Noisy", "w_Loser"]].to_numpy()
+
+    # equal weights during the warm-up, then the allocation moves
+    np.testing.assert_allclose(weights[:5], 1 / 3)
+    assert not np.allclose(weights[5], 1 / 3)
+    np.testing.assert_allclose(weights.sum(axis=1), 1.0)
+    assert weights[-1, 0] > 0.95 and weights[-1, 0] >= weights[5, 0]
+    if method == "ew_sharpe":
+        assert (weights[5:, 2] == 0).all()  # a negative Sharpe gets nothing
+
+    # each day's weights apply to that day's returns, compounding from start_value
+    daily = (weights * returns.to_numpy()).sum(axis=1)
+    np.testing.assert_allclose(out["portfolio_value"], 1000 * np.cumprod(1 + daily))
+
+
+def test_weights_only_use_earlier_returns():
+    returns = agent_returns(30)
+    shocked = returns.copy()
+    shocked.iloc[20] = [-0.5, 0.5, 0.5]
+    a = DynamicSelector(returns.columns).run(returns)
+    b = DynamicSelector(returns.columns).run(shocked)
+    pd.testing.assert_frame_equal(a.iloc[:21].filter(like="w_"), b.iloc[:21].filter(like="w_"))
+    assert not np.allclose(a.iloc[21].filter(like="w_"), b.iloc[21].filter(like="w_"))
+
+
+def test_ew_sharpe_holds_cash_when_every_agent_loses():
+    returns = agent_returns()[["Loser"]].assign(Other=lambda df: df["Loser"] - 0.001)
+    out = DynamicSelector(returns.columns, min_periods=3, start_value=1000).run(returns)
+    assert (out[["w_Loser", "w_Other"]].iloc[3:] == 0).all().all()
+    assert out["portfolio_value"].iloc[3:].nunique() == 1
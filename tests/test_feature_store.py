@@ -0,0 +1,87 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+import feature_store as fs
+
+
+def test_forward_returns_stop_at_ticker_boundaries():
+    dates = pd.bdate_range("2024-01-02", periods=6)
+    prices = pd.DataFrame({
+        "date": np.tile(dates, 2),
+        "ticker": np.repeat(["AAA", "BBB"], 6),
+        "adj_close": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 10.0, 20.0, 30.0, 40.0, 50.0, 60.0],
+    }).sample(frac=1, random_state=0)
+
+    out = fs.forward_returns(prices, horizons=(1, 3))
+    assert out.index.equals(prices.index)
+
+    for ticker, rows in prices.groupby("ticker"):
+        rows = rows.sort_values("date")
+        px = rows["adj_close"].to_numpy()
+        for k in (1, 3):
+            got = out.loc[rows.index, f"return_{k}d"].to_numpy()
+            # the last k rows of each ticker have no future price of their own
+            assert np.isnan(got[-k:]).all()
+            np.testing.assert_allclose(got[:-k], px[k:] / px[:-k] - 1)
+
+
+calls = []
+
+
+@fs.feature("test_counted")
+def counted(x, scale=1):
+    calls.append(scale)
+    return x * scale
+
+
+def test_corrupt_cache_file_is_recomputed(tmp_path):
+    store = fs.FeatureStore(root=str(tmp_path))
+    x = pd.Series([1.0, 2.0, 3.0])
+    path = store.path(store.key("test_counted", (x,), {"scale": 2}))
+    with open(path, "wb") as f:
+        f.write(b"\x80\x05not a pickle")
+
+    calls.clear()
+    pd.testing.assert_series_equal(store.get("test_counted", x, scale=2), x * 2)
+    assert calls == [2] and (store.hits, store.misses) == (0, 1)
+
+    fresh = fs.FeatureStore(root=str(tmp_path))
+    pd.testing.assert_series_equal(fresh.get("test_counted", x, scale=2), x * 2)
+    assert calls == [2] and (fresh.hits, fresh.misses) == (1, 0)
+
+
+def test_counters_add_up_across_threads(tmp_path):
+    store = fs.FeatureStore(root=str(tmp_path), memory_items=2)
+    inputs = [pd.Series(np.arange(5.0) + i) for i in range(4)]
+
+    def work():
+        for _ in range(25):
+            for x in inputs:
+                store.get("test_counted", x, scale=3)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert store.hits + store.misses == 8 * 25 * len(inputs)
+
+
+def test_editing_a_feature_invalidates_its_cache(tmp_path):
+    x = pd.Series([1.0, 2.0, 3.0])
+
+    @fs.feature("test_edited")
+    def edited(x):
+        return x + 1
+
+    fs.FeatureStore(root=str(tmp_path)).get("test_edited", x)
+
+    @fs.feature("test_edited")
+    def edited(x):  # noqa: F811 - the same feature after an edit
+        return x + 2
+
+    store = fs.FeatureStore(root=str(tmp_path))
+    pd.testing.assert_series_equal(store.get("test_edited", x), x + 2)
+    assert (store.hits, store.misses) == (0, 1)
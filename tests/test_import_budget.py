@@ -0,0 +1,9 @@
+import import_budget
+
+
+def test_library_modules_import_within_budget():
+    # every module is imported in a fresh interpreter from an empty directory
+    results, failed = import_budget.check(repeat=2)
+    problems = {r["module"]: r["problems"] for r in results if r["problems"]}
+    assert not failed, problems
+    assert [r["module"] for r in results] == import_budget.MODULES
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import feature_store
+import multi_agent as ma
+from data_merge import clean_etf, merge_stocks
+from multi_agent_evaluation import check_replay
+from universe import get_universe
+
+
+@pytest.fixture(autouse=True)
+def no_feature_cache(monkeypatch):
+    # compute every feature directly; restores the unset store afterwards
+    monkeypatch.setattr(feature_store, "_store", False)
+
+
+def ragged_panel(n_days=150, seed=0):
+    """
+    Stock / ETF / VIX random walks on the registry universe, merged like
+    data_merge, with an uneven calendar:
+    - the first stock stops trading after bar 40 (delisted)
+    - the second one only starts at bar 20
+    - the third one misses bars 70-72 (a short halt)
+    - the fourth one misses every 7th bar
+    """
+    rng = np.random.default_rng(seed)
+    universe = get_universe()
+    dates = pd.bdate_range("2024-01-02", periods=n_days)
+    tickers = universe.tickers
+
+    px = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_days, len(tickers))), axis=0))
+    keep = np.ones(px.shape, dtype=bool)
+    keep[41:, 0] = False
+    keep[:20, 1] = False
+    keep[70:73, 2] = False
+    keep[::7, 3] = False
+    day, col = np.nonzero(keep)
+    prices = pd.DataFrame({"date": dates[day], "ticker": np.asarray(tickers, dtype=object)[col], "adj_close": px[day, col]})
+
+    sentiment = prices[["ticker", "date"]].copy()
+    sentiment["sentiment_score"] = np.round(rng.normal(0, 0.5, len(sentiment)), 2)
+    sentiment = sentiment[rng.random(len(sentiment)) > 0.3]
+
+    etfs = universe.etfs
+    etf_px = 50 * np.exp(np.cumsum(rng.normal(0, 0.01, (n_days, len(etfs))), axis=0))
+    etf_px[:, -1] = 18 * np.exp(np.cumsum(rng.normal(0, 0.05, n_days)) * 0.3)  # VIX around the 18 guard
+    etf_prices = pd.DataFrame({
+        "date": np.tile(dates, len(etfs)),
+        "ticker": np.repeat(np.asarray(etfs, dtype=object), n_days),
+        "adj_close": etf_px.T.ravel(),
+    })
+
+    full = merge_stocks(sentiment, prices)["full_dataset"]
+    return full, clean_etf(etf_prices)
+
+
+def test_replay_matches_batch_on_a_ragged_panel():
+    full, etf_prices = ragged_panel()
+    agents = [ma.Agent(fn.__name__, fn) for fn in ma.LIVE_SIGNALS]
+    result = check_replay(agents, full, etf_prices)
+    assert (result["batch_trades"] > 0).all()
+    assert result["match"].all(), result.to_string()
+
+
+def test_ended_stock_does_not_hold_back_later_days():
+    full, etf_prices = ragged_panel()
+    live = ma.LiveContext()
+    stocks = full.sort_values("date", kind="stable")
+    waiting = []
+    for date, day in stocks.groupby("date", sort=True):
+        etf_day = etf_prices[etf_prices["date"] == date]
+        new_prices = pd.concat([day[["ticker", "adj_close"]], etf_day[["ticker", "adj_close"]]]).astype({"ticker": object})
+        live.update(date, day[["ticker", "sentiment_score"]], new_prices)
+        waiting.append(len(live.pending))
+    assert max(waiting) <= ma.RETURN_LAG + live.max_gap + 1
+
+
+def test_unknown_price_ticker_is_rejected():
+    full, etf_prices = ragged_panel(n_days=10)
+    date = full["date"].min()
+    day = full[full["date"] == date]
+    new_prices = pd.concat([day[["ticker", "adj_close"]], etf_prices.loc[etf_prices["date"] == date, ["ticker", "adj_close"]],
+                            pd.DataFrame({"ticker": ["SPY"], "adj_close": [500.0]})]).astype({"ticker": object})
+    live = ma.LiveContext()
+    with pytest.raises(ValueError, match="SPY"):
+        live.update(date, day[["ticker", "sentiment_score"]], new_prices)
+    assert live.date is None and not live.etf_bars  # nothing was folded in
@@ -0,0 +1,21 @@
+import os
+
+from data_store import read_table, table_path
+from news_stream import to_table
+
+
+def articles(n, prefix):
+    return [("AAPL", "2024-01-02", {"title": f"{prefix} {i}", "url": f"https://x/{prefix}/{i}"}) for i in range(n)]
+
+
+def test_rewriting_a_table_replaces_its_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = table_path("news_articles")
+    os.makedirs(path)
+    with open(os.path.join(path, "part-1.parquet"), "wb") as f:
+        f.write(b"left over from an older layout")
+
+    assert to_table(articles(3, "old")) == 3
+    assert to_table(articles(2, "new")) == 2
+    assert os.listdir(path) == ["part-0.parquet"]
+    assert read_table("news_articles")["title"].tolist() == ["new 0", "new 1"]
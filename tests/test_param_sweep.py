@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import param_sweep as ps
+
+
+def small_frame():
+    return pd.DataFrame({
+        "date": pd.date_range("2024-01-01", periods=4),
+        "ticker": ["AAA", "BBB", "AAA", "BBB"],
+        "adj_close": np.array([1.0, 2.0, 3.0, 4.0], dtype=np.float32),
+    })
+
+
+def test_attached_panels_are_read_only():
+    spec, blocks = ps.publish_frame(small_frame())
+    try:
+        frame, attached = ps.attach_frame(spec)
+        pd.testing.assert_frame_equal(frame, small_frame(), check_categorical=False, check_dtype=False)
+        with pytest.raises(ValueError):
+            frame["adj_close"].to_numpy()[0] = 9.0
+        assert frame["adj_close"].iloc[0] == 1.0
+        del frame
+        for shm in attached:
+            shm.close()
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+
+def test_result_keys_follow_the_inputs():
+    data, etf = small_frame(), small_frame()
+    inputs = ps.inputs_fingerprint(data, etf)
+    assert ps.inputs_fingerprint(small_frame(), small_frame()) == inputs
+
+    changed = small_frame()
+    changed.loc[3, "adj_close"] = 5.0
+    assert ps.inputs_fingerprint(changed, etf) != inputs
+    assert ps.task_key("momentum", {"window": 5}, inputs) != ps.task_key("momentum", {"window": 5}, ps.inputs_fingerprint(changed, etf))
+
+
+def test_agent_strategies_are_scored_on_the_agent_book():
+    prices = pd.DataFrame({"date": pd.bdate_range("2024-01-01", periods=5), "ticker": "XLK", "adj_close": 50.0})
+    trades = pd.DataFrame({"date": prices["date"][:2], "exit_date": prices["date"][2:4].to_numpy(), "ticker": "XLK",
+                           "entry_price": 50.0, "exit_price": 50.0, "return": 0.0, "capital": 10_000, "pnl": 0.0})
+    agent = ps.simulate("agent_value", trades, prices)
+    assert agent["portfolio_value"].iloc[0] == ps.ma.START_CASH
+    assert ps.simulate("positive_sentiment", trades, prices)["portfolio_value"].iloc[0] == 110_000
@@ -0,0 +1,33 @@
+import pytest
+
+import pipeline
+
+
+def write(path, text):
+    path.write_text(text)
+
+
+def test_fingerprint_follows_local_imports(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "HERE", str(tmp_path))
+    write(tmp_path / "stage.py", "import os\nimport helper\n\ndef main():\n    from engine import run\n")
+    write(tmp_path / "helper.py", "X = 1\n")
+    write(tmp_path / "engine.py", "from helper import X\n\ndef run():\n    return X\n")
+    write(tmp_path / "unused.py", "Y = 1\n")
+
+    assert pipeline.local_modules("stage.py") == ["engine.py", "helper.py", "stage.py"]
+
+    stage = pipeline.Stage("stage", "stage.py")
+    before = pipeline.fingerprint(stage)
+    write(tmp_path / "unused.py", "Y = 2\n")
+    assert pipeline.fingerprint(stage) == before
+    write(tmp_path / "engine.py", "from helper import X\n\ndef run():\n    return -X\n")
+    assert pipeline.fingerprint(stage) != before
+
+
+def test_merge_reads_the_selected_sentiment_table():
+    deps = pipeline.dependencies(pipeline.build_stages("finbert_sentiment"))
+    assert deps["merge"] == ["etf_prices", "finbert", "stock_prices"]
+    assert "finbert" not in pipeline.dependencies(pipeline.build_stages("stocknewsapi_sentiment_30days"))
+
+    with pytest.raises(SystemExit):
+        pipeline.build_stages("no_such_sentiment")
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+import multi_agent as ma
+from portfolio_engine import simulate_daily
+
+
+def test_default_book_takes_every_sector_signal():
+    dates = pd.bdate_range("2024-01-02", periods=40)
+    sectors = ma.universe.sectors
+    etf_prices = pd.DataFrame({
+        "date": np.tile(dates, len(sectors)),
+        "ticker": np.repeat(sectors, len(dates)),
+        "adj_close": 50.0,  # flat, so exits return exactly the capital
+    })
+    # every sector signals every day: the busiest a 5-day-hold agent can be
+    signals = etf_prices[["date"]].assign(sector_etf=etf_prices["ticker"], signal=True)
+    trades = ma.make_trades(signals, etf_prices, hold_days=ma.MAX_HOLD_DAYS)
+
+    _, taken = simulate_daily(trades, etf_prices, start_cash=ma.START_CASH)
+    assert taken["accepted"].all()
+    _, taken = simulate_daily(trades, etf_prices, start_cash=ma.START_CASH - ma.TRADE_CAPITAL)
+    assert not taken["accepted"].all()
+
+    portfolio = ma.simulate_portfolio(trades, etf_prices)
+    assert portfolio["portfolio_value"].iloc[0] == ma.START_CASH
+
+
+def price_frame(closes, start="2024-01-01"):
+    dates = pd.bdate_range(start, periods=len(next(iter(closes.values()))))
+    return pd.concat([pd.DataFrame({"date": dates, "ticker": t, "adj_close": px}) for t, px in closes.items()],
+                     ignore_index=True)
+
+
+def trade(date, exit_date, ticker, entry_price, exit_price, capital):
+    return {"date": pd.Timestamp(date), "exit_date": pd.Timestamp(exit_date) if exit_date else pd.NaT,
+            "ticker": ticker, "entry_price": entry_price, "exit_price": exit_price, "capital": capital}
+
+
+def test_trade_that_fits_is_taken_after_one_that_does_not():
+    prices = price_frame({"AAA": [10.0] * 5, "BBB": [20.0] * 5})
+    trades = pd.DataFrame([trade("2024-01-01", "2024-01-03", "AAA", 10.0, 10.0, 20_000),
+                           trade("2024-01-01", "2024-01-03", "BBB", 20.0, 20.0, 10_000)])
+    _, taken = simulate_daily(trades, prices, start_cash=15_000)
+    assert list(taken["accepted"]) == [False, True]
+    assert list(taken["shares"]) == [0.0, 500.0]
+
+
+def test_exit_cash_settles_before_same_day_entries():
+    prices = price_frame({"AAA": [10.0, 10.0, 12.0, 12.0]})
+    trades = pd.DataFrame([trade("2024-01-01", "2024-01-03", "AAA", 10.0, 12.0, 1_000),
+                           trade("2024-01-03", "2024-01-04", "AAA", 12.0, 12.0, 1_200),
+                           trade("2024-01-03", "2024-01-04", "AAA", 12.0, 12.0, 100)])
+    portfolio, taken = simulate_daily(trades, prices, start_cash=1_000)
+    assert list(taken["accepted"]) == [True, True, False]
+    assert portfolio["cash"].tolist() == [0.0, 0.0, 0.0, 1_200.0]
+
+
+def test_positions_are_marked_to_market_daily():
+    prices = price_frame({"AAA": [100.0, 110.0, 120.0, 90.0]})
+    trades = pd.DataFrame([trade("2024-01-01", "2024-01-03", "AAA", 100.0, 120.0, 1_000)])
+    portfolio, _ = simulate_daily(trades, prices, start_cash=10_000)
+    np.testing.assert_allclose(portfolio["holdings"], [1_000.0, 1_100.0, 0.0])
+    np.testing.assert_allclose(portfolio["portfolio_value"], [10_000.0, 10_100.0, 10_200.0])
+    assert portfolio["n_positions"].tolist() == [1, 1, 0]
+
+
+def test_open_trade_is_marked_until_the_last_price():
+    prices = price_frame({"AAA": [100.0, 110.0, 120.0, 90.0], "BBB": [50.0, 50.0, 50.0, 50.0]})
+    trades = pd.DataFrame([trade("2024-01-01", "2024-01-02", "BBB", 50.0, 50.0, 500),
+                           trade("2024-01-02", None, "AAA", 110.0, np.nan, 1_100)])
+    portfolio, taken = simulate_daily(trades, prices, start_cash=2_000)
+    assert taken["accepted"].all()
+    assert portfolio.index[-1] == pd.Timestamp("2024-01-04")
+    np.testing.assert_allclose(portfolio["portfolio_value"], [2_000.0, 2_000.0, 2_100.0, 1_800.0])
+    assert portfolio["n_positions"].tolist() == [1, 1, 1, 1]
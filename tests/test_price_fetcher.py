@@ -0,0 +1,98 @@
+import pandas as pd
+import pytest
+
+import price_fetcher as pf
+
+
+class Clock:
+    """
+    Stands in for time.monotonic / time.sleep: sleeping advances the clock.
+    """
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(pf.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(pf.time, "sleep", clock.sleep)
+    return clock
+
+
+def chart(timestamps, closes, events=None):
+    result = {"timestamp": timestamps, "indicators": {"adjclose": [{"adjclose": closes}]}}
+    if events is not None:
+        result["events"] = events
+    return {"chart": {"result": [result]}}
+
+
+DAY = 86_400
+T0 = int(pd.Timestamp("2024-01-02", tz="UTC").timestamp())
+
+
+class FakeTransport:
+    """
+    Replies with `statuses` in turn (the chart payload on 200) and records the calls.
+    """
+    def __init__(self, statuses, payload=None):
+        self.statuses = list(statuses)
+        self.payload = payload or chart([T0], [10.0])
+        self.calls = 0
+
+    def __call__(self, url, params):
+        status = self.statuses[min(self.calls, len(self.statuses) - 1)]
+        self.calls += 1
+        return status, self.payload if status == 200 else None
+
+
+def test_retries_back_off_until_a_200(clock):
+    transport = FakeTransport([429, 503, 200])
+    fetcher = pf.PriceFetcher(transport, rate=1000, retries=3, backoff=1.0)
+    df = fetcher.fetch("AAA")
+    assert transport.calls == 3
+    assert clock.sleeps == [1.0, 2.0]
+    assert df["adj_close"].tolist() == [10.0]
+
+
+def test_gives_up_after_the_last_retry(clock):
+    transport = FakeTransport([500])
+    fetcher = pf.PriceFetcher(transport, rate=1000, retries=3, backoff=0.5)
+    assert fetcher.fetch("AAA") is None
+    assert transport.calls == 4
+    assert clock.sleeps == [0.5, 1.0, 2.0]
+
+
+def test_token_bucket_spaces_requests(clock):
+    bucket = pf.TokenBucket(rate=2.0, capacity=3)
+    granted = []
+    for _ in range(6):
+        bucket.acquire()
+        granted.append(clock.now)
+    # a burst of `capacity`, then one request every 1 / rate seconds
+    assert granted == pytest.approx([0.0, 0.0, 0.0, 0.5, 1.0, 1.5])
+
+
+def test_parse_chart_drops_null_closes():
+    df = pf.parse_chart("AAA", chart([T0, T0 + DAY, T0 + 2 * DAY], [10.0, None, 12.0], {"dividends": {"1": {}}}))
+    assert df["date"].astype(str).tolist() == ["2024-01-02", "2024-01-04"]
+    assert df["adj_close"].tolist() == [10.0, 12.0]
+    assert df["event"].all() and (df["ticker"] == "AAA").all()
+
+
+@pytest.mark.parametrize("data", [
+    {}, {"chart": None}, {"chart": {"result": None}}, {"chart": {"result": [{}]}},
+    chart([], []), chart([T0], [None]), {"chart": {"result": [{"timestamp": [T0], "indicators": {}}]}},
+])
+def test_parse_chart_tolerates_empty_payloads(data):
+    df = pf.parse_chart("AAA", data)
+    assert df.empty
+    assert list(df.columns) == ["date", "adj_close", "ticker", "event"]
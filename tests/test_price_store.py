@@ -0,0 +1,73 @@
+import pandas as pd
+
+from price_store import PriceStore, window_start
+
+
+def test_export_window_matches_the_yahoo_range(tmp_path):
+    store = PriceStore(root=str(tmp_path))
+    dates = pd.date_range("2024-01-01", "2024-06-30")
+    store.append("AAPL", pd.DataFrame({"date": dates, "adj_close": range(len(dates)), "ticker": "AAPL"}))
+
+    start = window_start("60d", today="2024-06-30 15:30")
+    assert start == pd.Timestamp("2024-05-01")
+
+    recent = store.load(["AAPL"], start=start)
+    assert recent["date"].min() == start.date() and recent["date"].max() == dates[-1].date()
+    assert len(recent) == 61
+    assert len(store.load(["AAPL"])) == len(dates)  # the store itself keeps everything
+
+
+class FakeFetcher:
+    """
+    Serves bars from `history` (date -> adj_close per ticker) like
+    PriceFetcher.fetch_many: from `starts[ticker]` on, else the whole window.
+    """
+    def __init__(self, history, events=()):
+        self.history = history
+        self.events = set(events)
+        self.calls = []
+
+    def fetch_many(self, tickers, starts=None, range_days="60d"):
+        starts = starts or {}
+        self.calls.append({t: starts.get(t) for t in tickers})
+        frames = []
+        for t in tickers:
+            bars = self.history[t]
+            if starts.get(t) is not None:
+                bars = bars[bars.index >= pd.Timestamp(starts[t])]
+            frames.append(pd.DataFrame({"date": bars.index.date, "adj_close": bars.to_numpy(), "ticker": t,
+                                        "event": t in self.events and starts.get(t) is not None}))
+        return pd.concat(frames, ignore_index=True)
+
+
+def bars(values, start="2024-03-01"):
+    return pd.Series(values, index=pd.bdate_range(start, periods=len(values)), dtype=float)
+
+
+def test_unchanged_history_only_fetches_the_tail(tmp_path):
+    store = PriceStore(root=str(tmp_path))
+    store.update(["AAA"], fetcher=FakeFetcher({"AAA": bars([10, 11, 12])}))
+    fetcher = FakeFetcher({"AAA": bars([10, 11, 12, 13])})
+    store.update(["AAA"], fetcher=fetcher)
+    assert fetcher.calls == [{"AAA": pd.Timestamp("2024-03-04").date()}]
+    assert store.read("AAA")["adj_close"].tolist() == [10, 11, 12, 13]
+
+
+def test_restated_close_rewrites_the_window(tmp_path):
+    store = PriceStore(root=str(tmp_path))
+    store.update(["AAA", "BBB"], fetcher=FakeFetcher({"AAA": bars([10, 11, 12]), "BBB": bars([5, 5, 5])}))
+    # a dividend went ex: Yahoo scales the whole adjusted history of AAA down
+    fetcher = FakeFetcher({"AAA": bars([9, 9.9, 10.8, 12]), "BBB": bars([5, 5, 5, 6])})
+    store.update(["AAA", "BBB"], fetcher=fetcher)
+    assert len(fetcher.calls) == 2 and fetcher.calls[1] == {"AAA": None}
+    assert store.read("AAA")["adj_close"].tolist() == [9, 9.9, 10.8, 12]
+    assert store.read("BBB")["adj_close"].tolist() == [5, 5, 5, 6]
+
+
+def test_reported_event_rewrites_the_window(tmp_path):
+    store = PriceStore(root=str(tmp_path))
+    store.update(["AAA"], fetcher=FakeFetcher({"AAA": bars([10, 11, 12])}))
+    fetcher = FakeFetcher({"AAA": bars([10, 11, 12, 13])}, events=["AAA"])
+    store.update(["AAA"], fetcher=fetcher)
+    assert fetcher.calls[1] == {"AAA": None}
+    assert store.read("AAA")["adj_close"].tolist() == [10, 11, 12, 13]
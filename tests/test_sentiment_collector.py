@@ -0,0 +1,83 @@
+import os
+
+import pytest
+
+import sentiment_collection_newsapi as news
+from sentiment_collection_newsapi import SentimentCollector
+
+
+class MockTransport:
+    """
+    Fake /stat endpoint: two pages per ticker batch, one article-day per page.
+    Pages listed in `fail` answer 500 until they are removed.
+    """
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.calls = []
+
+    def __call__(self, url, params):
+        page = params["page"]
+        self.calls.append((params["tickers"], page))
+        if (params["tickers"], page) in self.fail:
+            return 500, None
+        day = {t: {"Positive": 1, "sentiment_score": 0.5 * page} for t in params["tickers"].split(",")}
+        return 200, {"total_pages": 2, "data": {f"2025-01-0{page}": day}}
+
+
+def collector(tmp_path, transport, date_range="01152025-today"):
+    return SentimentCollector(transport=transport, date_range=date_range, batch_size=2, rate=1000,
+                              retries=0, backoff=0, checkpoint_dir=str(tmp_path / "ckpt"))
+
+
+def test_collects_every_page_of_every_batch(tmp_path):
+    transport = MockTransport()
+    rows, failed = collector(tmp_path, transport).collect(["AAPL", "MSFT", "XOM"])
+    assert failed == []
+    assert sorted(transport.calls) == [("AAPL,MSFT", 1), ("AAPL,MSFT", 2), ("XOM", 1), ("XOM", 2)]
+    assert sorted((r["ticker"], r["date"]) for r in rows) == [
+        ("AAPL", "2025-01-01"), ("AAPL", "2025-01-02"), ("MSFT", "2025-01-01"),
+        ("MSFT", "2025-01-02"), ("XOM", "2025-01-01"), ("XOM", "2025-01-02")]
+
+
+def test_rerun_resumes_from_checkpoints_then_clears_them(tmp_path):
+    transport = MockTransport(fail=[("XOM", 2)])
+    c = collector(tmp_path, transport)
+    rows, failed = c.collect(["AAPL", "MSFT", "XOM"])
+    assert failed == [(("XOM",), 2)]
+    assert os.path.exists(c.page_path(("AAPL", "MSFT"), 1))
+
+    transport.fail.clear()
+    transport.calls.clear()
+    rows, failed = c.collect(["AAPL", "MSFT", "XOM"])
+    assert failed == [] and len(rows) == 6
+    assert transport.calls == [("XOM", 2)]
+    assert not os.path.exists(os.path.join(str(tmp_path / "ckpt"), c.run_id))
+
+
+def test_checkpoints_are_scoped_to_the_date_range(tmp_path):
+    transport = MockTransport(fail=[("XOM", 2)])
+    collector(tmp_path, transport, "01152025-02152025").collect(["XOM"])
+
+    transport.calls.clear()
+    collector(tmp_path, transport, "01152025-03152025").collect(["XOM"])
+    assert ("XOM", 1) in transport.calls
+
+
+def test_open_range_resolves_today():
+    c = SentimentCollector(date_range="01152025-today")
+    assert "today" not in c.run_id and c.run_id.startswith("01152025-")
+
+
+def test_main_fails_without_writing_on_failed_pages(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(news, "TICKERS", ["AAPL", "MSFT", "XOM"])
+    transport = MockTransport(fail=[("XOM", 2)])
+    monkeypatch.setattr(news, "SentimentCollector", lambda: collector(tmp_path, transport))
+    with pytest.raises(SystemExit) as exit_info:
+        news.main()
+    assert exit_info.value.code == 1
+    assert not os.path.exists(os.path.join("data", news.OUTPUT_TABLE))
+
+    transport.fail.clear()
+    news.main()
+    assert os.path.exists(os.path.join("data", news.OUTPUT_TABLE))
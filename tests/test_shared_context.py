@@ -0,0 +1,40 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import feature_store
+import multi_agent as ma
+
+
+def etf_panel(n_days=80, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2024-01-02", periods=n_days)
+    tickers = ["XLK", "XLF", "^VIX"]
+    return pd.DataFrame({
+        "date": np.tile(dates, len(tickers)),
+        "ticker": np.repeat(tickers, n_days),
+        "adj_close": (50 * np.exp(np.cumsum(rng.normal(0, 0.01, (len(tickers), n_days)), axis=1))).ravel(),
+    })
+
+
+def test_window_moving_average_keeps_its_warm_up(tmp_path, monkeypatch):
+    monkeypatch.setattr(feature_store, "_store", None)
+    store = feature_store.configure(root=str(tmp_path))
+
+    etf_prices = etf_panel()
+    data = pd.DataFrame({"date": etf_prices["date"].unique(), "ticker": "AAPL", "sentiment_score": 0.0,
+                         "return_5d": 0.0, "sector_etf": "XLK"})
+    shared = ma.SharedContext(data, etf_prices).warm()
+    full = shared.etf_ma(20)
+    assert "^VIX" not in set(full["ticker"])
+    cached, misses = sorted(os.listdir(tmp_path)), store.misses
+
+    dates = np.sort(etf_prices["date"].unique())
+    start, end = dates[30], dates[60]
+    window = shared.window(start, end).etf_ma(20)
+
+    pd.testing.assert_frame_equal(window, full[(full["date"] >= start) & (full["date"] < end)])
+    assert window["ma"].notna().all()
+    # the slice comes from the parent context: no feature-cache lookup, no pickle
+    assert sorted(os.listdir(tmp_path)) == cached and store.misses == misses
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+from trade_engine import PriceIndex, build_trades, first_exit
+
+
+def reference_exits(prices, entries, target_return, stop_loss, max_hold_days):
+    # reference: walk each entry's forward price path row by row
+    trades = []
+    for ticker, t0 in zip(entries["ticker"], entries["date"]):
+        rows = prices[prices["ticker"] == ticker].sort_values("date")
+        at_entry = rows[rows["date"] == t0]
+        if at_entry.empty:
+            continue
+        entry_price = at_entry["adj_close"].iloc[0]
+        path = rows[rows["date"] > t0].head(max_hold_days)
+        for j, (date, px) in enumerate(zip(path["date"], path["adj_close"])):
+            ret = px / entry_price - 1
+            if ret >= target_return or ret <= stop_loss or j == max_hold_days - 1:
+                trades.append((t0, ticker, date, ret))
+                break
+    return trades
+
+
+def engine_exits(prices, entries, target_return, stop_loss, max_hold_days):
+    index = PriceIndex(prices)
+    pos, found = index.locate(entries["ticker"].to_numpy(), entries["date"])
+    pos = pos[found]
+    rows, rets, has_exit = first_exit(index, pos, index.prices[pos], target_return, stop_loss, max_hold_days)
+    return [(pd.Timestamp(d), t, pd.Timestamp(x), r) for d, t, x, r in zip(
+        index.dates[pos][has_exit], index.tickers[index.codes[pos]][has_exit], index.dates[rows][has_exit], rets[has_exit])]
+
+
+def test_first_exit_matches_a_row_by_row_walk():
+    rng = np.random.default_rng(3)
+    dates = pd.bdate_range("2024-01-02", periods=30)
+    frames = []
+    for ticker in ["AAA", "BBB", "CCC"]:
+        days = dates[rng.random(len(dates)) > 0.2]  # each ticker has its own gaps
+        frames.append(pd.DataFrame({"date": days, "ticker": ticker,
+                                    "adj_close": 50 * np.exp(np.cumsum(rng.normal(0, 0.02, len(days))))}))
+    frames.append(pd.DataFrame({"date": dates, "ticker": "FLAT", "adj_close": 20.0}))
+    prices = pd.concat(frames, ignore_index=True).sample(frac=1, random_state=0)
+
+    entries = prices.sample(40, random_state=1)[["date", "ticker"]]
+    last_bars = prices.sort_values("date").groupby("ticker").tail(1)[["date", "ticker"]]
+    edge = pd.DataFrame({"date": [dates[5], dates[-3]], "ticker": ["ZZZ", "FLAT"]})  # unknown ticker; no exit
+    entries = pd.concat([entries, last_bars, edge], ignore_index=True)
+
+    for target, stop, hold in [(0.015, -0.05, 5), (0.5, -0.5, 3), (0.0, -0.01, 1)]:
+        expected = reference_exits(prices, entries, target, stop, hold)
+        got = engine_exits(prices, entries, target, stop, hold)
+        assert [g[:3] for g in got] == [e[:3] for e in expected]
+        np.testing.assert_allclose([g[3] for g in got], [e[3] for e in expected])
+
+    # neither the last bars nor the flat entry without a full window exit
+    got = {(t, d) for d, t, _, _ in engine_exits(prices, entries, 0.015, -0.05, 5)}
+    assert not got & {(t, pd.Timestamp(d)) for d, t in zip(last_bars["date"], last_bars["ticker"])}
+    assert ("FLAT", dates[-3]) not in got
+
+
+def test_exit_counts_trading_days_across_weekends_and_holidays():
+    # Fri 2024-03-29 is Good Friday: no bar between Thu 28th and Mon 1st April
+    dates = pd.to_datetime(["2024-03-26", "2024-03-27", "2024-03-28", "2024-04-01", "2024-04-02", "2024-04-03"])
+    prices = pd.DataFrame({"date": dates, "ticker": "XLK", "adj_close": [10.0, 11.0, 12.0, 13.0, 14.0, 15.0]})
+    entries = pd.DataFrame({"date": dates[[1, 2]], "sector_etf": "XLK"})
+
+    trades = build_trades(entries, prices, hold_days=2, capital=1000)
+    assert trades["exit_date"].tolist() == [pd.Timestamp("2024-04-01"), pd.Timestamp("2024-04-02")]
+    np.testing.assert_allclose(trades["return"], [13 / 11 - 1, 14 / 12 - 1])
+    np.testing.assert_allclose(trades["pnl"], trades["return"] * 1000)
+
+
+def test_exit_is_empty_when_the_history_ends_first():
+    dates = pd.bdate_range("2024-01-02", periods=4)
+    prices = pd.DataFrame({"date": np.tile(dates, 2), "ticker": np.repeat(["XLK", "XLF"], 4), "adj_close": 10.0})
+    # the Saturday entry has no bar and is dropped
+    entries = pd.DataFrame({"date": [dates[0], dates[1], dates[2], pd.Timestamp("2024-01-06")],
+                            "sector_etf": ["XLK", "XLK", "XLF", "XLF"]})
+
+    trades = build_trades(entries, prices, hold_days=2)
+    assert len(trades) == 3
+    assert trades["exit_date"].isna().tolist() == [False, False, True]
+    assert trades["exit_price"].isna().tolist() == [False, False, True]
+    assert np.isnan(trades["return"].iloc[2]) and np.isnan(trades["pnl"].iloc[2])
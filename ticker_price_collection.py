@@ -1,53 +1,20 @@
-from curl_cffi import requests
-import pandas as pd
-import json
-from datetime import datetime
-import time
+from price_fetcher import PriceFetcher
+from price_store import PriceStore, window_start
+from data_store import write_table
+from universe import get_universe
 
-headers = {
-    "User-Agent": "Mozilla/5.0",
-    "Accept": "application/json"
-}
+tickers = get_universe().tickers
 
-def fetch_yahoo_price(ticker, range_days="60d", interval="1d"):
-    url = f"https://query1.finance.yahoo.com/v8/finance/chart/{ticker}"
-    params = {
-        "range": range_days,
-        "interval": interval,
-        "includePrePost": "false",
-        "events": "div,splits"
-    }
+def main():
+    # Only the missing tail of each ticker is requested; history lives in the store
+    store = PriceStore()
+    store.update(tickers, fetcher=PriceFetcher(rate=2.0, max_workers=8))
 
-    r = requests.get(url, headers=headers, impersonate="chrome", params=params, timeout=10)
-    if r.status_code != 200:
-        print(f"[{ticker}] ❌ Error {r.status_code}")
-        return None
+    # Export the trailing 60-day window, as the direct Yahoo fetch did
+    final_df = store.load(tickers, start=window_start())
+    path = write_table(final_df, "yahoo_prices_stealth")
+    print(f"✅ Saved to {path}")
 
-    data = r.json()
-    chart = data.get("chart", {}).get("result", [{}])[0]
-    timestamps = chart.get("timestamp", [])
-    prices = chart.get("indicators", {}).get("adjclose", [{}])[0].get("adjclose", [])
 
-    df = pd.DataFrame({
-        "date": [datetime.utcfromtimestamp(ts).date() for ts in timestamps],
-        "adj_close": prices
-    })
-    df["ticker"] = ticker
-    return df
-
-tickers = [
-    "AAPL", "MSFT", "UNH", "JNJ", "JPM", "BAC", "AMZN", "TSLA", "GOOGL", "NFLX",
-    "RTX", "UNP", "PG", "KO", "XOM", "CVX", "NEE", "DUK", "AMT", "PLD", "LIN", "SHW"
-]
-all_data = []
-
-for ticker in tickers:
-    print(f"📥 Fetching {ticker}...")
-    df = fetch_yahoo_price(ticker)
-    if df is not None:
-        all_data.append(df)
-    time.sleep(1)  # avoid hammering
-
-final_df = pd.concat(all_data)
-final_df.to_csv("data/yahoo_prices_stealth.csv", index=False)
-print("✅ Saved to data/yahoo_prices_stealth.csv")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+
+
+# ---------------------------
+# Price Index
+# ---------------------------
+class PriceIndex:
+    """
+    Ragged (ticker x trading date) price matrix built once from a long price frame
+    ['date', 'ticker', 'adj_close'] of daily bars.
+
+    Rows are stored flat, sorted by (ticker, date), with `start[code]` / `end[code]`
+    marking each ticker's slice, so row `pos + k` is the k-th trading day after
+    row `pos` for the same ticker. Lookups are vectorized `searchsorted` calls.
+    """
+    def __init__(self, price_df, ticker_col="ticker", price_col="adj_close"):
+        df = price_df[[ticker_col, "date", price_col]].dropna(subset=[ticker_col, "date"])
+        df = df.sort_values([ticker_col, "date"], kind="stable")
+        df = df.drop_duplicates([ticker_col, "date"], keep="first")
+
+        codes, tickers = pd.factorize(df[ticker_col], sort=True)
+        self.tickers = pd.Index(np.asarray(tickers, dtype=object))
+        self.codes = codes.astype(np.int64)
+        self.dates = pd.to_datetime(df["date"]).values.astype("datetime64[ns]")
+        self.prices = df[price_col].to_numpy(dtype=np.float64)
+
+        counts = np.bincount(self.codes, minlength=len(self.tickers))
+        self.end = np.cumsum(counts)
+        self.start = self.end - counts
+
+        # Composite (ticker, day) key, monotonic over the flat rows
+        days = self.dates.astype("datetime64[D]").astype(np.int64)
+        self.day0 = days.min() if len(days) else 0
+        self.span = (days.max() - self.day0 + 2) if len(days) else 1
+        self.keys = self.codes * self.span + (days - self.day0)
+
+    def __len__(self):
+        return len(self.prices)
+
+    def _keys(self, codes, dates):
+        days = dates.astype("datetime64[D]").astype(np.int64) - self.day0
+        in_range = (codes >= 0) & (days >= 0) & (days < self.span - 1)
+        return np.where(in_range, codes * self.span + days, -1), in_range
+
+    def locate(self, tickers, dates):
+        """
+        Row position of each (ticker, date) pair and a mask of pairs that exist.
+        """
+        codes = self.tickers.get_indexer(pd.Index(np.asarray(tickers, dtype=object)))
+        dates = pd.to_datetime(pd.Series(dates)).values.astype("datetime64[ns]")
+        keys, in_range = self._keys(codes, dates)
+
+        pos = np.searchsorted(self.keys, keys, side="left")
+        pos = np.minimum(pos, max(len(self) - 1, 0))
+        found = in_range & (len(self) > 0)
+        if len(self):
+            found &= (self.keys[pos] == keys) & (self.dates[pos] == dates)
+        return pos, found
+
+    def forward_window(self, pos, n):
+        """
+        The next `n` trading-day rows after each position, as 2-D arrays
+        (entries x n): row positions, prices and a mask of rows that stay
+        within the same ticker.
+        """
+        pos = np.asarray(pos, dtype=np.int64)
+        rows = pos[:, None] + np.arange(1, n + 1)[None, :]
+        end = self.end[self.codes[pos]] if len(pos) else np.empty(0, dtype=np.int64)
+        valid = rows < end[:, None]
+        rows = np.where(valid, rows, 0)
+        return rows, np.where(valid, self.prices[rows], np.nan), valid
+
+
+# ---------------------------
+# Exit Search
+# ---------------------------
+def first_exit(index, pos, entry_price, target_return, stop_loss, max_hold_days):
+    """
+    Vectorized take-profit / stop-loss / timeout exit for every entry at once.
+    Walks at most `max_hold_days` trading days after entry and exits on the first
+    day whose return crosses either barrier, or on the last day of the window.
+    Entries without a full window and no barrier hit get no exit.
+
+    Returns (exit_rows, exit_returns, has_exit).
+    """
+    rows, window, valid = index.forward_window(pos, max_hold_days)
+    entry_price = np.asarray(entry_price, dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rets = window / entry_price[:, None] - 1
+
+    hit = valid & ((rets >= target_return) | (rets <= stop_loss))
+    hit[:, -1] |= valid[:, -1]
+
+    has_exit = hit.any(axis=1)
+    first = hit.argmax(axis=1)
+    take = np.arange(len(first))
+    return rows[take, first], rets[take, first], has_exit
+
+
+# ---------------------------
+# Fixed-Horizon Trades
+# ---------------------------
+def build_trades(entries, price_df=None, ticker_col="sector_etf", hold_days=5, capital=10000, index=None):
+    """
+    Shared trade construction for every fixed-holding strategy.
+    - entries: rows to enter, with ['date', ticker_col]
+    - price_df / index: long price frame ['date', 'ticker', 'adj_close'] or a prebuilt PriceIndex
+    Entries on days without a price are dropped. The exit lands on the
+    `hold_days`-th trading day of that ticker after entry (not calendar days);
+    if the price history ends first, exit_date / exit_price are left empty.
+    """
+    if index is None:
+        index = PriceIndex(price_df)
+    pos, found = index.locate(entries[ticker_col].to_numpy(), entries["date"])
+    pos = pos[found]
+
+    exit_rows = pos + int(hold_days)
+    has_exit = exit_rows < index.end[index.codes[pos]]
+    exit_rows = np.where(has_exit, exit_rows, 0)
+
+    entry_price = index.prices[pos]
+    exit_price = np.where(has_exit, index.prices[exit_rows], np.nan)
+    rets = exit_price / entry_price - 1
+
+    return pd.DataFrame({
+        "date": index.dates[pos],
+        "exit_date": np.where(has_exit, index.dates[exit_rows], np.datetime64("NaT")),
+        "ticker": index.tickers[index.codes[pos]],
+        "entry_price": entry_price,
+        "exit_price": exit_price,
+        "return": rets,
+        "capital": capital,
+        "pnl": rets * capital
+    })
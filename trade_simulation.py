@@ -1,80 +1,39 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-# === Load data ===
-df = pd.read_csv("data/full_dataset.csv", parse_dates=["date"])
-etf_prices = pd.read_csv("data/etf_prices.csv", parse_dates=["date"])
+
+from data_store import read_table
+from feature_store import get_feature
+from instrumentation import traced
+from portfolio_engine import simulate_daily
+from trade_engine import PriceIndex, build_trades, first_exit
+from universe import get_universe
 
 # === Map stock tickers to their sector ETF ===
-stock_to_etf = {
-    "AAPL": "XLK", "MSFT": "XLK",
-    "UNH": "XLV", "JNJ": "XLV",
-    "JPM": "XLF", "BAC": "XLF",
-    "AMZN": "XLY", "TSLA": "XLY",
-    "GOOGL": "XLC", "NFLX": "XLC",
-    "RTX": "XLI", "UNP": "XLI",
-    "PG": "XLP", "KO": "XLP",
-    "XOM": "XLE", "CVX": "XLE",
-    "NEE": "XLU", "DUK": "XLU",
-    "AMT": "XLRE", "PLD": "XLRE",
-    "LIN": "XLB", "SHW": "XLB"
-}
-df["sector_etf"] = df["ticker"].map(stock_to_etf)
+stock_to_etf = get_universe().stock_to_etf
 
 # === Create sector-level sentiment signal (average of the 2 stocks per sector per day) ===
-sector_sentiment = (
-    df.groupby(["date", "sector_etf"])["sentiment_score"]
-    .mean()
-    .reset_index()
-    .dropna()
-)
+def build_sector_sentiment(df):
+    return get_feature("sector_mean", df[["date", "ticker", "sentiment_score"]], stock_to_etf).dropna()
+
+@traced()
 def generate_positive_sentiment_trades(sentiment_df, price_df, hold_days=1, threshold=0):
     """
     Strategy: Buy on positive sentiment and hold for short-term momentum.
     - sentiment_df: must contain columns ['date', 'sector_etf', 'sentiment_score']
     - price_df: ETF prices with ['date', 'ticker', 'adj_close']
     """
-    sentiment_df = sentiment_df.copy()
-    price_df = price_df.copy()
-
-    sentiment_df["signal"] = sentiment_df["sentiment_score"] > threshold
-    entries = sentiment_df[sentiment_df["signal"]].copy()
-    entries = entries.rename(columns={"sector_etf": "ticker"})
-
-    # Merge to get entry price
-    entries = pd.merge(entries, price_df, on=["date", "ticker"], how="inner")
-    entries = entries.rename(columns={"adj_close": "entry_price"})
-    entries["exit_date"] = entries["date"] + pd.Timedelta(days=hold_days)
-
-    # Merge to get exit price
-    exit_prices = price_df.rename(columns={"date": "exit_date", "adj_close": "exit_price"})
-    trades = pd.merge(entries, exit_prices, on=["exit_date", "ticker"], how="left")
-
-    trades["return"] = trades["exit_price"] / trades["entry_price"] - 1
-    trades["capital"] = 10000
-    trades["pnl"] = trades["return"] * trades["capital"]
+    signal = sentiment_df["sentiment_score"] > threshold
+    trades = build_trades(sentiment_df[signal], price_df, hold_days=hold_days)
 
     return trades[["date", "exit_date", "ticker", "entry_price", "exit_price", "return", "pnl"]]
 
+@traced()
 def generate_negative_sentiment_trades(sentiment_df, price_df, hold_days=5, threshold=0):
-    sentiment_df["signal"] = sentiment_df["sentiment_score"] < threshold
-    entries = sentiment_df[sentiment_df["signal"]].copy()
-    entries = entries.rename(columns={"sector_etf": "ticker"})
-
-    # Merge entry price
-    entries = pd.merge(entries, price_df, on=["date", "ticker"], how="inner")
-    entries = entries.rename(columns={"adj_close": "entry_price"})
-    entries["exit_date"] = entries["date"] + pd.Timedelta(days=hold_days)
-
-    # Merge exit price
-    exit_prices = price_df.rename(columns={"date": "exit_date", "adj_close": "exit_price"})
-    trades = pd.merge(entries, exit_prices, on=["exit_date", "ticker"], how="left")
-
-    trades["return"] = trades["exit_price"] / trades["entry_price"] - 1
-    trades["capital"] = 10000
-    trades["pnl"] = trades["return"] * trades["capital"]
+    signal = sentiment_df["sentiment_score"] < threshold
+    trades = build_trades(sentiment_df[signal], price_df, hold_days=hold_days)
 
     return trades[["date", "exit_date", "ticker", "entry_price", "exit_price", "return", "pnl"]]
 
+@traced()
 def generate_negative_sentiment_with_vix_filter(sentiment_df, price_df, vix_df, vix_threshold=25, hold_days=5, threshold=0):
     """
     Buy sector ETF only when sentiment is negative and VIX is calm (below threshold).
@@ -91,24 +50,11 @@ def generate_negative_sentiment_with_vix_filter(sentiment_df, price_df, vix_df,
     # Define signal: negative sentiment & VIX < threshold
     df["signal"] = (df["sentiment_score"] < threshold) & (df["vix_close"] < vix_threshold)
 
-    entries = df[df["signal"]].copy()
-    entries = entries.rename(columns={"sector_etf": "ticker"})
-
-    # Merge for entry price
-    entries = pd.merge(entries, price_df, on=["date", "ticker"], how="inner")
-    entries = entries.rename(columns={"adj_close": "entry_price"})
-    entries["exit_date"] = entries["date"] + pd.Timedelta(days=hold_days)
-
-    # Merge for exit price
-    exit_prices = price_df.rename(columns={"date": "exit_date", "adj_close": "exit_price"})
-    trades = pd.merge(entries, exit_prices, on=["exit_date", "ticker"], how="left")
-
-    trades["return"] = trades["exit_price"] / trades["entry_price"] - 1
-    trades["capital"] = 10000
-    trades["pnl"] = trades["return"] * trades["capital"]
+    trades = build_trades(df[df["signal"]], price_df, hold_days=hold_days)
 
     return trades[["date", "exit_date", "ticker", "entry_price", "exit_price", "return", "pnl"]]
 
+@traced()
 def generate_adaptive_vix_sentiment_trades(sentiment_df, price_df, vix_df,
                                             sentiment_threshold=-0.3,
                                             target_return=0.015,
@@ -123,63 +69,53 @@ def generate_adaptive_vix_sentiment_trades(sentiment_df, price_df, vix_df,
     """
 
     # 1. Prepare VIX data
-    vix_series = vix_df[vix_df["ticker"] == "^VIX"][["date", "adj_close"]].sort_values("date")
-    vix_series["vix_yesterday"] = vix_series["adj_close"].shift(1)
-    vix_series["vix_falling"] = vix_series["adj_close"] < vix_series["vix_yesterday"]
-    vix_series = vix_series.rename(columns={"adj_close": "vix_close"})
+    vix_series = get_feature("vix_trend", vix_df)
 
     # 2. Merge VIX + sentiment
     signal_df = pd.merge(sentiment_df, vix_series[["date", "vix_falling"]], on="date", how="left")
     signal_df["signal"] = (signal_df["sentiment_score"] < sentiment_threshold) & (signal_df["vix_falling"])
 
-    entries = signal_df[signal_df["signal"]].copy()
-    entries = entries.rename(columns={"sector_etf": "ticker"})
+    entries = signal_df[signal_df["signal"]]
 
-    # 3. Get entry price
-    entries = pd.merge(entries, price_df, on=["date", "ticker"], how="inner")
-    entries = entries.rename(columns={"adj_close": "entry_price"})
-    entries["entry_date"] = entries["date"]
-    entries = entries[["entry_date", "ticker", "entry_price"]]
+    # 3. Get entry price from the (ticker x trading date) price index
+    index = PriceIndex(price_df)
+    pos, found = index.locate(entries["sector_etf"].to_numpy(), entries["date"])
+    pos = pos[found]
+    entry_price = index.prices[pos]
 
-    # 4. Adaptive trade execution
-    all_trades = []
+    # 4. Adaptive trade execution: first barrier hit within max_hold_days, all entries at once
+    exit_rows, rets, has_exit = first_exit(index, pos, entry_price, target_return, stop_loss, max_hold_days)
+    pos, entry_price, exit_rows, rets = pos[has_exit], entry_price[has_exit], exit_rows[has_exit], rets[has_exit]
 
-    for i in range(len(entries)):
-        row = entries.iloc[i]
-        t0 = row["entry_date"]
-        ticker = row["ticker"]
-        entry_price = row["entry_price"]
+    return pd.DataFrame({
+        "date": index.dates[pos],
+        "exit_date": index.dates[exit_rows],
+        "ticker": index.tickers[index.codes[pos]],
+        "entry_price": entry_price,
+        "exit_price": index.prices[exit_rows],
+        "return": rets,
+        "capital": 10000,
+        "pnl": rets * 10000
+    })
 
-        price_path = price_df[(price_df["ticker"] == ticker) & (price_df["date"] > t0)]
-        price_path = price_path.sort_values("date").head(max_hold_days)
-
-        for j, (_, exit_row) in enumerate(price_path.iterrows()):
-            ret = exit_row["adj_close"] / entry_price - 1
-
-            if ret >= target_return or ret <= stop_loss or j == max_hold_days - 1:
-                all_trades.append({
-                    "date": t0,
-                    "exit_date": exit_row["date"],
-                    "ticker": ticker,
-                    "entry_price": entry_price,
-                    "exit_price": exit_row["adj_close"],
-                    "return": ret,
-                    "capital": 10000,
-                    "pnl": ret * 10000
-                })
-                break
-
-    return pd.DataFrame(all_trades)
 
+def simulate_portfolio(trades, start_value=110000, prices=None, position_size=10000):
+    """
+    With `prices`, track `position_size` positions day by day under a
+    `start_value` cash budget and mark them to market; otherwise accumulate
+    realized PnL on exit dates.
+    """
+    if prices is not None:
+        portfolio, _ = simulate_daily(trades, prices, start_cash=start_value, position_size=position_size)
+        return portfolio.reset_index()
 
-def simulate_portfolio(trades, start_value=110000):
     pnl_by_day = trades.groupby("exit_date")["pnl"].sum().reset_index()
     pnl_by_day = pnl_by_day.rename(columns={"exit_date": "date"})
 
     full_dates = pd.date_range(trades["date"].min(), trades["exit_date"].max(), freq="D")
     portfolio = pd.DataFrame({"date": full_dates})
     portfolio = pd.merge(portfolio, pnl_by_day, on="date", how="left")
-    portfolio["pnl"].fillna(0, inplace=True)
+    portfolio["pnl"] = portfolio["pnl"].fillna(0)
     portfolio["portfolio_value"] = start_value + portfolio["pnl"].cumsum()
 
     return portfolio
@@ -225,9 +161,9 @@ def evaluate_performance(portfolio_df, name="Strategy"):
         "Max Drawdown": round(max_dd, 4)
     }
 
-import matplotlib.pyplot as plt
-
 def plot_comparison(pos_df, adaptive_portfolio, vix_neg_df, benchmark_df):
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(10, 6))
 
     # Benchmark = solid navy
@@ -255,18 +191,23 @@ def plot_comparison(pos_df, adaptive_portfolio, vix_neg_df, benchmark_df):
     plt.tight_layout()
     plt.show()
 
-if __name__ == "__main__":
+def main():
+    # === Load data ===
+    df = read_table("full_dataset", columns=["date", "ticker", "sentiment_score"])
+    etf_prices = read_table("etf_prices", columns=["date", "ticker", "adj_close"])
+    sector_sentiment = build_sector_sentiment(df)
+
     neg_trades = generate_negative_sentiment_trades(sector_sentiment, etf_prices)
-    neg_portfolio = simulate_portfolio(neg_trades)
+    neg_portfolio = simulate_portfolio(neg_trades, prices=etf_prices)
 
     pos_trades = generate_positive_sentiment_trades(sector_sentiment, etf_prices)
-    pos_portfolio = simulate_portfolio(pos_trades)
+    pos_portfolio = simulate_portfolio(pos_trades, prices=etf_prices)
 
     vix_trades = generate_negative_sentiment_with_vix_filter(sector_sentiment, etf_prices,etf_prices)
-    vix_neg_portfolio = simulate_portfolio(vix_trades)
+    vix_neg_portfolio = simulate_portfolio(vix_trades, prices=etf_prices)
 
     adaptive_trades = generate_adaptive_vix_sentiment_trades(sector_sentiment, etf_prices, etf_prices)
-    adaptive_portfolio = simulate_portfolio(adaptive_trades)
+    adaptive_portfolio = simulate_portfolio(adaptive_trades, prices=etf_prices)
 
     benchmark = simulate_benchmark(etf_prices, sector_sentiment["sector_etf"].unique())
     
@@ -287,3 +228,7 @@ if __name__ == "__main__":
     vix_neg_portfolio,
     benchmark
     )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+UNIVERSE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "universe.json")
+
+
+# ---------------------------
+# Universe Registry
+# ---------------------------
+class Universe:
+    """
+    The ticker universe and its ticker -> sector ETF map, with integer codes.
+    - tickers: stocks in config order, code = position
+    - sectors: sector ETFs sorted by symbol, code = position
+    - sector_of: sector code of every ticker code (the group index used for
+      vectorized sector aggregation)
+    - etfs: sector ETFs plus the volatility index, i.e. what the ETF collector fetches
+    """
+    def __init__(self, stock_to_etf, sector_names=None, volatility_index="^VIX"):
+        self.stock_to_etf = dict(stock_to_etf)
+        self.tickers = list(self.stock_to_etf)
+        self.sectors = sorted(set(self.stock_to_etf.values()) | set(sector_names or {}))
+        self.sector_names = dict(sector_names or {})
+        self.volatility_index = volatility_index
+        self.etfs = self.sectors + ([volatility_index] if volatility_index else [])
+
+        self.ticker_index = pd.Index(self.tickers)
+        self.sector_index = pd.Index(self.sectors)
+        self.sector_of = self.sector_index.get_indexer([self.stock_to_etf[t] for t in self.tickers])
+
+    @classmethod
+    def from_file(cls, path=UNIVERSE_FILE):
+        with open(path) as f:
+            config = json.load(f)
+        return cls(config["tickers"], config.get("sectors"), config.get("volatility_index", "^VIX"))
+
+    def ticker_codes(self, tickers):
+        """
+        Integer code of each ticker, -1 if it is not in the universe.
+        """
+        return self.ticker_index.get_indexer(pd.Index(tickers).astype(object))
+
+    def sector_codes(self, tickers):
+        """
+        Sector code of each ticker, -1 if it is not in the universe.
+        """
+        codes = self.ticker_codes(tickers)
+        return np.where(codes >= 0, self.sector_of[codes], -1)
+
+    def sector_etf(self, tickers):
+        """
+        Sector ETF symbol of each ticker (NaN outside the universe), aligned to
+        `tickers`, as a categorical over all sectors.
+        """
+        codes = self.sector_codes(tickers)
+        etfs = pd.Categorical.from_codes(codes, categories=self.sectors)
+        return pd.Series(etfs, index=getattr(tickers, "index", None), name="sector_etf")
+
+    def sector_mean(self, data, columns=("sentiment_score",)):
+        """
+        Mean of `columns` per (date, sector_etf) from integer codes and bincount
+        instead of a groupby on strings. Rows outside the universe are dropped;
+        NaN values are skipped. Sorted by date, then sector_etf. Means are summed
+        in float64 and returned in the column's float dtype (float32 stays float32).
+        """
+        columns = list(columns)
+        sector = self.sector_codes(data["ticker"])
+        keep = sector >= 0
+        date_codes, dates = pd.factorize(data["date"][keep], sort=True)
+        key = date_codes * len(self.sectors) + sector[keep]
+        groups, inverse = np.unique(key, return_inverse=True)
+
+        out = pd.DataFrame({
+            "date": dates[groups // len(self.sectors)],
+            "sector_etf": np.asarray(self.sectors, dtype=object)[groups % len(self.sectors)],
+        })
+        for col in columns:
+            values = data[col].to_numpy(float)[keep]
+            ok = ~np.isnan(values)
+            sums = np.bincount(inverse[ok], weights=values[ok], minlength=len(groups))
+            counts = np.bincount(inverse[ok], minlength=len(groups))
+            dtype = data[col].dtype if data[col].dtype.kind == "f" else np.float64
+            with np.errstate(invalid="ignore", divide="ignore"):
+                out[col] = (sums / counts).astype(dtype)
+        return out
+
+
+@lru_cache(maxsize=None)
+def get_universe(path=None):
+    """
+    The universe loaded from `path`, else $UNIVERSE_FILE, else universe.json next to this module.
+    """
+    return Universe.from_file(path or os.environ.get("UNIVERSE_FILE", UNIVERSE_FILE))